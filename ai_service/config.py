@@ -30,6 +30,9 @@ class Settings(BaseSettings):
     )
     DATABASE_POOL_SIZE: int = Field(default=10, env="DATABASE_POOL_SIZE")
     DATABASE_MAX_OVERFLOW: int = Field(default=20, env="DATABASE_MAX_OVERFLOW")
+    # 只读副本：向量检索等读取优先发往副本，复制延迟超过上限时回退主库
+    DATABASE_REPLICA_URL: Optional[str] = Field(default=None, env="DATABASE_REPLICA_URL")
+    DATABASE_REPLICA_MAX_LAG: float = Field(default=10.0, env="DATABASE_REPLICA_MAX_LAG")
 
     # Redis配置
     REDIS_URL: str = Field(default="redis://:redis_password@redis:6379/0", env="REDIS_URL")
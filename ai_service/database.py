@@ -5,11 +5,14 @@ AI服务数据库连接管理
 
 import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Any, Dict, List, Optional
 
 import asyncpg
 from asyncpg import Pool
+from prometheus_client import Gauge, Histogram
 
 from ai_service.config import get_settings
 
@@ -18,13 +21,66 @@ settings = get_settings()
 
 # 全局连接池
 _pool: Optional[Pool] = None
+# 只读副本连接池（未配置副本时为None）
+_read_pool: Optional[Pool] = None
+# 副本复制延迟缓存：(检查时间, 延迟秒数；不可达为None)
+_replica_lag: tuple = (0.0, None)
+REPLICA_LAG_CHECK_INTERVAL = 5.0
+# 当前工作单元（请求或后台任务）是否使用过主库连接；用过后该单元的读取也走主库
+_used_primary: ContextVar[bool] = ContextVar("vector_db_used_primary", default=False)
+
+# 副本复制延迟（秒）；已回放到最新WAL时为0
+REPLICA_LAG_SQL = """
+    SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END
+"""
+
+# 连接池指标：获取连接等待时间与占用情况
+POOL_ACQUIRE_WARN_SECONDS = 0.5
+pool_acquire_wait = Histogram(
+    "ai_db_pool_acquire_wait_seconds",
+    "Time spent waiting to acquire a pooled connection",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+pool_in_use = Gauge("ai_db_pool_in_use", "Connections acquired from the pool", ["pool"])
+pool_size = Gauge("ai_db_pool_size", "Connections currently open in the pool", ["pool"])
+pool_max_size = Gauge("ai_db_pool_max_size", "Configured pool max size", ["pool"])
+
+
+def _record_pool_usage(pool: Pool, label: str) -> None:
+    size = pool.get_size()
+    pool_in_use.labels(pool=label).set(size - pool.get_idle_size())
+    pool_size.labels(pool=label).set(size)
+    pool_max_size.labels(pool=label).set(pool.get_max_size())
+
+
+@asynccontextmanager
+async def acquire_connection(pool: Pool, label: str):
+    """从连接池获取连接并记录等待时间，等待过长时告警"""
+    started = time.perf_counter()
+    async with pool.acquire() as conn:
+        wait = time.perf_counter() - started
+        pool_acquire_wait.labels(pool=label).observe(wait)
+        _record_pool_usage(pool, label)
+        if wait >= POOL_ACQUIRE_WARN_SECONDS:
+            in_use = pool.get_size() - pool.get_idle_size()
+            logger.warning(
+                f"连接池获取等待过长: {label} {wait * 1000:.1f}ms "
+                f"(使用中 {in_use}/{pool.get_max_size()})"
+            )
+        yield conn
+    _record_pool_usage(pool, label)
 
 
 class VectorDatabase:
     """向量数据库操作类"""
 
-    def __init__(self, pool: Pool):
+    def __init__(self, pool: Pool, read_pool: Optional[Pool] = None):
         self.pool = pool
+        self.read_pool = read_pool
 
     async def close(self):
         """关闭连接池"""
@@ -33,10 +89,40 @@ class VectorDatabase:
 
     @asynccontextmanager
     async def get_connection(self):
-        """获取数据库连接"""
-        async with self.pool.acquire() as conn:
+        """获取数据库连接（主库），当前工作单元后续的读取也走主库以读到自己的写入"""
+        _used_primary.set(True)
+        async with acquire_connection(self.pool, "primary") as conn:
             yield conn
 
+    async def _replica_available(self) -> bool:
+        """副本复制延迟在上限内（延迟结果缓存若干秒）"""
+        global _replica_lag
+
+        checked_at, lag = _replica_lag
+        if time.monotonic() - checked_at >= REPLICA_LAG_CHECK_INTERVAL:
+            try:
+                async with self.read_pool.acquire() as conn:
+                    lag = float(await conn.fetchval(REPLICA_LAG_SQL) or 0)
+            except Exception as e:
+                logger.warning(f"只读副本不可用，回退主库: {e}")
+                lag = None
+            _replica_lag = (time.monotonic(), lag)
+        return lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG
+
+    @asynccontextmanager
+    async def get_read_connection(self):
+        """获取只读查询连接：优先副本，副本不可用或当前工作单元已用过主库时使用主库"""
+        if (
+            self.read_pool
+            and not _used_primary.get()
+            and await self._replica_available()
+        ):
+            async with acquire_connection(self.read_pool, "replica") as conn:
+                yield conn
+        else:
+            async with acquire_connection(self.pool, "primary") as conn:
+                yield conn
+
     async def execute_query(self, query: str, *args) -> List[Dict[str, Any]]:
         """执行查询"""
         async with self.get_connection() as conn:
@@ -168,7 +254,7 @@ class VectorDatabase:
 
         query = " ".join(query_parts)
 
-        async with self.get_connection() as conn:
+        async with self.get_read_connection() as conn:
             rows = await conn.fetch(query, *params)
             return [dict(row) for row in rows]
 
@@ -200,7 +286,7 @@ class VectorDatabase:
 
         query = " ".join(query_parts)
 
-        async with self.get_connection() as conn:
+        async with self.get_read_connection() as conn:
             rows = await conn.fetch(query, *params)
             return [dict(row) for row in rows]
 
@@ -273,7 +359,7 @@ class VectorDatabase:
 
         query = " ".join(query_parts)
 
-        async with self.get_connection() as conn:
+        async with self.get_read_connection() as conn:
             rows = await conn.fetch(query, *params)
             return [dict(row) for row in rows]
 
@@ -287,7 +373,7 @@ class VectorDatabase:
             ORDER BY chunk_index
         """
 
-        async with self.get_connection() as conn:
+        async with self.get_read_connection() as conn:
             rows = await conn.fetch(query, document_id)
             return [dict(row) for row in rows]
 
@@ -410,7 +496,7 @@ class VectorDatabase:
             ORDER BY operation_count DESC
         """
 
-        async with self.get_connection() as conn:
+        async with self.get_read_connection() as conn:
             rows = await conn.fetch(query)
             return [dict(row) for row in rows]
 
@@ -459,11 +545,11 @@ class VectorDatabase:
             return {"status": "unhealthy", "error": str(e)}
 
 
-async def create_connection_pool() -> Pool:
-    """创建数据库连接池"""
+async def create_connection_pool(dsn: Optional[str] = None) -> Pool:
+    """创建数据库连接池（默认连接主库）"""
     try:
         pool = await asyncpg.create_pool(
-            settings.DATABASE_URL,
+            dsn or settings.DATABASE_URL,
             min_size=1,
             max_size=settings.DATABASE_POOL_SIZE,
             command_timeout=60,
@@ -481,12 +567,17 @@ async def create_connection_pool() -> Pool:
 
 async def get_vector_database() -> VectorDatabase:
     """获取向量数据库实例"""
-    global _pool
+    global _pool, _read_pool
 
     if _pool is None:
         _pool = await create_connection_pool()
+    if _read_pool is None and settings.DATABASE_REPLICA_URL:
+        try:
+            _read_pool = await create_connection_pool(settings.DATABASE_REPLICA_URL)
+        except Exception:
+            logger.warning("只读副本连接池创建失败，读取使用主库")
 
-    return VectorDatabase(_pool)
+    return VectorDatabase(_pool, _read_pool)
 
 
 async def get_vector_db() -> VectorDatabase:
@@ -562,8 +653,11 @@ async def init_vector_database():
 
 async def close_vector_db():
     """关闭向量数据库连接"""
-    global _pool
+    global _pool, _read_pool
 
+    if _read_pool:
+        await _read_pool.close()
+        _read_pool = None
     if _pool:
         await _pool.close()
         _pool = None
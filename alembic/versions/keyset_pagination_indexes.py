@@ -0,0 +1,39 @@
+"""add composite indexes for keyset pagination
+
+Revision ID: keyset_pagination_indexes
+Revises: monthly_partition_audit_security
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'keyset_pagination_indexes'
+down_revision: Union[str, Sequence[str], None] = 'monthly_partition_audit_security'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 游标分页按 (排序键, id) 比较和排序, 常用过滤列放在前面
+INDEXES = (
+    ('ix_audit_logs_created_id', 'audit_logs', ['created_at', 'id']),
+    ('ix_audit_logs_user_created_id', 'audit_logs', ['user_id', 'created_at', 'id']),
+    ('ix_security_events_created_id', 'security_events', ['created_at', 'id']),
+    ('ix_projects_created_id', 'projects', ['created_at', 'id']),
+    ('ix_documents_created_id', 'documents', ['created_at', 'id']),
+    ('ix_documents_project_created_id', 'documents', ['project_id', 'created_at', 'id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
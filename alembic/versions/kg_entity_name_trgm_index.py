@@ -0,0 +1,36 @@
+"""add trigram index on knowledge graph entity names
+
+Revision ID: kg_entity_name_trgm
+Revises: kg_traversal_indexes
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'kg_entity_name_trgm'
+down_revision: Union[str, Sequence[str], None] = 'kg_traversal_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ILIKE '%关键词%' 及 similarity() 排序需要pg_trgm的GIN索引
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_knowledge_graph_nodes_entity_name_trgm',
+        'knowledge_graph_nodes',
+        ['entity_name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'entity_name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_knowledge_graph_nodes_entity_name_trgm', table_name='knowledge_graph_nodes')
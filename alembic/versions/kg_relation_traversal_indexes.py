@@ -0,0 +1,46 @@
+"""add knowledge graph relation traversal indexes
+
+Revision ID: kg_traversal_indexes
+Revises: c9dd43f50a60
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'kg_traversal_indexes'
+down_revision: Union[str, Sequence[str], None] = 'c9dd43f50a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 递归CTE遍历按(实体, 关系类型)逐层展开, 正反两个方向各需一个复合索引
+    op.create_index(
+        'ix_knowledge_graph_relations_source_type',
+        'knowledge_graph_relations',
+        ['source_entity_id', 'relation_type'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_knowledge_graph_relations_target_type',
+        'knowledge_graph_relations',
+        ['target_entity_id', 'relation_type'],
+        unique=False,
+    )
+
+    # 复合索引的前缀已覆盖单列索引
+    op.drop_index('ix_knowledge_graph_relations_source', table_name='knowledge_graph_relations')
+    op.drop_index('ix_knowledge_graph_relations_target', table_name='knowledge_graph_relations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_knowledge_graph_relations_target', 'knowledge_graph_relations', ['target_entity_id'], unique=False)
+    op.create_index('ix_knowledge_graph_relations_source', 'knowledge_graph_relations', ['source_entity_id'], unique=False)
+    op.drop_index('ix_knowledge_graph_relations_target_type', table_name='knowledge_graph_relations')
+    op.drop_index('ix_knowledge_graph_relations_source_type', table_name='knowledge_graph_relations')
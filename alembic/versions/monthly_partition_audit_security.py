@@ -0,0 +1,166 @@
+"""convert audit_logs and security_events to monthly range partitions
+
+Revision ID: monthly_partition_audit_security
+Revises: stats_hourly_rollups
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'monthly_partition_audit_security'
+down_revision: Union[str, Sequence[str], None] = 'stats_hourly_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('audit_logs', 'security_events')
+MONTHS_AHEAD = 3
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _table_ddl(bind, table):
+    """记录表上的索引、外键和主键定义，重建表后恢复"""
+    indexes = bind.execute(
+        sa.text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table"
+        ),
+        {'table': table},
+    ).fetchall()
+    foreign_keys = bind.execute(
+        sa.text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table) AND contype = 'f'"
+        ),
+        {'table': table},
+    ).fetchall()
+    primary_key = bind.execute(
+        sa.text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table) AND contype = 'p'"
+        ),
+        {'table': table},
+    ).scalar()
+    return indexes, foreign_keys, primary_key
+
+
+def _swap_table(bind, table, suffix, create_sql):
+    """将表改名为 {table}{suffix}，按create_sql新建同名表并迁移数据、序列"""
+    old = f'{table}{suffix}'
+    indexes, foreign_keys, primary_key = _table_ddl(bind, table)
+
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    if primary_key:
+        op.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{primary_key}" TO "{old}_pkey"')
+    op.execute(create_sql.format(table=table, old=old))
+    return old, indexes, foreign_keys, primary_key
+
+
+def _finish_swap(bind, table, old, indexes, foreign_keys, primary_key, skip_index):
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+
+    # id序列改为归属新表，删除旧表时保留
+    sequence = bind.execute(
+        sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': old}
+    ).scalar()
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+
+    op.execute(f'DROP TABLE "{old}" CASCADE')
+
+    for name, definition in indexes:
+        if name == primary_key or skip_index(definition):
+            continue
+        op.execute(definition)
+    for name, definition in foreign_keys:
+        op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+
+def _partition_table(bind, table):
+    # 分区键必须非空；模型层created_at本就不可为空
+    op.execute(
+        f'UPDATE "{table}" SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL'
+    )
+    first = bind.execute(sa.text(f'SELECT min(created_at) FROM "{table}"')).scalar()
+
+    old, indexes, foreign_keys, primary_key = _swap_table(
+        bind,
+        table,
+        '_unpartitioned',
+        'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING COMMENTS) '
+        'PARTITION BY RANGE (created_at)',
+    )
+    # 分区表的主键必须包含分区键
+    op.execute(f'ALTER TABLE "{table}" ALTER COLUMN created_at SET NOT NULL')
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id, created_at)')
+
+    today = date.today()
+    month = date((first or today).year, (first or today).month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f'CREATE TABLE "{table}_p{month:%Y%m}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+        )
+        month = _add_months(month, 1)
+    # 兜底分区：预建分区缺失时的写入不致失败
+    op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+    # created_at单列B树索引由BRIN替代；唯一索引无法在不含分区键时保留
+    _finish_swap(
+        bind,
+        table,
+        old,
+        indexes,
+        foreign_keys,
+        primary_key,
+        lambda definition: 'UNIQUE' in definition or definition.endswith('(created_at)'),
+    )
+    op.execute(f'CREATE INDEX "ix_{table}_created_at_brin" ON "{table}" USING brin (created_at)')
+
+
+def _unpartition_table(bind, table):
+    old, indexes, foreign_keys, primary_key = _swap_table(
+        bind,
+        table,
+        '_partitioned',
+        'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING COMMENTS)',
+    )
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id)')
+    _finish_swap(
+        bind,
+        table,
+        old,
+        indexes,
+        foreign_keys,
+        primary_key,
+        lambda definition: 'USING brin' in definition,
+    )
+    op.execute(f'CREATE INDEX "ix_{table}_created_at" ON "{table}" (created_at)')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        _partition_table(bind, table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        _unpartition_table(bind, table)
@@ -0,0 +1,56 @@
+"""add trigram indexes for document and project search
+
+Revision ID: search_trgm_indexes
+Revises: keyset_pagination_indexes
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'search_trgm_indexes'
+down_revision: Union[str, Sequence[str], None] = 'keyset_pagination_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = {
+    'documents': (
+        'filename',
+        'original_filename',
+        'summary',
+        'extracted_text',
+        'ocr_text',
+        'keywords',
+    ),
+    'projects': ('name', 'project_code', 'description', 'procuring_entity'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # 搜索条件 ILIKE '%关键词%' 与 similarity() 排序均可使用pg_trgm的GIN索引
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            op.create_index(
+                f'ix_{table}_{column}_trgm',
+                table,
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
@@ -0,0 +1,79 @@
+"""add hourly rollup tables for audit and security statistics
+
+Revision ID: stats_hourly_rollups
+Revises: kg_entity_name_trgm
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'stats_hourly_rollups'
+down_revision: Union[str, Sequence[str], None] = 'kg_entity_name_trgm'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'audit_log_hourly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('username', sa.String(length=100), nullable=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_audit_log_hourly_rollups_id'), 'audit_log_hourly_rollups', ['id'], unique=False)
+    op.create_index(
+        'ix_audit_log_hourly_rollups_key',
+        'audit_log_hourly_rollups',
+        ['bucket', 'action', 'status', 'user_id'],
+        unique=False,
+    )
+
+    op.create_table(
+        'security_event_hourly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('level', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('username', sa.String(length=100), nullable=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_security_event_hourly_rollups_id'), 'security_event_hourly_rollups', ['id'], unique=False)
+    op.create_index(
+        'ix_security_event_hourly_rollups_key',
+        'security_event_hourly_rollups',
+        ['bucket', 'event_type', 'level', 'user_id'],
+        unique=False,
+    )
+
+    # 高水位：ID不超过last_id的源表行已计入汇总表
+    op.create_table(
+        'stats_rollup_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_id', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stats_rollup_watermarks')
+    op.drop_index('ix_security_event_hourly_rollups_key', table_name='security_event_hourly_rollups')
+    op.drop_index(op.f('ix_security_event_hourly_rollups_id'), table_name='security_event_hourly_rollups')
+    op.drop_table('security_event_hourly_rollups')
+    op.drop_index('ix_audit_log_hourly_rollups_key', table_name='audit_log_hourly_rollups')
+    op.drop_index(op.f('ix_audit_log_hourly_rollups_id'), table_name='audit_log_hourly_rollups')
+    op.drop_table('audit_log_hourly_rollups')
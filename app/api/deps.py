@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.core.auth import auth_manager, security
 from app.crud.crud_user import user as user_crud
-from app.db.session import SessionLocal
+from app.db.session import ReadSessionLocal, SessionLocal
 from app.models.user import User
 
 """
@@ -29,6 +29,22 @@ def get_db() -> Generator:
         db.close()
 
 
+def get_read_db() -> Generator:
+    """获取只读工作单元的数据库会话
+
+    统计看板、检索、报表等可容忍数秒复制延迟的读取发往只读副本；
+    副本延迟超限或会话内发生写入后自动回到主库
+
+    Returns:
+        Generator: 数据库会话生成器
+    """
+    try:
+        db = ReadSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
 def get_current_user(
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Depends(security),
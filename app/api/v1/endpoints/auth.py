@@ -269,9 +269,9 @@ def logout(
             )
 
         # 将token加入黑名单
-        from datetime import datetime
+        from datetime import datetime, timezone
 
-        expires_at = datetime.fromtimestamp(exp)
+        expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
 
         user_agent = request.headers.get("user-agent")
         ip_address = request.client.host if request.client else None
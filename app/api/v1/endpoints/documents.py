@@ -10,6 +10,7 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Query,
     Request,
     UploadFile,
     status,
@@ -21,6 +22,7 @@ from sqlalchemy.orm import Session
 from app import crud
 from app.api import deps
 from app.core.config import settings
+from app.crud.pagination import InvalidCursorError
 from app.models.document import Document
 from app.schemas.response import ResponseModel
 from app.services.cache_service import cache_service
@@ -429,16 +431,20 @@ def search_documents(
     skip: int = 0,
     limit: int = 100,
     project_id: Optional[int] = None,
-    db: Session = Depends(deps.get_db),
+    cursor: Optional[str] = None,
+    sort: str = Query("relevance", pattern="^(relevance|created_at)$"),
+    db: Session = Depends(deps.get_read_db),
 ) -> Any:
     """
     搜索文档
 
     - **q**: 搜索关键词（必填）
-    - **skip**: 跳过的记录数（用于分页）
+    - **skip**: 跳过的记录数（兼容偏移分页）
     - **limit**: 返回的最大记录数（默认100）
     - **project_id**: 可选，限制在指定项目中搜索
-    - **返回**: 匹配的文档列表
+    - **cursor**: 游标分页的下一页游标，首页留空
+    - **sort**: relevance（默认，按相关度、偏移分页）或 created_at（按创建时间倒序、游标分页）
+    - **返回**: 匹配的文档列表，next_cursor用于获取下一页
     - **权限**: 需要用户登录认证
     """
     # 验证查询参数
@@ -457,16 +463,26 @@ def search_documents(
             )
 
     try:
-        # 使用CRUD层的搜索功能
-        documents = crud.document.search_documents(
-            db=db, query=q.strip(), project_id=project_id, skip=skip, limit=limit
-        )
-
-        # 获取总数（不分页）
-        total_documents = crud.document.search_documents(
-            db=db, query=q.strip(), project_id=project_id, skip=0, limit=None
-        )
-        total_count = len(total_documents)
+        # 按创建时间排序时使用游标分页；默认按相关度排序，总数与结果同一查询取得
+        if cursor or sort == "created_at":
+            page = crud.document.search_documents_page(
+                db=db,
+                query=q.strip(),
+                project_id=project_id,
+                cursor=cursor,
+                limit=limit,
+                with_total=True,
+            )
+        else:
+            page = crud.document.search_documents_ranked(
+                db=db,
+                query=q.strip(),
+                project_id=project_id,
+                skip=skip,
+                limit=limit,
+            )
+        documents = page.items
+        total_count = page.total
 
         # 格式化搜索结果
         search_results = []
@@ -495,11 +511,15 @@ def search_documents(
                 "documents": search_results,
                 "query": q.strip(),
                 "total_results": total_count,
+                "total_is_exact": page.total_is_exact,
+                "next_cursor": page.next_cursor,
                 "skip": skip,
                 "limit": limit,
             },
         )
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -21,11 +21,12 @@ from fastapi import (
 from sqlalchemy import and_, desc, func
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 
 from app.core.security.threat_detector import ThreatDetector
 from app.crud.crud_audit_log import audit_log as audit_log_crud
 from app.crud.crud_security_event import security_event as security_event_crud
+from app.crud.pagination import InvalidCursorError, Page
 from app.models.audit_log import AuditLog
 from app.models.security_event import (
     SecurityEvent,
@@ -53,7 +54,7 @@ router = APIRouter()
 @router.get("/dashboard", response_model=SecurityDashboardData)
 async def get_security_dashboard(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     time_range: int = Query(24, description="时间范围（小时）"),
 ):
@@ -104,44 +105,40 @@ async def get_security_dashboard(
 @router.get("/audit-logs", response_model=Dict[str, Any])
 async def get_audit_logs(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     search: AuditLogSearch = Depends(),
 ):
-    """获取审计日志（带分页）"""
+    """获取审计日志（带分页）
+
+    首页及携带cursor的请求使用游标分页，响应中的next_cursor用于获取下一页；
+    总数在无过滤条件时为估算值，否则为封顶计数（total_is_exact标识）
+    """
     try:
-        # 获取总数
-        total = audit_log_crud.count(
-            db,
-            user_id=search.user_id,
-            username=search.username,
-            action=search.action,
-            resource_type=search.resource_type,
-            resource_id=search.resource_id,
-            start_time=search.start_time,
-            end_time=search.end_time,
-            ip_address=search.ip_address,
-            status=search.status,
-        )
+        filters = search.model_dump(exclude={"skip", "limit", "cursor", "with_total"})
 
-        # 获取日志列表
-        logs = audit_log_crud.search(
-            db,
-            user_id=search.user_id,
-            username=search.username,
-            action=search.action,
-            resource_type=search.resource_type,
-            resource_id=search.resource_id,
-            start_time=search.start_time,
-            end_time=search.end_time,
-            ip_address=search.ip_address,
-            status=search.status,
-            skip=search.skip,
-            limit=search.limit,
-        )
+        if search.cursor or not search.skip:
+            page = audit_log_crud.search_page(
+                db,
+                cursor=search.cursor,
+                limit=search.limit,
+                with_total=search.with_total,
+                **filters,
+            )
+        else:
+            # 兼容偏移分页
+            page = Page(
+                items=audit_log_crud.search(
+                    db, skip=search.skip, limit=search.limit, **filters
+                ),
+                total=audit_log_crud.count(db, **filters),
+            )
+        logs = page.items
 
         return {
-            "total": total,
+            "total": page.total,
+            "total_is_exact": page.total_is_exact,
+            "next_cursor": page.next_cursor,
             "items": [
                 {
                     "id": log.id,
@@ -167,6 +164,8 @@ async def get_audit_logs(
                 for log in logs
             ],
         }
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取审计日志失败: {e}")
         raise HTTPException(
@@ -177,14 +176,17 @@ async def get_audit_logs(
 @router.get("/security-events", response_model=List[Dict[str, Any]])
 async def get_security_events(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     search: SecurityEventSearch = Depends(),
+    response: Response,
 ):
-    """获取安全事件"""
+    """获取安全事件
+
+    首页及携带cursor的请求使用游标分页，下一页游标通过 X-Next-Cursor 响应头返回
+    """
     try:
-        events = security_event_crud.search(
-            db,
+        filters = dict(
             event_type=search.event_type,
             level=search.level,
             source_ip=search.source_ip,
@@ -192,10 +194,27 @@ async def get_security_events(
             start_time=search.start_time,
             end_time=search.end_time,
             is_resolved=search.is_resolved,
-            skip=search.skip,
-            limit=search.limit,
         )
 
+        if search.cursor or not search.skip:
+            page = security_event_crud.search_page(
+                db,
+                cursor=search.cursor,
+                limit=search.limit,
+                with_total=search.with_total,
+                **filters,
+            )
+            events = page.items
+            if page.next_cursor:
+                response.headers["X-Next-Cursor"] = page.next_cursor
+            if page.total is not None:
+                response.headers["X-Total-Count"] = str(page.total)
+        else:
+            # 兼容偏移分页
+            events = security_event_crud.search(
+                db, skip=search.skip, limit=search.limit, **filters
+            )
+
         return [
             {
                 "id": event.id,
@@ -214,6 +233,8 @@ async def get_security_events(
             }
             for event in events
         ]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"获取安全事件失败: {e}")
         raise HTTPException(
@@ -401,7 +422,7 @@ async def export_audit_logs(
 @router.get("/audit-logs/statistics")
 async def get_audit_log_statistics(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     start_time: Optional[datetime] = Query(None, description="开始时间"),
     end_time: Optional[datetime] = Query(None, description="结束时间"),
@@ -423,7 +444,7 @@ async def get_audit_log_statistics(
 @router.get("/user-activities")
 async def get_user_activities(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     user_id: Optional[int] = Query(None, description="用户ID"),
     hours: int = Query(24, description="时间范围（小时）"),
@@ -477,7 +498,7 @@ async def get_user_activities(
 @router.get("/security-trends")
 async def get_security_trends(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     days: int = Query(7, description="天数"),
 ):
@@ -608,7 +629,7 @@ async def _get_security_alerts(
 @router.post("/audit-logs/search")
 async def search_audit_logs(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     search_params: Dict[str, Any],
 ):
@@ -693,7 +714,7 @@ async def search_audit_logs(
 @router.get("/audit-logs/user/{user_id}/history")
 async def get_user_operation_history(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     user_id: int,
     skip: int = Query(0, description="跳过记录数"),
@@ -734,7 +755,7 @@ async def get_user_operation_history(
 @router.get("/audit-logs/resource/{resource_type}/{resource_id}")
 async def get_resource_access_logs(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     resource_type: str,
     resource_id: str,
@@ -784,7 +805,7 @@ async def get_resource_access_logs(
 @router.get("/audit-logs/failed-operations")
 async def get_failed_operations(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, description="跳过记录数"),
     limit: int = Query(20, description="返回记录数"),
@@ -837,7 +858,7 @@ async def get_failed_operations(
 @router.get("/audit-logs/high-risk-operations")
 async def get_high_risk_operations(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, description="跳过记录数"),
     limit: int = Query(20, description="返回记录数"),
@@ -8,11 +8,13 @@ from fastapi import (
     Query,
     status,
 )
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.crud import crud_document
 from app.schemas.response import ResponseModel
+from app.utils.graph_export import EXPORT_FORMATS
 
 """
 AI向量化和智能分析API路由
@@ -451,6 +453,43 @@ async def get_analysis_status(
         )
 
 
+# ==================== 知识图谱API ====================
+
+
+@router.get("/knowledge-graph/export")
+def export_knowledge_graph(
+    format_type: str = Query(default="jsonl", pattern="^(jsonl|graphml|gexf)$"),
+    compress: bool = Query(default=True, description="是否gzip压缩"),
+    db: Session = Depends(deps.get_db),
+    current_user=Depends(deps.get_current_user),
+    kg_service=Depends(get_knowledge_graph_service),
+):
+    """
+    流式导出知识图谱
+
+    - **format_type**: 导出格式 jsonl/graphml/gexf
+    - **compress**: 是否gzip压缩
+    """
+    if kg_service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="知识图谱服务未启用"
+        )
+
+    filename = f"knowledge_graph.{format_type}"
+    media_type = EXPORT_FORMATS[format_type]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        kg_service.stream_graph_export(
+            db, format_type=format_type, compress=compress
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # ==================== 统计和监控API ====================
 
 
@@ -50,9 +50,10 @@ class CacheStrategy:
     max_size: Optional[int] = None  # 最大缓存项数
     eviction_policy: EvictionPolicy = EvictionPolicy.LRU
     compression: bool = False  # 是否压缩
-    serialization: str = "json"  # 序列化方式：json, pickle, msgpack
+    serialization: str = "json"  # 序列化方式：json, pickle, msgpack, orjson, float32
     key_prefix: str = ""  # 键前缀
     tags: List[str] = None  # 缓存标签
+    negative_ttl: Optional[int] = None  # 负缓存（不存在的结果）生存时间（秒）
 
     def __post_init__(self):
         if self.tags is None:
@@ -134,8 +135,7 @@ class CacheStrategyManager:
                 ttl=86400,  # 24小时
                 max_size=1000,
                 eviction_policy=EvictionPolicy.LFU,
-                compression=True,
-                serialization="pickle",
+                serialization="float32",  # 原始float32字节，几乎不可压缩
                 key_prefix="vector",
                 tags=["vector", "embedding"],
             ),
@@ -147,6 +147,7 @@ class CacheStrategyManager:
                 ttl=1800,  # 30分钟
                 max_size=300,
                 eviction_policy=EvictionPolicy.LRU,
+                serialization="orjson",
                 key_prefix="search",
                 tags=["search", "result"],
             ),
@@ -132,6 +132,9 @@ class AIConfig(BaseSettings):
     RELATION_CONFIDENCE_THRESHOLD: float = Field(
         default=0.7, description="关系置信度阈值"
     )
+    KNOWLEDGE_GRAPH_TRAVERSAL_MODE: str = Field(
+        default="memory", description="图遍历模式：memory(进程内图)/sql(递归CTE)"
+    )
 
     # === 文档分析配置 ===
     DOCUMENT_ANALYSIS_ENABLED: bool = Field(
@@ -280,6 +283,7 @@ class AIConfig(BaseSettings):
             "relation_extraction_model": self.RELATION_EXTRACTION_MODEL,
             "entity_confidence_threshold": self.ENTITY_CONFIDENCE_THRESHOLD,
             "relation_confidence_threshold": self.RELATION_CONFIDENCE_THRESHOLD,
+            "traversal_mode": self.KNOWLEDGE_GRAPH_TRAVERSAL_MODE,
         }
 
     def get_document_analysis_config(self) -> Dict[str, Any]:
@@ -354,6 +358,8 @@ class AIConfig(BaseSettings):
             errors.append("实体置信度阈值必须在0-1之间")
         if not (0 <= self.RELATION_CONFIDENCE_THRESHOLD <= 1):
             errors.append("关系置信度阈值必须在0-1之间")
+        if self.KNOWLEDGE_GRAPH_TRAVERSAL_MODE not in ("memory", "sql"):
+            errors.append("图遍历模式必须为memory或sql")
         if not (0 <= self.COMPLIANCE_THRESHOLD <= 1):
             errors.append("合规性阈值必须在0-1之间")
 
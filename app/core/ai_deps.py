@@ -41,7 +41,7 @@ def get_knowledge_graph_service() -> Optional[KnowledgeGraphService]:
     if not config.KNOWLEDGE_GRAPH_ENABLED:
         return None
 
-    return KnowledgeGraphService()
+    return KnowledgeGraphService(traversal_mode=config.KNOWLEDGE_GRAPH_TRAVERSAL_MODE)
 
 
 def get_cache_service() -> Optional[CacheManager]:
@@ -7,6 +7,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.request_memo import memoize
 
 # 密码加密上下文
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -117,6 +118,8 @@ class AuthManager:
     def verify_token(self, token: str, token_type: str = "access") -> dict:
         """验证JWT令牌
 
+        同一请求内重复验证同一令牌时复用首次的解码结果（认证中间件与路由依赖）
+
         Args:
             token: JWT令牌
             token_type: 令牌类型 (access/refresh)
@@ -127,6 +130,15 @@ class AuthManager:
         Raises:
             HTTPException: 令牌无效时抛出异常
         """
+        return dict(
+            memoize(
+                ("verify_token", token, token_type),
+                lambda: self._decode_token(token, token_type),
+            )
+        )
+
+    def _decode_token(self, token: str, token_type: str) -> dict:
+        """解码并校验JWT令牌"""
         try:
             payload = jwt.decode(
                 token,
@@ -5,13 +5,20 @@
 
 import logging
 import threading
+import time
 from collections import defaultdict, deque
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# 直方图精度: 每个2的幂区间划分为32个子桶, 相对误差约3%
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+# 响应时间以微秒记录, 超过60秒的值计入最后一个桶
+_MAX_TRACKABLE_US = 60_000_000
+
 
 @dataclass
 class CacheStats:
@@ -22,6 +29,12 @@ class CacheStats:
     total_requests: int = 0
     hit_rate: float = 0.0
     avg_response_time: float = 0.0
+    ewma_response_time: float = 0.0
+    p50_response_time: float = 0.0
+    p95_response_time: float = 0.0
+    p99_response_time: float = 0.0
+    max_response_time: float = 0.0
+    errors: int = 0
     cache_size: int = 0
     memory_usage: int = 0
     last_updated: datetime = None
@@ -49,109 +62,255 @@ class CacheOperation:
     error: Optional[str] = None
 
 
-class CacheMonitor:
-    """缓存监控器"""
-
-    def __init__(self, max_operations: int = 10000):
-        self.max_operations = max_operations
-        self.operations: deque = deque(maxlen=max_operations)
-        self.stats_by_type: Dict[str, CacheStats] = defaultdict(CacheStats)
-        self.global_stats = CacheStats()
-        self.lock = threading.RLock()
-
-        # 性能指标
-        self.response_times: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
-        self.hourly_stats: Dict[str, Dict[int, CacheStats]] = defaultdict(dict)
-
-        logger.info("缓存监控器已初始化")
-
-    def record_operation(self, operation: CacheOperation) -> None:
-        """记录缓存操作
-
-        Args:
-            operation: 缓存操作记录
-        """
-        with self.lock:
-            # 添加操作记录
-            self.operations.append(operation)
+class LatencyHistogram:
+    """HDR风格的对数-线性延迟直方图
 
-            # 更新统计数据
-            self._update_stats(operation)
+    记录为O(1)的桶计数，百分位在读取时按桶累加计算；
+    多个直方图可直接合并
+    """
 
-            # 记录响应时间
-            self.response_times[operation.cache_type].append(operation.response_time)
+    __slots__ = ("counts",)
+
+    size = (_MAX_TRACKABLE_US.bit_length() - _SUB_BUCKET_BITS + 1) * _SUB_BUCKET_COUNT
+
+    def __init__(self):
+        self.counts = [0] * self.size
+
+    @staticmethod
+    def _index(value_us: int) -> int:
+        if value_us < 2 * _SUB_BUCKET_COUNT:
+            return value_us
+        shift = value_us.bit_length() - _SUB_BUCKET_BITS - 1
+        return (shift + 1) * _SUB_BUCKET_COUNT + (value_us >> shift) - _SUB_BUCKET_COUNT
+
+    @staticmethod
+    def _upper_bound(index: int) -> int:
+        """桶内最大值（微秒）"""
+        if index < 2 * _SUB_BUCKET_COUNT:
+            return index
+        shift = index // _SUB_BUCKET_COUNT - 1
+        sub_bucket = index % _SUB_BUCKET_COUNT + _SUB_BUCKET_COUNT
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        value_us = min(max(int(seconds * 1_000_000), 0), _MAX_TRACKABLE_US)
+        self.counts[self._index(value_us)] += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def percentiles(self, *quantiles: float) -> List[float]:
+        """返回各分位数对应的响应时间（秒），单次遍历所有桶"""
+        values = [0.0] * len(quantiles)
+        total = sum(self.counts)
+        if total == 0:
+            return values
+
+        targets = sorted(
+            (max(1, int(q * total + 0.5)), i) for i, q in enumerate(quantiles)
+        )
+        seen = 0
+        position = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while position < len(targets) and seen >= targets[position][0]:
+                values[targets[position][1]] = self._upper_bound(index) / 1_000_000
+                position += 1
+            if position == len(targets):
+                break
+        return values
+
+
+class _TypeCounters:
+    """单个分片内某缓存类型的计数器"""
+
+    __slots__ = (
+        "hits",
+        "misses",
+        "errors",
+        "total_time",
+        "max_time",
+        "ewma",
+        "last_updated",
+        "histogram",
+    )
 
-            # 更新小时统计
-            self._update_hourly_stats(operation)
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.ewma = 0.0
+        self.last_updated = 0.0
+        self.histogram = LatencyHistogram()
 
-    def _update_stats(self, operation: CacheOperation) -> None:
-        """更新统计数据
 
-        Args:
-            operation: 缓存操作记录
-        """
-        # 更新类型统计
-        type_stats = self.stats_by_type[operation.cache_type]
-        type_stats.total_requests += 1
+class _Shard:
+    """线程私有的统计分片，只有所属线程写入，读取时合并"""
 
-        if operation.hit:
-            type_stats.hits += 1
-        else:
-            type_stats.misses += 1
+    __slots__ = ("types", "hourly")
 
-        # 重新计算命中率
-        type_stats.hit_rate = type_stats.hits / type_stats.total_requests
+    def __init__(self):
+        self.types: Dict[str, _TypeCounters] = {}
+        # (缓存类型, 小时) -> [命中数, 未命中数, 最后更新时间]
+        self.hourly: Dict[Tuple[str, int], list] = {}
 
-        # 更新平均响应时间
-        response_times = self.response_times[operation.cache_type]
-        if response_times:
-            type_stats.avg_response_time = sum(response_times) / len(response_times)
 
-        type_stats.last_updated = datetime.now()
+class CacheMonitor:
+    """缓存监控器
 
-        # 更新全局统计
-        self.global_stats.total_requests += 1
-        if operation.hit:
-            self.global_stats.hits += 1
-        else:
-            self.global_stats.misses += 1
+    记录路径不加锁：计数、响应时间累计、EWMA和直方图都写入当前线程的分片，
+    每次记录为O(1)；统计信息在读取时合并各分片得到
+    """
 
-        self.global_stats.hit_rate = (
-            self.global_stats.hits / self.global_stats.total_requests
-        )
+    def __init__(self, max_operations: int = 10000, ewma_alpha: float = 0.1):
+        self.max_operations = max_operations
+        self.operations: deque = deque(maxlen=max_operations)
+        self.ewma_alpha = ewma_alpha
+        self.lock = threading.RLock()
 
-        # 更新全局平均响应时间
-        all_times = []
-        for times in self.response_times.values():
-            all_times.extend(times)
+        self._shards: List[_Shard] = []
+        self._local = threading.local()
 
-        if all_times:
-            self.global_stats.avg_response_time = sum(all_times) / len(all_times)
+        logger.info("缓存监控器已初始化")
 
-        self.global_stats.last_updated = datetime.now()
+    def _shard(self) -> _Shard:
+        """获取当前线程的分片，首次使用时注册"""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            with self.lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
 
-    def _update_hourly_stats(self, operation: CacheOperation) -> None:
-        """更新小时统计
+    def record_operation(self, operation: CacheOperation) -> None:
+        """记录缓存操作
 
         Args:
             operation: 缓存操作记录
         """
-        hour = operation.timestamp.hour
-        cache_type = operation.cache_type
+        # deque.append本身是线程安全的
+        self.operations.append(operation)
 
-        if hour not in self.hourly_stats[cache_type]:
-            self.hourly_stats[cache_type][hour] = CacheStats()
-
-        hourly_stat = self.hourly_stats[cache_type][hour]
-        hourly_stat.total_requests += 1
+        shard = self._shard()
+        counters = shard.types.get(operation.cache_type)
+        if counters is None:
+            counters = shard.types[operation.cache_type] = _TypeCounters()
 
         if operation.hit:
-            hourly_stat.hits += 1
+            counters.hits += 1
+        else:
+            counters.misses += 1
+        if operation.error:
+            counters.errors += 1
+
+        response_time = operation.response_time
+        counters.total_time += response_time
+        if response_time > counters.max_time:
+            counters.max_time = response_time
+        if counters.hits + counters.misses == 1:
+            counters.ewma = response_time
         else:
-            hourly_stat.misses += 1
+            counters.ewma += self.ewma_alpha * (response_time - counters.ewma)
+        counters.histogram.record(response_time)
+        counters.last_updated = time.time()
+
+        # 更新小时统计
+        hourly_key = (operation.cache_type, operation.timestamp.hour)
+        hourly = shard.hourly.get(hourly_key)
+        if hourly is None:
+            hourly = shard.hourly[hourly_key] = [0, 0, 0.0]
+        hourly[0 if operation.hit else 1] += 1
+        hourly[2] = counters.last_updated
+
+    def _merged_counters(self) -> Dict[str, _TypeCounters]:
+        """合并所有分片的计数器"""
+        merged: Dict[str, _TypeCounters] = {}
+        for shard in list(self._shards):
+            for cache_type, counters in list(shard.types.items()):
+                target = merged.get(cache_type)
+                if target is None:
+                    target = merged[cache_type] = _TypeCounters()
+                self._merge_into(target, counters)
+        return merged
+
+    @staticmethod
+    def _merge_into(target: _TypeCounters, source: _TypeCounters) -> None:
+        count = source.hits + source.misses
+        total = target.hits + target.misses + count
+        if total:
+            # 各分片EWMA按请求数加权合并
+            target.ewma += (source.ewma - target.ewma) * count / total
+        target.hits += source.hits
+        target.misses += source.misses
+        target.errors += source.errors
+        target.total_time += source.total_time
+        target.max_time = max(target.max_time, source.max_time)
+        target.last_updated = max(target.last_updated, source.last_updated)
+        target.histogram.merge(source.histogram)
+
+    @staticmethod
+    def _to_stats(counters: _TypeCounters) -> CacheStats:
+        total = counters.hits + counters.misses
+        p50, p95, p99 = counters.histogram.percentiles(0.5, 0.95, 0.99)
+        return CacheStats(
+            hits=counters.hits,
+            misses=counters.misses,
+            total_requests=total,
+            avg_response_time=counters.total_time / total if total else 0.0,
+            ewma_response_time=counters.ewma,
+            p50_response_time=p50,
+            p95_response_time=p95,
+            p99_response_time=p99,
+            max_response_time=counters.max_time,
+            errors=counters.errors,
+            last_updated=(
+                datetime.fromtimestamp(counters.last_updated)
+                if counters.last_updated
+                else None
+            ),
+        )
 
-        hourly_stat.hit_rate = hourly_stat.hits / hourly_stat.total_requests
-        hourly_stat.last_updated = datetime.now()
+    @property
+    def stats_by_type(self) -> Dict[str, CacheStats]:
+        """各缓存类型的统计数据"""
+        return {
+            cache_type: self._to_stats(counters)
+            for cache_type, counters in self._merged_counters().items()
+        }
+
+    @property
+    def global_stats(self) -> CacheStats:
+        """全局统计数据"""
+        merged = _TypeCounters()
+        for counters in self._merged_counters().values():
+            self._merge_into(merged, counters)
+        return self._to_stats(merged)
+
+    @property
+    def hourly_stats(self) -> Dict[str, Dict[int, CacheStats]]:
+        """按小时的统计数据"""
+        merged: Dict[Tuple[str, int], list] = {}
+        for shard in list(self._shards):
+            for key, (hits, misses, updated) in list(shard.hourly.items()):
+                target = merged.setdefault(key, [0, 0, 0.0])
+                target[0] += hits
+                target[1] += misses
+                target[2] = max(target[2], updated)
+
+        result: Dict[str, Dict[int, CacheStats]] = defaultdict(dict)
+        for (cache_type, hour), (hits, misses, updated) in merged.items():
+            result[cache_type][hour] = CacheStats(
+                hits=hits,
+                misses=misses,
+                total_requests=hits + misses,
+                last_updated=datetime.fromtimestamp(updated),
+            )
+        return result
 
     def get_stats(self, cache_type: Optional[str] = None) -> Dict[str, Any]:
         """获取缓存统计信息
@@ -162,15 +321,18 @@ class CacheMonitor:
         Returns:
             Dict: 统计信息
         """
-        with self.lock:
-            if cache_type:
-                stats = self.stats_by_type.get(cache_type, CacheStats())
-                return asdict(stats)
-            else:
-                return {
-                    "global": asdict(self.global_stats),
-                    "by_type": {k: asdict(v) for k, v in self.stats_by_type.items()},
-                }
+        merged = self._merged_counters()
+        if cache_type:
+            counters = merged.get(cache_type)
+            return asdict(self._to_stats(counters) if counters else CacheStats())
+
+        global_counters = _TypeCounters()
+        for counters in merged.values():
+            self._merge_into(global_counters, counters)
+        return {
+            "global": asdict(self._to_stats(global_counters)),
+            "by_type": {k: asdict(self._to_stats(v)) for k, v in merged.items()},
+        }
 
     def get_performance_report(self, hours: int = 24) -> Dict[str, Any]:
         """获取性能报告
@@ -184,9 +346,9 @@ class CacheMonitor:
         with self.lock:
             cutoff_time = datetime.now() - timedelta(hours=hours)
 
-            # 过滤最近的操作
+            # 过滤最近的操作（记录不加锁，先取快照）
             recent_operations = [
-                op for op in self.operations if op.timestamp >= cutoff_time
+                op for op in list(self.operations) if op.timestamp >= cutoff_time
             ]
 
             # 按类型分组统计
@@ -206,6 +368,7 @@ class CacheMonitor:
             for op in recent_operations:
                 perf = type_performance[op.cache_type]
                 perf["total_requests"] += 1
+                perf["avg_response_time"] += op.response_time
 
                 if op.hit:
                     perf["hits"] += 1
@@ -223,20 +386,10 @@ class CacheMonitor:
                     perf["errors"] += 1
 
             # 计算平均值和命中率
-            for cache_type, perf in type_performance.items():
+            for perf in type_performance.values():
                 if perf["total_requests"] > 0:
                     perf["hit_rate"] = perf["hits"] / perf["total_requests"]
-
-                response_times = [
-                    op.response_time
-                    for op in recent_operations
-                    if op.cache_type == cache_type
-                ]
-
-                if response_times:
-                    perf["avg_response_time"] = sum(response_times) / len(
-                        response_times
-                    )
+                    perf["avg_response_time"] /= perf["total_requests"]
 
                 if perf["min_response_time"] == float("inf"):
                     perf["min_response_time"] = 0.0
@@ -271,7 +424,7 @@ class CacheMonitor:
                     "user_id": op.user_id,
                     "error": op.error,
                 }
-                for op in self.operations
+                for op in list(self.operations)
                 if op.response_time > threshold
             ]
 
@@ -293,7 +446,9 @@ class CacheMonitor:
             cutoff_time = datetime.now() - timedelta(hours=hours)
 
             error_ops = [
-                op for op in self.operations if op.timestamp >= cutoff_time and op.error
+                op
+                for op in list(self.operations)
+                if op.timestamp >= cutoff_time and op.error
             ]
 
             # 按错误类型分组
@@ -333,7 +488,7 @@ class CacheMonitor:
             # 清理旧操作记录
             old_count = len(self.operations)
             self.operations = deque(
-                (op for op in self.operations if op.timestamp >= cutoff_time),
+                (op for op in list(self.operations) if op.timestamp >= cutoff_time),
                 maxlen=self.max_operations,
             )
 
@@ -345,10 +500,9 @@ class CacheMonitor:
         """重置统计数据"""
         with self.lock:
             self.operations.clear()
-            self.stats_by_type.clear()
-            self.global_stats = CacheStats()
-            self.response_times.clear()
-            self.hourly_stats.clear()
+            # 替换分片集合，各线程下次记录时重新注册
+            self._shards = []
+            self._local = threading.local()
 
             logger.info("缓存统计数据已重置")
 
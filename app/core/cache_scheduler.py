@@ -14,6 +14,16 @@ from app.core.cache_monitor import get_cache_monitor
 logger = logging.getLogger(__name__)
 
 
+async def scheduled_cache_refresh():
+    """定时刷新缓存：按最新访问草图预取热点键"""
+    from app.services.cache_warmup import get_cache_warmup_service
+
+    results = await get_cache_warmup_service().warmup_predictive()
+    logger.debug(
+        f"Predictive refresh loaded {sum(r.items_loaded for r in results)} items"
+    )
+
+
 class CacheScheduler:
     """缓存定时任务调度器"""
 
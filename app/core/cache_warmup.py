@@ -17,12 +17,16 @@ async def startup_cache_warmup() -> Optional[bool]:
     """
     try:
         logger.info("Starting cache warmup process...")
-        
-        # 这里可以添加具体的缓存预热逻辑
-        # 例如：预加载常用数据、初始化缓存键等
-        
-        logger.info("Cache warmup completed successfully")
-        return True
+
+        # 按优先级预热，预测性任务根据上次运行积累的访问草图预取热点键
+        from app.services.cache_warmup import get_cache_warmup_service
+
+        results = await get_cache_warmup_service().warmup_all()
+
+        logger.info(
+            f"Cache warmup completed: {sum(r.items_loaded for r in results)} items"
+        )
+        return all(r.success for r in results)
         
     except Exception as e:
         logger.error(f"Cache warmup failed: {e}")
@@ -36,12 +36,27 @@ class Settings(BaseSettings):
     DATABASE_MAX_OVERFLOW: int = 30
     DATABASE_POOL_PRE_PING: bool = True
     DATABASE_POOL_RECYCLE: int = 3600
+    # 只读副本（逗号分隔，留空则全部走主库）；复制延迟超过上限的副本暂不使用
+    DATABASE_REPLICA_URLS: str = ""
+    DATABASE_REPLICA_MAX_LAG: float = 10.0
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL: float = 5.0
+    # 连接池遥测与自适应容量（DB_POOL_AUTOTUNE开启后按获取等待时间调整pool_size）
+    DB_POOL_CHECKOUT_WARN_SECONDS: float = 0.5
+    DB_POOL_AUTOTUNE: bool = False
+    DB_POOL_TUNING_INTERVAL: int = 60
+    DB_POOL_MIN_SIZE: int = 5
+    DB_POOL_MAX_SIZE: int = 50
+    DB_POOL_TARGET_WAIT: float = 0.05
+    DB_POOL_TUNING_STEP: int = 2
 
     # JWT配置
     JWT_SECRET_KEY: str = "your-jwt-secret-key"
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # 令牌吊销集合：黑名单检查由进程内集合应答，经Redis同步，定时以数据库全量重建
+    TOKEN_REVOCATION_CACHE: bool = True
+    TOKEN_REVOCATION_REBUILD_INTERVAL: int = 300
 
     # 超级用户配置
     FIRST_SUPERUSER_USERNAME: str = "admin"
@@ -115,6 +130,18 @@ class Settings(BaseSettings):
     SMTP_TLS: bool = True
     SMTP_FROM: str = "noreply@example.com"
 
+    # 审计日志与安全事件分区维护（保留天数留空则不清理；DETACH为True时只分离不删除）
+    PARTITION_MAINTENANCE_INTERVAL: int = 86400
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETENTION_DETACH: bool = False
+    AUDIT_LOG_RETENTION_DAYS: Optional[int] = None
+    SECURITY_EVENT_RETENTION_DAYS: Optional[int] = None
+
+    # 审计日志与安全事件统计汇总（执行间隔秒数、每批行数、汇总延迟秒数）
+    STATS_ROLLUP_INTERVAL: int = 300
+    STATS_ROLLUP_BATCH_SIZE: int = 5000
+    STATS_ROLLUP_LAG_SECONDS: int = 120
+
     # 缓存配置
     CACHE_ENABLED: bool = False
     REDIS_URL: Optional[str] = None
@@ -190,6 +217,12 @@ class Settings(BaseSettings):
         """将CORS允许的源转换为列表"""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def database_replica_urls_list(self) -> List[str]:
+        """将只读副本地址转换为列表"""
+        urls = self.DATABASE_REPLICA_URLS.split(",")
+        return [url.strip() for url in urls if url.strip()]
+
     @property
     def allowed_file_types_list(self) -> List[str]:
         """将允许的文件类型转换为列表"""
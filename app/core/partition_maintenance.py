@@ -0,0 +1,109 @@
+"""分区维护定时任务模块
+
+预先创建 audit_logs、security_events 未来月份的分区；
+配置了保留天数时按整月删除（或分离）过期分区
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.crud_audit_log import audit_log as audit_log_crud
+from app.crud.crud_security_event import security_event as security_event_crud
+from app.db.partitioning import PARTITIONED_TABLES, ensure_partitions
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def maintain_partitions(db: Session) -> Dict[str, List[str]]:
+    """为所有分区表预建分区，返回各表新建的分区名"""
+    months_ahead = getattr(settings, "PARTITION_MONTHS_AHEAD", 3)
+    return {
+        table: ensure_partitions(db, table, months_ahead=months_ahead)
+        for table in PARTITIONED_TABLES
+    }
+
+
+def apply_partition_retention(db: Session) -> Dict[str, int]:
+    """按配置的保留天数清理过期数据，未配置时跳过"""
+    detach = getattr(settings, "PARTITION_RETENTION_DETACH", False)
+    removed = {}
+
+    audit_days = getattr(settings, "AUDIT_LOG_RETENTION_DAYS", None)
+    if audit_days:
+        removed["audit_logs"] = audit_log_crud.cleanup_old_logs(
+            db, days=audit_days, detach=detach
+        )
+
+    event_days = getattr(settings, "SECURITY_EVENT_RETENTION_DAYS", None)
+    if event_days:
+        removed["security_events"] = security_event_crud.cleanup_old_events(
+            db, days=event_days, detach=detach
+        )
+
+    return removed
+
+
+def run_partition_maintenance() -> None:
+    """执行一次分区维护"""
+    db = SessionLocal()
+    try:
+        maintain_partitions(db)
+        apply_partition_retention(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Partition maintenance failed: {e}")
+    finally:
+        db.close()
+
+
+class PartitionMaintenanceScheduler:
+    """分区维护调度器"""
+
+    def __init__(self):
+        self.interval = getattr(settings, "PARTITION_MAINTENANCE_INTERVAL", 86400)
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """启动定时维护，启动时立即执行一次"""
+        if self.task is not None and not self.task.done():
+            logger.warning("Partition maintenance scheduler is already running")
+            return
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止定时维护"""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(run_partition_maintenance)
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in partition maintenance task: {e}")
+                await asyncio.sleep(self.interval)
+
+
+_partition_maintenance_scheduler: Optional[PartitionMaintenanceScheduler] = None
+
+
+def get_partition_maintenance_scheduler() -> PartitionMaintenanceScheduler:
+    """获取分区维护调度器实例"""
+    global _partition_maintenance_scheduler
+    if _partition_maintenance_scheduler is None:
+        _partition_maintenance_scheduler = PartitionMaintenanceScheduler()
+    return _partition_maintenance_scheduler
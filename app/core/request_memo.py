@@ -0,0 +1,81 @@
+"""请求级记忆化模块
+
+在单个请求内缓存重复的查找结果（令牌校验、黑名单检查、按ID查询等），
+请求结束即丢弃，不存在跨请求缓存的数据过期问题
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+# 未记忆化的标记，区别于记忆化的None/False结果
+NOT_MEMOIZED = object()
+
+_request_memo: ContextVar[Optional[Dict[Hashable, Any]]] = ContextVar(
+    "request_memo", default=None
+)
+_memo_bypassed: ContextVar[bool] = ContextVar("request_memo_bypassed", default=False)
+
+
+@contextmanager
+def request_memo_scope() -> Iterator[Dict[Hashable, Any]]:
+    """开启请求级记忆化作用域，退出时清空"""
+    memo: Dict[Hashable, Any] = {}
+    token = _request_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        memo.clear()
+        _request_memo.reset(token)
+
+
+@contextmanager
+def bypass_request_memo() -> Iterator[None]:
+    """在作用域内跳过记忆化，用于写操作前需要读取最新数据的场景"""
+    token = _memo_bypassed.set(True)
+    try:
+        yield
+    finally:
+        _memo_bypassed.reset(token)
+
+
+def _active_memo() -> Optional[Dict[Hashable, Any]]:
+    if _memo_bypassed.get():
+        return None
+    return _request_memo.get()
+
+
+def memo_get(key: Hashable) -> Any:
+    """读取记忆化结果，未命中返回NOT_MEMOIZED"""
+    memo = _active_memo()
+    if memo is None:
+        return NOT_MEMOIZED
+    return memo.get(key, NOT_MEMOIZED)
+
+
+def memo_set(key: Hashable, value: Any) -> None:
+    """写入记忆化结果，不在请求作用域内时忽略"""
+    memo = _active_memo()
+    if memo is not None:
+        memo[key] = value
+
+
+def memoize(key: Hashable, loader: Callable[[], Any]) -> Any:
+    """返回记忆化结果，未命中时调用loader并记录；loader抛出的异常不记录"""
+    value = memo_get(key)
+    if value is NOT_MEMOIZED:
+        value = loader()
+        memo_set(key, value)
+    return value
+
+
+def memo_invalidate(namespace: str) -> None:
+    """清除某一命名空间（键的第一个元素）下的所有记忆化结果
+
+    写操作后调用，后续读取重新查询
+    """
+    memo = _request_memo.get()
+    if not memo:
+        return
+    for key in [k for k in memo if isinstance(k, tuple) and k and k[0] == namespace]:
+        memo.pop(key, None)
@@ -0,0 +1,79 @@
+"""统计汇总定时任务模块
+
+按高水位增量汇总审计日志和安全事件到小时汇总表
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.crud.crud_stats_rollup import audit_log_rollup, security_event_rollup
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_stats_rollups() -> Dict[str, int]:
+    """执行一次增量汇总，返回各源表处理的行数"""
+    processed = {}
+    for rollup in (audit_log_rollup, security_event_rollup):
+        db = SessionLocal()
+        try:
+            processed[rollup.name] = rollup.refresh_all(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Stats rollup for {rollup.name} failed: {e}")
+            processed[rollup.name] = 0
+        finally:
+            db.close()
+    return processed
+
+
+class StatsRollupScheduler:
+    """统计汇总调度器"""
+
+    def __init__(self):
+        self.interval = getattr(settings, "STATS_ROLLUP_INTERVAL", 300)
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """启动定时汇总"""
+        if self.task is not None and not self.task.done():
+            logger.warning("Stats rollup scheduler is already running")
+            return
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止定时汇总"""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await asyncio.to_thread(refresh_stats_rollups)
+                logger.debug(f"Stats rollup processed: {processed}")
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in stats rollup task: {e}")
+                await asyncio.sleep(self.interval)
+
+
+_stats_rollup_scheduler: Optional[StatsRollupScheduler] = None
+
+
+def get_stats_rollup_scheduler() -> StatsRollupScheduler:
+    """获取统计汇总调度器实例"""
+    global _stats_rollup_scheduler
+    if _stats_rollup_scheduler is None:
+        _stats_rollup_scheduler = StatsRollupScheduler()
+    return _stats_rollup_scheduler
@@ -24,6 +24,8 @@ import psutil
 from sqlalchemy import text
 
 from app.core.config import settings
+from app.core.partition_maintenance import maintain_partitions
+from app.crud.crud_audit_log import audit_log as audit_log_crud
 from app.db.session import SessionLocal
 
 logger = logging.getLogger(__name__)
@@ -281,26 +283,32 @@ class SystemMaintenanceManager:
                 # 清理过期的审计日志
                 if options.get("cleanup_audit_logs", True):
                     days_to_keep = options.get("audit_log_retention_days", 90)
-                    cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+                    cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
 
-                    result = db.execute(
-                        text(
-                            """
-                        DELETE FROM audit_logs
-                        WHERE created_at < :cutoff_date
-                    """
-                        ),
-                        {"cutoff_date": cutoff_date},
+                    # 分区表按整月删除过期分区，避免大批量DELETE
+                    deleted_rows = audit_log_crud.cleanup_old_logs(
+                        db,
+                        days=days_to_keep,
+                        detach=options.get("detach_partitions", False),
                     )
 
                     results.append(
                         {
                             "operation": "cleanup_audit_logs",
-                            "deleted_rows": result.rowcount,
+                            "deleted_rows": deleted_rows,
                             "cutoff_date": cutoff_date.isoformat(),
                         }
                     )
 
+                # 预先创建未来月份的分区
+                if options.get("maintain_partitions", True):
+                    results.append(
+                        {
+                            "operation": "maintain_partitions",
+                            "created_partitions": maintain_partitions(db),
+                        }
+                    )
+
                 # 清理过期的用户会话
                 if options.get("cleanup_expired_sessions", True):
                     result = db.execute(
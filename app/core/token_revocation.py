@@ -0,0 +1,301 @@
+"""令牌吊销集合
+
+认证时的黑名单检查由进程内的吊销集合（jti -> 过期时间戳）应答，不再每个请求查询数据库：
+- 吊销写入数据库后，同时写入Redis有序集合（分值为过期时间）并发布通知，各worker订阅后增量更新
+- 启动、重连及定时全量重建以数据库为准，并合并Redis有序集合中的条目
+- 集合与数据库记录一一对应，数据库清理过期记录时同步移除
+- 订阅断开或发布失败期间集合不可用，检查回退到数据库查询
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.monitoring import Counter
+from app.db.session import SessionLocal
+from app.models.token_blacklist import TokenBlacklist
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_KEY = "token_revocation:revoked"
+REVOCATION_CHANNEL = "token_revocation:events"
+
+token_revocation_checks = Counter(
+    "token_revocation_checks_total",
+    "Token revocation checks by the source that answered them",
+    ["source"],
+)
+
+
+class RevocationSet:
+    """进程内的已吊销jti集合，与数据库中的黑名单记录一一对应"""
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # 与吊销通知保持同步时为True，否则检查结果不可信
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """加入吊销（过期时间已过的也保留，直至数据库清理该记录）"""
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def discard(self, jti: str) -> None:
+        """撤销吊销"""
+        with self._lock:
+            self._revoked.pop(jti, None)
+
+    def replace(self, entries: Dict[str, float]) -> None:
+        """以全量数据替换集合"""
+        revoked = dict(entries)
+        with self._lock:
+            self._revoked = revoked
+
+    def prune(self, before: float) -> int:
+        """移除过期时间早于before的条目（与数据库清理过期记录对应），返回移除数量"""
+        with self._lock:
+            expired = [jti for jti, exp in self._revoked.items() if exp < before]
+            for jti in expired:
+                del self._revoked[jti]
+        return len(expired)
+
+    def check(self, jti: str) -> Optional[bool]:
+        """jti是否已吊销；集合未就绪时返回None，由调用方查询数据库"""
+        if not self.ready:
+            return None
+        return jti in self._revoked
+
+
+def expiry_timestamp(expires_at: datetime) -> float:
+    """过期时间转时间戳；无时区的时间按UTC处理，与 datetime.utcnow() 的约定一致"""
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at.timestamp()
+
+
+def load_revocations() -> Dict[str, float]:
+    """从数据库读取全部吊销记录"""
+    db = SessionLocal()
+    try:
+        rows = db.query(TokenBlacklist.jti, TokenBlacklist.expires_at).all()
+        return {jti: expiry_timestamp(expires_at) for jti, expires_at in rows}
+    finally:
+        db.close()
+
+
+def _redis_client(client_class, **options):
+    redis_url = getattr(settings, "REDIS_URL", None)
+    if redis_url:
+        return client_class.from_url(redis_url, **options)
+    return client_class(
+        host=getattr(settings, "REDIS_HOST", "redis"),
+        port=getattr(settings, "REDIS_PORT", 6379),
+        password=getattr(settings, "REDIS_PASSWORD", None),
+        db=getattr(settings, "REDIS_DB", 0),
+        **options,
+    )
+
+
+def _queue_message(pipe, message: dict) -> None:
+    """将一条吊销变更写入Redis有序集合并发布通知"""
+    if message["op"] == "add":
+        pipe.zadd(REVOCATION_KEY, {message["jti"]: message["exp"]})
+    elif message["op"] == "remove":
+        pipe.zrem(REVOCATION_KEY, message["jti"])
+    elif message["op"] == "prune":
+        pipe.zremrangebyscore(REVOCATION_KEY, "-inf", f"({message['before']}")
+    pipe.publish(REVOCATION_CHANNEL, json.dumps(message))
+
+
+class TokenRevocationSync:
+    """维护吊销集合并与其他worker同步"""
+
+    def __init__(self):
+        self.enabled = getattr(settings, "TOKEN_REVOCATION_CACHE", True)
+        self.rebuild_interval = getattr(
+            settings, "TOKEN_REVOCATION_REBUILD_INTERVAL", 300
+        )
+        self.revocations = RevocationSet()
+        self.task: Optional[asyncio.Task] = None
+        self._publisher: Optional[redis.Redis] = None
+        # 发布失败、待同步任务重新发布的变更
+        self._unpublished: Deque[dict] = deque()
+
+    def check(self, jti: str) -> Optional[bool]:
+        """jti是否已吊销，集合不可用时返回None"""
+        revoked = self.revocations.check(jti)
+        token_revocation_checks.labels(
+            source="database" if revoked is None else "memory"
+        ).inc()
+        return revoked
+
+    def revoke(self, jti: str, expires_at: datetime) -> None:
+        """记录一次吊销（数据库事务提交后调用）"""
+        if not self.enabled:
+            return
+        exp = expiry_timestamp(expires_at)
+        self.revocations.add(jti, exp)
+        self._publish({"op": "add", "jti": jti, "exp": exp})
+
+    def restore(self, jti: str) -> None:
+        """撤销一次吊销（数据库事务提交后调用）"""
+        if not self.enabled:
+            return
+        self.revocations.discard(jti)
+        self._publish({"op": "remove", "jti": jti})
+
+    def prune(self, before: datetime) -> None:
+        """数据库清理过期记录后调用，移除过期时间早于before的条目"""
+        if not self.enabled:
+            return
+        timestamp = expiry_timestamp(before)
+        self.revocations.prune(timestamp)
+        self._publish({"op": "prune", "before": timestamp})
+
+    def _publish(self, message: dict) -> None:
+        """
+        写入Redis有序集合并通知其他worker
+
+        失败时本worker的检查回退到数据库，变更由同步任务重新发布后恢复
+        """
+        try:
+            if self._publisher is None:
+                self._publisher = _redis_client(
+                    redis.Redis, socket_connect_timeout=1, socket_timeout=1
+                )
+            pipe = self._publisher.pipeline()
+            _queue_message(pipe, message)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to publish token revocation change: {e}")
+            self._unpublished.append(message)
+            self.revocations.ready = False
+
+    async def _flush_unpublished(self, client) -> None:
+        """重新发布失败的变更，全部发布成功后恢复就绪"""
+        while self._unpublished:
+            message = self._unpublished[0]
+            pipe = client.pipeline()
+            _queue_message(pipe, message)
+            await pipe.execute()
+            self._unpublished.popleft()
+        self.revocations.ready = True
+        # 置为就绪期间又有发布失败时保持不可用，下一轮继续重发
+        if self._unpublished:
+            self.revocations.ready = False
+
+    def apply_message(self, data) -> None:
+        """应用其他worker（或本worker）发布的吊销通知"""
+        message = json.loads(data)
+        if message["op"] == "add":
+            self.revocations.add(message["jti"], float(message["exp"]))
+        elif message["op"] == "remove":
+            self.revocations.discard(message["jti"])
+        elif message["op"] == "prune":
+            self.revocations.prune(float(message["before"]))
+
+    async def rebuild(self, client) -> int:
+        """以数据库为准全量重建，合并Redis有序集合中的条目"""
+        entries = await asyncio.to_thread(load_revocations)
+        cached = await client.zrange(REVOCATION_KEY, 0, -1, withscores=True)
+        for jti, exp in cached:
+            jti = jti.decode("utf-8") if isinstance(jti, bytes) else jti
+            entries.setdefault(jti, float(exp))
+        self.revocations.replace(entries)
+        return len(entries)
+
+    async def start(self):
+        """启动吊销同步"""
+        if not self.enabled:
+            return
+        if self.task is not None and not self.task.done():
+            logger.warning("Token revocation sync is already running")
+            return
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止吊销同步"""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _run(self):
+        retry_delay = 1.0
+        while True:
+            client = _redis_client(aioredis.Redis)
+            pubsub = client.pubsub()
+            try:
+                # 先订阅再重建，重建期间发布的通知在重建完成后应用，不会丢失
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                count = await self.rebuild(client)
+                await self._flush_unpublished(client)
+                retry_delay = 1.0
+                logger.info(f"Token revocation set loaded with {count} entries")
+                await self._listen(pubsub, client)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"Token revocation sync disconnected: {e}")
+            finally:
+                # 断开期间可能错过通知，检查回退到数据库直至重新同步
+                self.revocations.ready = False
+                try:
+                    await pubsub.close()
+                    await client.close()
+                except Exception:
+                    pass
+
+            try:
+                await asyncio.sleep(retry_delay)
+            except asyncio.CancelledError:
+                break
+            retry_delay = min(retry_delay * 2, 30.0)
+
+    async def _listen(self, pubsub, client):
+        loop = asyncio.get_running_loop()
+        next_rebuild = loop.time() + self.rebuild_interval
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=1.0
+            )
+            if message is not None:
+                try:
+                    self.apply_message(message["data"])
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error(f"Invalid token revocation message: {e}")
+
+            if self._unpublished:
+                await self._flush_unpublished(client)
+
+            now = loop.time()
+            if now >= next_rebuild:
+                await self.rebuild(client)
+                next_rebuild = now + self.rebuild_interval
+
+
+_token_revocation: Optional[TokenRevocationSync] = None
+
+
+def get_token_revocation() -> TokenRevocationSync:
+    """获取令牌吊销同步实例"""
+    global _token_revocation
+    if _token_revocation is None:
+        _token_revocation = TokenRevocationSync()
+    return _token_revocation
@@ -1,4 +1,5 @@
 from .crud_document import crud_document as document
+from .crud_knowledge_graph import knowledge_graph, knowledge_graph_relation
 from .crud_ocr import ocr_result
 from .crud_project import issue, project, project_comparison
 from .crud_token_blacklist import token_blacklist
@@ -16,4 +17,6 @@ __all__ = [
     "document_vector",
     "vector_search_index",
     "search_query",
+    "knowledge_graph",
+    "knowledge_graph_relation",
 ]
@@ -1,11 +1,17 @@
+import copy
 import hashlib
+import itertools
 import json
 from datetime import datetime, timedelta
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.request_memo import NOT_MEMOIZED, memo_get, memo_invalidate, memo_set
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -15,21 +21,48 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 class SimpleCache:
     """简单的内存缓存实现"""
 
-    def __init__(self, default_ttl: int = 300):
+    def __init__(self, default_ttl: int = 300, sweep_threshold: int = 1000):
         self._cache = {}
         self._ttl = default_ttl
+        # 命名空间版本号：写操作递增，旧版本的键不再被读取，随过期清理
+        self._versions: Dict[str, int] = {}
+        self._sweep_threshold = sweep_threshold
+        self._sweep_at = sweep_threshold
 
     def get(self, key: str) -> Any:
         if key in self._cache:
-            value, timestamp = self._cache[key]
-            if datetime.now() - timestamp < timedelta(seconds=self._ttl):
+            value, timestamp, ttl = self._cache[key]
+            if datetime.now() - timestamp < timedelta(seconds=ttl):
                 return value
             else:
                 del self._cache[key]
         return None
 
-    def set(self, key: str, value: Any) -> None:
-        self._cache[key] = (value, datetime.now())
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        if len(self._cache) >= self._sweep_at:
+            self._sweep()
+        self._cache[key] = (value, datetime.now(), ttl or self._ttl)
+
+    def _sweep(self) -> None:
+        """清理过期条目（含旧版本命名空间下不会再被读取的键）"""
+        now = datetime.now()
+        for key in [
+            key
+            for key, (_, timestamp, ttl) in self._cache.items()
+            if now - timestamp >= timedelta(seconds=ttl)
+        ]:
+            del self._cache[key]
+        self._sweep_at = max(self._sweep_threshold, len(self._cache) * 2)
+
+    def get_version(self, namespace: str) -> int:
+        """命名空间当前版本号"""
+        return self._versions.get(namespace, 0)
+
+    def bump_version(self, namespace: str) -> int:
+        """递增命名空间版本号，使该命名空间下已缓存的键全部失效"""
+        version = self._versions.get(namespace, 0) + 1
+        self._versions[namespace] = version
+        return version
 
     def delete(self, key: str) -> None:
         if key in self._cache:
@@ -42,6 +75,47 @@ class SimpleCache:
 # 全局缓存实例
 cache = SimpleCache()
 
+# 负缓存哨兵：记录查询结果为空，避免不存在的ID反复穿透到数据库
+_NEGATIVE = object()
+
+# 会话内已flush、待提交后清除缓存的 (模型名, ID)
+_PENDING_EVICTIONS = "crud_cache_evictions"
+
+
+def get_cache_key(namespace: str, id: Any) -> str:
+    """按ID获取的缓存键，不带版本号，仅在该记录写入时精确清除"""
+    return f"{namespace}:get:{id}"
+
+
+def evict_cached(namespace: str, id: Any = None) -> None:
+    """清除模型的缓存：版本化的键整体失效，按ID的键精确清除"""
+    cache.bump_version(namespace)
+    memo_invalidate(namespace)
+    if id is not None:
+        cache.delete(get_cache_key(namespace, id))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_cache_evictions(session: Session, flush_context) -> None:
+    """记录flush写入的记录，覆盖未经CRUDBase.create/update/remove的写路径"""
+    pending = session.info.setdefault(_PENDING_EVICTIONS, set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        pending.add((type(obj).__name__, getattr(obj, "id", None)))
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session: Session) -> None:
+    """事务提交后清除写入记录的缓存"""
+    for namespace, id in session.info.pop(_PENDING_EVICTIONS, ()):
+        evict_cached(namespace, id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_evictions(session: Session, transaction) -> None:
+    """事务回滚时丢弃待清除记录（提交时已在after_commit中处理）"""
+    if transaction.parent is None:
+        session.info.pop(_PENDING_EVICTIONS, None)
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
@@ -56,29 +130,82 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model = model
         self.cache_enabled = True
         self.cache_ttl = 300  # 5分钟
+        self.negative_cache_ttl = 30  # 不存在的记录只短暂缓存
 
-    def _generate_cache_key(self, method: str, **kwargs) -> str:
-        """生成缓存键"""
+    def _key_digest(self, method: str, **kwargs) -> str:
+        """方法名及参数的摘要"""
         key_data = {"model": self.model.__name__, "method": method, **kwargs}
         key_str = json.dumps(key_data, sort_keys=True, default=str)
         # 使用SHA256哈希（用于缓存键，非安全用途）
         return hashlib.sha256(key_str.encode()).hexdigest()[:16]
 
+    def _generate_cache_key(self, method: str, **kwargs) -> str:
+        """生成缓存键，带模型命名空间的当前版本号，本模型写操作后自动失效"""
+        namespace = self.model.__name__
+        digest = self._key_digest(method, **kwargs)
+        return f"{namespace}:v{cache.get_version(namespace)}:{digest}"
+
+    def _stats_cache_key(self, method: str, **kwargs) -> str:
+        """
+        统计类结果的缓存键，不带版本号，只随短TTL过期
+
+        审计日志等持续写入的表每次提交都会递增版本号，版本化的键几乎无法命中
+        """
+        namespace = self.model.__name__
+        return f"{namespace}:stats:{method}:{self._key_digest(method, **kwargs)}"
+
+    def _get_cache_key(self, id: Any) -> str:
+        """按ID获取的缓存键，不带版本号，仅在该记录写入时精确清除"""
+        return get_cache_key(self.model.__name__, id)
+
     def _get_from_cache(self, cache_key: str) -> Any:
         """从缓存获取数据"""
         if not self.cache_enabled:
             return None
         return cache.get(cache_key)
 
-    def _set_cache(self, cache_key: str, value: Any) -> None:
+    def _set_cache(self, cache_key: str, value: Any, ttl: Optional[int] = None) -> None:
         """设置缓存"""
         if self.cache_enabled:
-            cache.set(cache_key, value)
+            cache.set(cache_key, value, ttl)
 
     def _invalidate_cache_pattern(self, pattern: str) -> None:
-        """根据模式清除缓存"""
-        # 简单实现：清除所有相关模型的缓存
-        cache.clear()
+        """使命名空间（模型名）下的版本化缓存失效，不影响其他模型"""
+        cache.bump_version(pattern)
+        memo_invalidate(pattern)
+
+    def _invalidate_cache(self, id: Any = None) -> None:
+        """写操作后清除本模型的缓存：版本化的键整体失效，按ID的键精确清除"""
+        evict_cached(self.model.__name__, id)
+
+    def _to_cache(self, obj: ModelType) -> Dict[str, Any]:
+        """ORM对象序列化为列值字典后再缓存，避免缓存脱离会话的对象"""
+        return {
+            attr.key: getattr(obj, attr.key)
+            for attr in inspect(obj).mapper.column_attrs
+        }
+
+    def _from_cache(self, db: Session, data: Dict[str, Any]) -> Optional[ModelType]:
+        """由缓存的列值还原对象并关联到当前会话，不发出查询"""
+        mapper = inspect(self.model)
+        obj = mapper.class_manager.new_instance()
+        for key, value in copy.deepcopy(data).items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        attached = self._attach(db, obj)
+        return None if attached is NOT_MEMOIZED else attached
+
+    @staticmethod
+    def _attach(db: Session, obj: Optional[ModelType]) -> Optional[ModelType]:
+        """将请求内记忆化的对象关联到当前会话，不发出查询"""
+        if obj is None:
+            return None
+        try:
+            if obj in db:
+                return obj
+            return db.merge(obj, load=False)
+        except Exception:
+            return NOT_MEMOIZED
 
     def enable_cache(self, ttl: int = 300) -> None:
         """启用缓存"""
@@ -90,20 +217,37 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.cache_enabled = False
 
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        """获取单个记录（支持缓存）"""
-        cache_key = self._generate_cache_key("get", id=id)
+        """获取单个记录（支持缓存，同一请求内重复获取复用首次结果）"""
+        memo_key = (self.model.__name__, "get", id)
+        memoized = memo_get(memo_key)
+        if memoized is not NOT_MEMOIZED:
+            attached = self._attach(db, memoized)
+            if attached is not NOT_MEMOIZED:
+                return attached
+
+        cache_key = self._get_cache_key(id)
 
         # 尝试从缓存获取
         cached_result = self._get_from_cache(cache_key)
+        if cached_result is _NEGATIVE:
+            return None
         if cached_result is not None:
-            return cached_result
+            result = self._from_cache(db, cached_result)
+            if result is not None:
+                memo_set(memo_key, result)
+                return result
 
         # 从数据库查询
         result = db.query(self.model).filter(self.model.id == id).first()
+        memo_set(memo_key, result)
 
-        # 缓存结果
+        # 缓存结果，不存在的记录写入负缓存（create时按ID清除）
+        if not self.cache_enabled:
+            return result
         if result:
-            self._set_cache(cache_key, result)
+            self._set_cache(cache_key, self._to_cache(result))
+        else:
+            self._set_cache(cache_key, _NEGATIVE, self.negative_cache_ttl)
 
         return result
 
@@ -116,13 +260,16 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         # 尝试从缓存获取
         cached_result = self._get_from_cache(cache_key)
         if cached_result is not None:
-            return cached_result
+            result = [self._from_cache(db, data) for data in cached_result]
+            if None not in result:
+                return result
 
         # 从数据库查询
         result = db.query(self.model).offset(skip).limit(limit).all()
 
         # 缓存结果
-        self._set_cache(cache_key, result)
+        if self.cache_enabled:
+            self._set_cache(cache_key, [self._to_cache(obj) for obj in result])
 
         return result
 
@@ -135,7 +282,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
 
         # 清除相关缓存
-        self._invalidate_cache_pattern(f"{self.model.__name__}")
+        self._invalidate_cache(db_obj.id)
 
         return db_obj
 
@@ -161,7 +308,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
 
         # 清除相关缓存
-        self._invalidate_cache_pattern(f"{self.model.__name__}")
+        self._invalidate_cache(db_obj.id)
 
         return db_obj
 
@@ -173,6 +320,6 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.commit()
 
             # 清除相关缓存
-            self._invalidate_cache_pattern(f"{self.model.__name__}")
+            self._invalidate_cache(id)
 
         return obj
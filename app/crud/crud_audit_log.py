@@ -3,13 +3,17 @@
 提供审计日志的创建、查询、统计等功能
 """
 
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, asc, desc, func, or_
+from sqlalchemy import and_, asc, desc, func, or_, text
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
+from app.crud.crud_stats_rollup import audit_log_rollup
+from app.crud.pagination import Page, paginate
+from app.db.partitioning import drop_partitions_before, is_partitioned
 from app.models.audit_log import AuditLog
 from app.schemas.security_monitor import AuditLogCreate
 
@@ -17,6 +21,8 @@ from app.schemas.security_monitor import AuditLogCreate
 class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
     """审计日志CRUD操作类"""
 
+    stats_cache_ttl = 30  # 统计结果短时缓存（秒）
+
     def create_log(
         self,
         db: Session,
@@ -71,9 +77,11 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        # 清除该ID可能存在的负缓存
+        self._invalidate_cache(db_obj.id)
         return db_obj
 
-    def search(
+    def _search_query(
         self,
         db: Session,
         *,
@@ -88,12 +96,8 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
         end_time: Optional[datetime] = None,
         session_id: Optional[str] = None,
         trace_id: Optional[str] = None,
-        skip: int = 0,
-        limit: int = 100,
-        order_by: str = "created_at",
-        order_desc: bool = True,
-    ) -> List[AuditLog]:
-        """搜索审计日志"""
+    ):
+        """构建搜索过滤条件"""
         query = db.query(self.model)
 
         # 添加过滤条件
@@ -131,6 +135,21 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
         if end_time:
             query = query.filter(self.model.created_at <= end_time)
 
+        return query
+
+    def search(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        **filters: Any,
+    ) -> List[AuditLog]:
+        """搜索审计日志（偏移分页，深分页请使用search_page）"""
+        query = self._search_query(db, **filters)
+
         # 排序
         if hasattr(self.model, order_by):
             order_column = getattr(self.model, order_by)
@@ -143,61 +162,32 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
 
         return query.offset(skip).limit(limit).all()
 
-    def count(
+    def search_page(
         self,
         db: Session,
         *,
-        user_id: Optional[int] = None,
-        username: Optional[str] = None,
-        action: Optional[str] = None,
-        resource_type: Optional[str] = None,
-        resource_id: Optional[str] = None,
-        ip_address: Optional[str] = None,
-        status: Optional[str] = None,
-        start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None,
-        session_id: Optional[str] = None,
-        trace_id: Optional[str] = None,
-    ) -> int:
-        """统计符合条件的审计日志数量"""
-        query = db.query(self.model)
-
-        # 添加过滤条件（与search方法相同的过滤逻辑）
-        if user_id is not None:
-            query = query.filter(self.model.user_id == user_id)
-
-        if username:
-            query = query.filter(self.model.username.ilike(f"%{username}%"))
-
-        if action:
-            query = query.filter(self.model.action.ilike(f"%{action}%"))
-
-        if resource_type:
-            query = query.filter(self.model.resource_type == resource_type)
-
-        if resource_id:
-            query = query.filter(self.model.resource_id == resource_id)
-
-        if ip_address:
-            query = query.filter(self.model.ip_address == ip_address)
-
-        if status:
-            query = query.filter(self.model.status == status)
-
-        if session_id:
-            query = query.filter(self.model.session_id == session_id)
-
-        if trace_id:
-            query = query.filter(self.model.trace_id == trace_id)
-
-        # 时间范围过滤
-        if start_time:
-            query = query.filter(self.model.created_at >= start_time)
-
-        if end_time:
-            query = query.filter(self.model.created_at <= end_time)
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        with_total: bool = False,
+        **filters: Any,
+    ) -> Page:
+        """按游标分页搜索审计日志"""
+        return paginate(
+            db,
+            self._search_query(db, **filters),
+            self.model,
+            order_by=order_by,
+            order_desc=order_desc,
+            cursor=cursor,
+            limit=limit,
+            with_total=with_total,
+        )
 
-        return query.count()
+    def count(self, db: Session, **filters: Any) -> int:
+        """统计符合条件的审计日志数量"""
+        return self._search_query(db, **filters).count()
 
     def get_statistics(
         self,
@@ -207,6 +197,52 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
         end_time: Optional[datetime] = None,
     ) -> Dict[str, Any]:
         """获取审计日志统计信息"""
+        cache_key = self._stats_cache_key(
+            "get_statistics", start_time=start_time, end_time=end_time
+        )
+        cached_result = self._get_from_cache(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+        # 按操作、状态、用户分组计数：完整小时读取汇总表，其余聚合原始行
+        grouped = audit_log_rollup.grouped_counts(
+            db,
+            ("action", "status", "user_id"),
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+        security_actions = {
+            "login",
+            "logout",
+            "login_failed",
+            "password_change",
+            "permission_change",
+            "role_change",
+            "account_locked",
+        }
+        total_logs = failed_logs = security_logs = 0
+        status_counts: Counter = Counter()
+        action_counts: Counter = Counter()
+        user_counts: Counter = Counter()
+        for (action, status, user_id), count in grouped.items():
+            total_logs += count
+            if status in ("failed", "error"):
+                failed_logs += count
+            if action in security_actions:
+                security_logs += count
+            status_counts[status] += count
+            action_counts[action] += count
+            if user_id is not None:
+                user_counts[user_id] += count
+
+        # 按用户ID计数，用户名取该用户最近一条记录中的值
+        top_users = user_counts.most_common(10)
+        usernames = audit_log_rollup.latest_usernames(
+            db, [user_id for user_id, _ in top_users]
+        )
+
+        # IP不是汇总维度，仍按原始行统计
         query = db.query(self.model)
 
         # 时间范围过滤
@@ -216,43 +252,6 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
         if end_time:
             query = query.filter(self.model.created_at <= end_time)
 
-        # 总数统计
-        total_logs = query.count()
-
-        # 按状态统计
-        status_stats = (
-            query.with_entities(
-                self.model.status, func.count(self.model.id).label("count")
-            )
-            .group_by(self.model.status)
-            .all()
-        )
-
-        # 按操作类型统计
-        action_stats = (
-            query.with_entities(
-                self.model.action, func.count(self.model.id).label("count")
-            )
-            .group_by(self.model.action)
-            .order_by(desc("count"))
-            .limit(10)
-            .all()
-        )
-
-        # 按用户统计
-        user_stats = (
-            query.filter(self.model.user_id.isnot(None))
-            .with_entities(
-                self.model.user_id,
-                self.model.username,
-                func.count(self.model.id).label("count"),
-            )
-            .group_by(self.model.user_id, self.model.username)
-            .order_by(desc("count"))
-            .limit(10)
-            .all()
-        )
-
         # 按IP统计
         ip_stats = (
             query.filter(self.model.ip_address.isnot(None))
@@ -265,42 +264,58 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
             .all()
         )
 
-        # 失败操作统计
-        failed_logs = query.filter(self.model.status.in_(["failed", "error"])).count()
-
-        # 安全相关操作统计
-        security_actions = [
-            "login",
-            "logout",
-            "login_failed",
-            "password_change",
-            "permission_change",
-            "role_change",
-            "account_locked",
-        ]
-        security_logs = query.filter(self.model.action.in_(security_actions)).count()
-
-        return {
+        result = {
             "total_logs": total_logs,
             "failed_logs": failed_logs,
             "security_logs": security_logs,
-            "status_distribution": {stat.status: stat.count for stat in status_stats},
+            "status_distribution": dict(status_counts),
             "top_actions": [
-                {"action": stat.action, "count": stat.count} for stat in action_stats
+                {"action": action, "count": count}
+                for action, count in action_counts.most_common(10)
             ],
             "top_users": [
                 {
-                    "user_id": stat.user_id,
-                    "username": stat.username,
-                    "count": stat.count,
+                    "user_id": user_id,
+                    "username": usernames.get(user_id),
+                    "count": count,
                 }
-                for stat in user_stats
+                for user_id, count in top_users
             ],
             "top_ips": [
                 {"ip_address": stat.ip_address, "count": stat.count}
                 for stat in ip_stats
             ],
         }
+        self._set_cache(cache_key, result, self.stats_cache_ttl)
+        return result
+
+    def get_activity_counts(self, db: Session, *, since: datetime) -> Dict[str, int]:
+        """获取时间点之后的活动计数（单次扫描，短时缓存）"""
+        cache_key = self._stats_cache_key("get_activity_counts", since=since)
+        cached_result = self._get_from_cache(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+        counts = (
+            db.query(
+                func.count(self.model.id).label("total"),
+                func.count(self.model.id)
+                .filter(self.model.status.in_(["failed", "error"]))
+                .label("failed"),
+                func.count(self.model.id)
+                .filter(
+                    and_(self.model.action == "login", self.model.status == "failed")
+                )
+                .label("failed_logins"),
+                func.count(func.distinct(self.model.user_id)).label("active_users"),
+            )
+            .filter(self.model.created_at >= since)
+            .one()
+        )
+
+        result = dict(counts._mapping)
+        self._set_cache(cache_key, result, self.stats_cache_ttl)
+        return result
 
     def get_user_activity(
         self,
@@ -473,9 +488,7 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
                 )
             )
             .group_by(self.model.user_id, self.model.username)
-            .having(
-                func.count(func.distinct(self.model.ip_address)) >= 3  # 3个以上不同IP
-            )
+            .having(func.count(func.distinct(self.model.ip_address)) >= 3)  # 3个以上不同IP
             .order_by(desc("unique_ips"))
             .all()
         )
@@ -511,10 +524,27 @@ class CRUDAuditLog(CRUDBase[AuditLog, AuditLogCreate, Dict[str, Any]]):
             "night_activities": night_activities,
         }
 
-    def cleanup_old_logs(self, db: Session, *, days: int = 90) -> int:
-        """清理旧的审计日志"""
+    def cleanup_old_logs(
+        self, db: Session, *, days: int = 90, detach: bool = False
+    ) -> int:
+        """
+        清理旧的审计日志
+
+        分区表按整月删除（或分离）过期分区，仅对默认分区按行删除；
+        未分区时按行删除
+        """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
 
+        table = self.model.__tablename__
+        if is_partitioned(db, table):
+            removed = drop_partitions_before(db, table, cutoff_date, detach=detach)
+            deleted_count = db.execute(
+                text(f'DELETE FROM "{table}_default" WHERE created_at < :cutoff'),
+                {"cutoff": cutoff_date},
+            ).rowcount
+            db.commit()
+            return deleted_count + sum(removed.values())
+
         # 删除指定天数之前的日志
         deleted_count = (
             db.query(self.model).filter(self.model.created_at < cutoff_date).delete()
@@ -1,10 +1,13 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import func, or_
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.crud.base import CRUDBase
+from app.crud.pagination import Page, capped_count, paginate
+from app.crud.search import ranked_search, similarity_rank, text_search_filter
 from app.models.document import Document
 from app.schemas.document import DocumentCreate, DocumentUpdate
 
@@ -21,8 +24,16 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        # 清除该ID可能存在的负缓存
+        self._invalidate_cache(db_obj.id)
         return db_obj
 
+    def get_by_ids(self, db: Session, *, ids: List[int]) -> List[Document]:
+        """根据ID列表批量获取文档(单次IN查询)"""
+        if not ids:
+            return []
+        return db.query(self.model).filter(self.model.id.in_(ids)).all()
+
     def get_by_uploader(
         self, db: Session, *, uploader_id: int, skip: int = 0, limit: int = 100
     ) -> List[Document]:
@@ -71,6 +82,36 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
 
         return query.offset(skip).limit(limit).all()
 
+    # 参与搜索的列；相关度只按短文本列计算，避免对全文逐行求相似度
+    search_columns = (
+        Document.filename,
+        Document.original_filename,
+        Document.summary,
+        Document.extracted_text,
+        Document.ocr_text,
+        Document.keywords,
+    )
+    rank_columns = (
+        Document.filename,
+        Document.original_filename,
+        Document.summary,
+        Document.keywords,
+    )
+
+    def _search_query(
+        self, db: Session, *, query: str, project_id: Optional[int] = None
+    ):
+        """构建文档搜索条件"""
+        query_obj = db.query(self.model).filter(
+            text_search_filter(db, self.search_columns, query)
+        )
+
+        # 如果指定了项目ID，则只在该项目中搜索
+        if project_id is not None:
+            query_obj = query_obj.filter(Document.project_id == project_id)
+
+        return query_obj
+
     def search_documents(
         self,
         db: Session,
@@ -80,43 +121,61 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         limit: int = 100,
         project_id: Optional[int] = None,
     ) -> List[Document]:
-        """搜索文档（按文件名、摘要、提取的文本内容和OCR文本）"""
-        search_filter = or_(
-            Document.filename.contains(query),
-            Document.original_filename.contains(query),
-            Document.summary.contains(query),
-            Document.extracted_text.contains(query),
-            Document.ocr_text.contains(query),
-            Document.keywords.contains(query),
-        )
-
-        query_obj = db.query(self.model).filter(search_filter)
+        """搜索文档（按文件名、摘要、提取的文本内容和OCR文本），按相关度排序"""
+        return self.search_documents_ranked(
+            db, query=query, project_id=project_id, skip=skip, limit=limit
+        ).items
 
-        # 如果指定了项目ID，则只在该项目中搜索
-        if project_id is not None:
-            query_obj = query_obj.filter(Document.project_id == project_id)
+    def search_documents_ranked(
+        self,
+        db: Session,
+        *,
+        query: str,
+        project_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Page:
+        """按相关度分页搜索文档，同一查询中返回（封顶的）总数"""
+        return ranked_search(
+            db,
+            self._search_query(db, query=query, project_id=project_id),
+            self.model,
+            similarity_rank(db, self.rank_columns, query),
+            skip=skip,
+            limit=limit,
+        )
 
-        return query_obj.offset(skip).limit(limit).all()
+    def search_documents_page(
+        self,
+        db: Session,
+        *,
+        query: str,
+        project_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        with_total: bool = False,
+    ) -> Page:
+        """按游标分页搜索文档，按创建时间倒序"""
+        return paginate(
+            db,
+            self._search_query(db, query=query, project_id=project_id),
+            self.model,
+            cursor=cursor,
+            limit=limit,
+            with_total=with_total,
+        )
 
     def search_documents_count(
         self, db: Session, *, query: str, project_id: Optional[int] = None
     ) -> int:
-        """获取搜索结果总数"""
-        search_filter = or_(
-            Document.filename.contains(query),
-            Document.original_filename.contains(query),
-            Document.summary.contains(query),
-            Document.extracted_text.contains(query),
-            Document.ocr_text.contains(query),
-            Document.keywords.contains(query),
+        """获取搜索结果总数（封顶计数）"""
+        total, _ = capped_count(
+            db,
+            self._search_query(db, query=query, project_id=project_id),
+            self.model,
+            getattr(settings, "PAGINATION_COUNT_CAP", 10000),
         )
-
-        query_obj = db.query(self.model).filter(search_filter)
-
-        if project_id is not None:
-            query_obj = query_obj.filter(Document.project_id == project_id)
-
-        return query_obj.count()
+        return total
 
     def get_unprocessed_documents(
         self, db: Session, *, skip: int = 0, limit: int = 100
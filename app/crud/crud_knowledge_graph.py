@@ -0,0 +1,350 @@
+"""知识图谱CRUD操作
+
+提供实体搜索, 以及基于PostgreSQL递归CTE(WITH RECURSIVE)的图遍历,
+无需在每个worker中加载完整图谱
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.vector import KnowledgeGraph, KnowledgeGraphRelation
+from app.schemas.vector import KnowledgeGraphNodeCreate, KnowledgeGraphRelationCreate
+
+# 图遍历递归查询模板
+# - 路径数组用于环检测, depth用于深度限制
+# - 同一实体可能经由多条路径到达, 最终只保留深度最小的一条
+_TRAVERSAL_SQL = """
+WITH RECURSIVE edges AS (
+    {edges}
+),
+traversal(entity_id, depth, path, relation_type, confidence) AS (
+    SELECT e.to_id, 1, ARRAY[e.from_id, e.to_id]::varchar[], e.relation_type,
+           e.confidence
+    FROM edges e
+    {node_join}
+    WHERE e.from_id = :start_id
+  UNION ALL
+    SELECT e.to_id, t.depth + 1, t.path || e.to_id::varchar, e.relation_type,
+           e.confidence
+    FROM traversal t
+    JOIN edges e ON e.from_id = t.entity_id
+    {node_join}
+    WHERE t.depth < :max_depth
+      AND NOT e.to_id = ANY(t.path)
+),
+nearest AS (
+    SELECT DISTINCT ON (t.entity_id)
+           t.entity_id, t.depth, t.path, t.relation_type, t.confidence
+    FROM traversal t
+    WHERE t.entity_id <> :start_id
+    ORDER BY t.entity_id, t.depth, t.confidence DESC NULLS LAST
+)
+SELECT n.id, n.entity_id, n.entity_name, n.entity_type, s.depth, s.path,
+       ARRAY(
+           SELECT pn.id
+           FROM unnest(s.path) WITH ORDINALITY AS p(entity_id, ord)
+           JOIN knowledge_graph_nodes pn ON pn.entity_id = p.entity_id
+           ORDER BY p.ord
+       ) AS path_ids,
+       s.relation_type, s.confidence
+FROM nearest s
+JOIN knowledge_graph_nodes n ON n.entity_id = s.entity_id
+ORDER BY s.depth, n.id
+LIMIT :limit
+"""
+
+# 关联投标人查询: 中间节点只能是共享实体类型(联系人/地址), 经过共享实体后
+# 最后一跳到达供应商类型的节点即停止, 不会经由其他组织(如代理机构)继续展开
+_CONNECTED_BIDDERS_SQL = """
+WITH RECURSIVE edges AS (
+    {edges}
+),
+shared(entity_id, depth, path) AS (
+    SELECT e.to_id, 1, ARRAY[e.from_id, e.to_id]::varchar[]
+    FROM edges e
+    JOIN knowledge_graph_nodes sn ON sn.entity_id = e.to_id
+         AND upper(sn.entity_type) = ANY(:shared_types)
+    WHERE e.from_id = :start_id
+  UNION ALL
+    SELECT e.to_id, s.depth + 1, s.path || e.to_id::varchar
+    FROM shared s
+    JOIN edges e ON e.from_id = s.entity_id
+    JOIN knowledge_graph_nodes sn ON sn.entity_id = e.to_id
+         AND upper(sn.entity_type) = ANY(:shared_types)
+    WHERE s.depth < :max_hops
+      AND NOT e.to_id = ANY(s.path)
+),
+bidders AS (
+    SELECT DISTINCT ON (e.to_id)
+           e.to_id AS entity_id, s.depth + 1 AS depth,
+           s.path || e.to_id::varchar AS path
+    FROM shared s
+    JOIN edges e ON e.from_id = s.entity_id
+    JOIN knowledge_graph_nodes bn ON bn.entity_id = e.to_id
+         AND upper(bn.entity_type) = ANY(:supplier_types)
+    WHERE e.to_id <> :start_id
+      AND NOT lower(bn.entity_name) = ANY(:exclude_names)
+    ORDER BY e.to_id, s.depth
+)
+SELECT n.id, n.entity_id, n.entity_name, n.entity_type, b.depth, b.path,
+       ARRAY(
+           SELECT pn.id
+           FROM unnest(b.path) WITH ORDINALITY AS p(entity_id, ord)
+           JOIN knowledge_graph_nodes pn ON pn.entity_id = p.entity_id
+           ORDER BY p.ord
+       ) AS path_ids
+FROM bidders b
+JOIN knowledge_graph_nodes n ON n.entity_id = b.entity_id
+ORDER BY b.depth, n.id
+LIMIT :limit
+"""
+
+# 实体搜索: 名称走pg_trgm GIN索引, 按相似度排序分页;
+# 关系数量对当前页实体一次分组统计, 总数由窗口函数在同一查询中得到
+_ENTITY_SEARCH_SQL = """
+WITH matched AS (
+    SELECT n.id, n.entity_id, n.entity_name, n.entity_type, n.confidence,
+           n.description, n.properties,
+           similarity(n.entity_name, :query) AS score,
+           count(*) OVER () AS total
+    FROM knowledge_graph_nodes n
+    WHERE n.entity_name ILIKE :pattern
+    {type_filter}
+    ORDER BY score DESC, n.confidence DESC NULLS LAST, n.id
+    LIMIT :limit OFFSET :skip
+),
+relation_counts AS (
+    SELECT entity_id, count(*) AS relation_count
+    FROM (
+        SELECT r.source_entity_id AS entity_id
+        FROM knowledge_graph_relations r
+        WHERE r.source_entity_id IN (SELECT entity_id FROM matched)
+        UNION ALL
+        SELECT r.target_entity_id
+        FROM knowledge_graph_relations r
+        WHERE r.target_entity_id IN (SELECT entity_id FROM matched)
+    ) endpoints
+    GROUP BY entity_id
+)
+SELECT m.*, COALESCE(rc.relation_count, 0) AS relation_count
+FROM matched m
+LEFT JOIN relation_counts rc ON rc.entity_id = m.entity_id
+ORDER BY m.score DESC, m.confidence DESC NULLS LAST, m.id
+"""
+
+_FORWARD_EDGES = """
+    SELECT source_entity_id AS from_id, target_entity_id AS to_id,
+           relation_type, confidence
+    FROM knowledge_graph_relations
+    {relation_filter}
+"""
+
+_BACKWARD_EDGES = """
+    SELECT target_entity_id AS from_id, source_entity_id AS to_id,
+           relation_type, confidence
+    FROM knowledge_graph_relations
+    {relation_filter}
+"""
+
+
+def _escape_like(value: str) -> str:
+    """转义LIKE模式中的通配符"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class CRUDKnowledgeGraph(
+    CRUDBase[KnowledgeGraph, KnowledgeGraphNodeCreate, KnowledgeGraphNodeCreate]
+):
+    """知识图谱实体CRUD操作类"""
+
+    def search_with_relation_counts(
+        self,
+        db: Session,
+        *,
+        query: str,
+        entity_types: Optional[Sequence[str]] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        搜索实体并附带关系数量
+
+        一条SQL完成名称匹配、相似度排序分页、关系数量分组统计和总数计算
+
+        Args:
+            db: 数据库会话
+            query: 搜索关键词
+            entity_types: 实体类型过滤
+            skip: 跳过记录数
+            limit: 返回记录数
+
+        Returns:
+            {"items": [...], "total": 总匹配数}
+        """
+        params: Dict[str, Any] = {
+            "query": query,
+            "pattern": f"%{_escape_like(query)}%",
+            "skip": skip,
+            "limit": limit,
+        }
+
+        type_filter = ""
+        if entity_types:
+            type_filter = "AND upper(n.entity_type) = ANY(:entity_types)"
+            params["entity_types"] = [t.upper() for t in entity_types]
+
+        sql = _ENTITY_SEARCH_SQL.format(type_filter=type_filter)
+        rows = db.execute(text(sql), params).mappings().all()
+
+        return {
+            "items": [dict(row) for row in rows],
+            "total": rows[0]["total"] if rows else 0,
+        }
+
+
+class CRUDKnowledgeGraphRelation(
+    CRUDBase[
+        KnowledgeGraphRelation,
+        KnowledgeGraphRelationCreate,
+        KnowledgeGraphRelationCreate,
+    ]
+):
+    """知识图谱关系CRUD操作类"""
+
+    def traverse_connections(
+        self,
+        db: Session,
+        *,
+        start_entity_id: str,
+        max_depth: int = 2,
+        relation_types: Optional[Sequence[str]] = None,
+        node_types: Optional[Sequence[str]] = None,
+        bidirectional: bool = False,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        在数据库中遍历实体的k跳邻域
+
+        依赖(source_entity_id, relation_type)和(target_entity_id,
+        relation_type)复合索引, 每一层只按索引展开当前前沿
+
+        Args:
+            db: 数据库会话
+            start_entity_id: 起始实体的entity_id
+            max_depth: 最大遍历深度
+            relation_types: 仅沿指定关系类型遍历
+            node_types: 仅经过指定实体类型的节点
+            bidirectional: 是否忽略关系方向
+            limit: 最大返回数量
+
+        Returns:
+            按深度排序的连接列表, 每个实体只返回其最短路径
+        """
+        params: Dict[str, Any] = {
+            "start_id": start_entity_id,
+            "max_depth": max_depth,
+            "limit": limit,
+        }
+
+        relation_filter = ""
+        if relation_types:
+            relation_filter = "WHERE relation_type = ANY(:relation_types)"
+            params["relation_types"] = list(relation_types)
+
+        edges = _FORWARD_EDGES.format(relation_filter=relation_filter)
+        if bidirectional:
+            edges += "UNION ALL" + _BACKWARD_EDGES.format(
+                relation_filter=relation_filter
+            )
+
+        node_join = ""
+        if node_types:
+            node_join = (
+                "JOIN knowledge_graph_nodes tn ON tn.entity_id = e.to_id "
+                "AND upper(tn.entity_type) = ANY(:node_types)"
+            )
+            params["node_types"] = [t.upper() for t in node_types]
+
+        sql = _TRAVERSAL_SQL.format(edges=edges, node_join=node_join)
+        rows = db.execute(text(sql), params).mappings().all()
+
+        return [
+            {
+                "id": row["id"],
+                "entity_id": row["entity_id"],
+                "name": row["entity_name"],
+                "type": row["entity_type"],
+                "depth": row["depth"],
+                "path": list(row["path_ids"]),
+                "relation_type": row["relation_type"],
+                "confidence": row["confidence"],
+            }
+            for row in rows
+        ]
+
+    def find_connected_bidders(
+        self,
+        db: Session,
+        *,
+        supplier_entity_id: str,
+        max_hops: int = 1,
+        shared_types: Sequence[str] = ("PERSON", "LOCATION"),
+        supplier_types: Sequence[str] = ("ORGANIZATION",),
+        exclude_names: Sequence[str] = (),
+        limit: int = 200,
+    ) -> List[Dict[str, Any]]:
+        """
+        查找与指定供应商共享联系人或地址的其他供应商
+
+        遍历不区分关系方向, 中间节点只能是shared_types类型的共享实体,
+        到达supplier_types类型的节点即为一个结果, 不再经由它继续展开;
+        max_hops为经过的共享实体数量, 1表示直接共享
+
+        Args:
+            db: 数据库会话
+            supplier_entity_id: 起始供应商的entity_id
+            max_hops: 经过的共享实体数量上限
+            shared_types: 可作为共享实体的类型
+            supplier_types: 视为供应商的类型
+            exclude_names: 不作为结果返回的实体名称(如采购代理机构、采购人)
+            limit: 最大返回数量
+
+        Returns:
+            关联供应商列表, 包含共享实体路径, 不含起始供应商本身
+        """
+        params: Dict[str, Any] = {
+            "start_id": supplier_entity_id,
+            "max_hops": max_hops,
+            "shared_types": [t.upper() for t in shared_types],
+            "supplier_types": [t.upper() for t in supplier_types],
+            "exclude_names": [name.lower() for name in exclude_names if name],
+            "limit": limit,
+        }
+
+        edges = (
+            _FORWARD_EDGES.format(relation_filter="")
+            + "UNION ALL"
+            + _BACKWARD_EDGES.format(relation_filter="")
+        )
+        sql = _CONNECTED_BIDDERS_SQL.format(edges=edges)
+        rows = db.execute(text(sql), params).mappings().all()
+
+        return [
+            {
+                "id": row["id"],
+                "entity_id": row["entity_id"],
+                "name": row["entity_name"],
+                "type": row["entity_type"],
+                "depth": row["depth"],
+                "path": list(row["path_ids"]),
+                "shared_entities": list(row["path_ids"])[1:-1],
+            }
+            for row in rows
+        ]
+
+
+knowledge_graph = CRUDKnowledgeGraph(KnowledgeGraph)
+knowledge_graph_relation = CRUDKnowledgeGraphRelation(KnowledgeGraphRelation)
@@ -48,6 +48,8 @@ class CRUDOAuth2Client(CRUDBase[OAuth2Client, OAuth2ClientCreate, OAuth2ClientUp
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        # 清除该ID可能存在的负缓存
+        self._invalidate_cache(db_obj.id)
 
         # 返回明文密钥（仅此一次）
         db_obj.plain_client_secret = client_secret
@@ -48,6 +48,8 @@ class CRUDOCRResult(CRUDBase[OCRResult, OCRResultCreate, OCRResultUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        # 清除该ID可能存在的负缓存
+        self._invalidate_cache(db_obj.id)
         return db_obj
 
     def get_by_processor(
@@ -1,10 +1,13 @@
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Union
 
-from sqlalchemy import asc, desc, or_
+from sqlalchemy import asc, desc, func, or_
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
+from app.crud.pagination import Page, paginate
+from app.crud.search import ranked_search, similarity_rank, text_search_filter
+from app.db.routing import replica_reads
 from app.models.project import Issue, Project, ProjectComparison
 from app.schemas.project import (
     IssueCreate,
@@ -38,6 +41,8 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        # 清除该ID可能存在的负缓存
+        self._invalidate_cache(db_obj.id)
         return db_obj
 
     def get_by_code(self, db: Session, *, project_code: str) -> Optional[Project]:
@@ -98,29 +103,36 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
             .all()
         )
 
+    search_columns = (
+        Project.name,
+        Project.project_code,
+        Project.description,
+        Project.procuring_entity,
+    )
+
     def search_projects(
         self, db: Session, *, query: str, skip: int = 0, limit: int = 100
     ) -> List[Project]:
-        """搜索项目"""
-        search_filter = or_(
-            Project.name.contains(query),
-            Project.project_code.contains(query),
-            Project.description.contains(query),
-            Project.procuring_entity.contains(query),
+        """搜索项目，按相关度排序"""
+        return self.search_projects_page(db, query=query, skip=skip, limit=limit).items
+
+    def search_projects_page(
+        self, db: Session, *, query: str, skip: int = 0, limit: int = 100
+    ) -> Page:
+        """按相关度分页搜索项目，同一查询中返回（封顶的）总数"""
+        return ranked_search(
+            db,
+            db.query(Project).filter(
+                text_search_filter(db, self.search_columns, query)
+            ),
+            Project,
+            similarity_rank(db, self.search_columns, query),
+            skip=skip,
+            limit=limit,
         )
-        return db.query(Project).filter(search_filter).offset(skip).limit(limit).all()
 
-    def get_projects_by_filters(
-        self,
-        db: Session,
-        *,
-        filters: Dict[str, Any],
-        skip: int = 0,
-        limit: int = 100,
-        order_by: str = "created_at",
-        order_desc: bool = True,
-    ) -> List[Project]:
-        """根据多个条件筛选项目"""
+    def _filters_query(self, db: Session, filters: Dict[str, Any]):
+        """构建项目筛选条件"""
         query = db.query(Project)
 
         # 应用筛选条件
@@ -159,6 +171,21 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         if "max_budget" in filters and filters["max_budget"]:
             query = query.filter(Project.budget <= filters["max_budget"])
 
+        return query
+
+    def get_projects_by_filters(
+        self,
+        db: Session,
+        *,
+        filters: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+    ) -> List[Project]:
+        """根据多个条件筛选项目（偏移分页，深分页请使用get_projects_page）"""
+        query = self._filters_query(db, filters)
+
         # 排序
         if hasattr(Project, order_by):
             order_column = getattr(Project, order_by)
@@ -169,55 +196,130 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
 
         return query.offset(skip).limit(limit).all()
 
+    def get_projects_page(
+        self,
+        db: Session,
+        *,
+        filters: Dict[str, Any],
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        with_total: bool = False,
+    ) -> Page:
+        """根据多个条件按游标分页筛选项目"""
+        return paginate(
+            db,
+            self._filters_query(db, filters),
+            Project,
+            order_by=order_by,
+            order_desc=order_desc,
+            cursor=cursor,
+            limit=limit,
+            with_total=with_total,
+        )
+
+    # 统计维度：(列名, 固定取值)，固定取值为None时按实际出现的非空值统计
+    statistics_dimensions = (
+        (
+            "status",
+            (
+                "planning",
+                "procurement",
+                "implementation",
+                "acceptance",
+                "completed",
+                "cancelled",
+            ),
+        ),
+        ("review_status", ("pending", "approved", "rejected", "under_review")),
+        ("department", None),
+        ("priority", ("low", "medium", "high", "urgent")),
+        ("risk_level", ("low", "medium", "high")),
+    )
+
     def get_project_statistics(
         self, db: Session, *, owner_id: Optional[int] = None
     ) -> Dict[str, Any]:
-        """获取项目统计信息"""
-        query = db.query(Project)
-        if owner_id:
-            query = query.filter(Project.owner_id == owner_id)
-
-        total_projects = query.count()
-
-        # 按状态统计
-        status_stats = {}
-        for status in [
-            "planning",
-            "procurement",
-            "implementation",
-            "acceptance",
-            "completed",
-            "cancelled",
-        ]:
-            count = query.filter(Project.status == status).count()
-            status_stats[status] = count
-
-        # 按审查状态统计
-        review_stats = {}
-        for review_status in ["pending", "approved", "rejected", "under_review"]:
-            count = query.filter(Project.review_status == review_status).count()
-            review_stats[review_status] = count
-
-        # 按部门统计
-        department_stats = {}
-        departments = db.query(Project.department).distinct().all()
-        for (department,) in departments:
-            if department:
-                count = query.filter(Project.department == department).count()
-                department_stats[department] = count
-
-        # 按优先级统计
-        priority_stats = {}
-        for priority in ["low", "medium", "high", "urgent"]:
-            count = query.filter(Project.priority == priority).count()
-            priority_stats[priority] = count
-
-        # 按风险等级统计
-        risk_stats = {}
-        for risk_level in ["low", "medium", "high"]:
-            count = query.filter(Project.risk_level == risk_level).count()
-            risk_stats[risk_level] = count
-
+        """
+        获取项目统计信息
+
+        各维度分布与预算合计由同一条语句得出，结果来自同一快照：
+        PostgreSQL上使用 GROUPING SETS，其他数据库按全部维度分组后在内存中汇总；
+        查询优先发往只读副本
+        """
+        columns = [getattr(Project, name) for name, _ in self.statistics_dimensions]
+        count = func.count(Project.id)
+        budget = func.sum(Project.budget_amount)
+
+        if db.get_bind().dialect.name == "postgresql":
+            query = db.query(
+                *columns,
+                *[func.grouping(column) for column in columns],
+                count,
+                budget,
+            ).group_by(func.grouping_sets(*columns))
+            if owner_id:
+                query = query.filter(Project.owner_id == owner_id)
+
+            with replica_reads(db):
+                rows = query.all()
+            size = len(columns)
+            groups = []
+            for row in rows:
+                flags = row[size : size * 2]
+                index = flags.index(0)
+                groups.append((index, row[index], row[-2], row[-1]))
+        else:
+            query = db.query(*columns, count, budget).group_by(*columns)
+            if owner_id:
+                query = query.filter(Project.owner_id == owner_id)
+
+            with replica_reads(db):
+                rows = query.all()
+            groups = [
+                (index, row[index], row[-2], row[-1])
+                for row in rows
+                for index in range(len(columns))
+            ]
+
+        return self._fold_statistics(groups)
+
+    def _fold_statistics(self, groups) -> Dict[str, Any]:
+        """将 (维度序号, 取值, 数量, 预算) 汇总为统计结果"""
+        distributions = []
+        for _, values in self.statistics_dimensions:
+            distributions.append(dict.fromkeys(values, 0) if values else {})
+        status_budget = dict.fromkeys(self.statistics_dimensions[0][1], 0.0)
+        department_budget = {}
+
+        total_projects = 0
+        total_budget = 0.0
+        for index, value, count, budget in groups:
+            budget = float(budget or 0)
+            # 每一行都恰好属于一个状态分组，据此得到总数
+            if index == 0:
+                total_projects += count
+                total_budget += budget
+                if value in status_budget:
+                    status_budget[value] += budget
+            if index == 2 and value:
+                department_budget[value] = department_budget.get(value, 0.0) + budget
+
+            distribution = distributions[index]
+            if self.statistics_dimensions[index][1] is None:
+                if value:
+                    distribution[value] = distribution.get(value, 0) + count
+            elif value in distribution:
+                distribution[value] += count
+
+        (
+            status_stats,
+            review_stats,
+            department_stats,
+            priority_stats,
+            risk_stats,
+        ) = distributions
         return {
             "total_projects": total_projects,
             "status_distribution": status_stats,
@@ -225,6 +327,9 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
             "department_distribution": department_stats,
             "priority_distribution": priority_stats,
             "risk_distribution": risk_stats,
+            "total_budget": total_budget,
+            "status_budget": status_budget,
+            "department_budget": department_budget,
         }
 
     def get_recent_projects(
@@ -3,13 +3,17 @@
 提供安全事件的创建、查询、更新、统计等功能
 """
 
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, asc, desc, func
+from sqlalchemy import and_, asc, desc, func, or_
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
+from app.crud.crud_stats_rollup import security_event_rollup
+from app.crud.pagination import Page, paginate
+from app.db.partitioning import drop_partitions_before
 from app.models.security_event import (
     SecurityEvent,
     SecurityEventLevel,
@@ -23,6 +27,8 @@ class CRUDSecurityEvent(
 ):
     """安全事件CRUD操作类"""
 
+    stats_cache_ttl = 30  # 统计结果短时缓存（秒）
+
     def create_event(
         self,
         db: Session,
@@ -96,9 +102,11 @@ class CRUDSecurityEvent(
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        # 清除该ID可能存在的负缓存
+        self._invalidate_cache(db_obj.id)
         return db_obj
 
-    def search(
+    def _search_query(
         self,
         db: Session,
         *,
@@ -113,12 +121,8 @@ class CRUDSecurityEvent(
         end_time: Optional[datetime] = None,
         detection_method: Optional[str] = None,
         correlation_id: Optional[str] = None,
-        skip: int = 0,
-        limit: int = 100,
-        order_by: str = "created_at",
-        order_desc: bool = True,
-    ) -> List[SecurityEvent]:
-        """搜索安全事件"""
+    ):
+        """构建搜索过滤条件"""
         query = db.query(self.model)
 
         # 添加过滤条件
@@ -156,6 +160,21 @@ class CRUDSecurityEvent(
         if end_time:
             query = query.filter(self.model.created_at <= end_time)
 
+        return query
+
+    def search(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        **filters: Any,
+    ) -> List[SecurityEvent]:
+        """搜索安全事件（偏移分页，深分页请使用search_page）"""
+        query = self._search_query(db, **filters)
+
         # 排序
         if hasattr(self.model, order_by):
             order_column = getattr(self.model, order_by)
@@ -168,6 +187,29 @@ class CRUDSecurityEvent(
 
         return query.offset(skip).limit(limit).all()
 
+    def search_page(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        with_total: bool = False,
+        **filters: Any,
+    ) -> Page:
+        """按游标分页搜索安全事件"""
+        return paginate(
+            db,
+            self._search_query(db, **filters),
+            self.model,
+            order_by=order_by,
+            order_desc=order_desc,
+            cursor=cursor,
+            limit=limit,
+            with_total=with_total,
+        )
+
     def resolve_event(
         self,
         db: Session,
@@ -199,6 +241,39 @@ class CRUDSecurityEvent(
         end_time: Optional[datetime] = None,
     ) -> Dict[str, Any]:
         """获取安全事件统计信息"""
+        cache_key = self._stats_cache_key(
+            "get_statistics", start_time=start_time, end_time=end_time
+        )
+        cached_result = self._get_from_cache(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+        # 按类型、级别、用户分组计数：完整小时读取汇总表，其余聚合原始行
+        grouped = security_event_rollup.grouped_counts(
+            db,
+            ("event_type", "level", "user_id"),
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+        total_events = 0
+        level_counts: Counter = Counter()
+        type_counts: Counter = Counter()
+        user_counts: Counter = Counter()
+        for (event_type, level, user_id), count in grouped.items():
+            total_events += count
+            level_counts[level] += count
+            type_counts[event_type] += count
+            if user_id is not None:
+                user_counts[user_id] += count
+
+        # 按用户ID计数，用户名取该用户最近一条记录中的值
+        top_users = user_counts.most_common(10)
+        usernames = security_event_rollup.latest_usernames(
+            db, [user_id for user_id, _ in top_users]
+        )
+
+        # 解决状态、源IP不是汇总维度，仍按原始行统计
         query = db.query(self.model)
 
         # 时间范围过滤
@@ -208,39 +283,9 @@ class CRUDSecurityEvent(
         if end_time:
             query = query.filter(self.model.created_at <= end_time)
 
-        # 总数统计
-        total_events = query.count()
-
-        # 按级别统计
-        level_stats = (
-            query.with_entities(
-                self.model.level, func.count(self.model.id).label("count")
-            )
-            .group_by(self.model.level)
-            .all()
-        )
-
-        # 按类型统计
-        type_stats = (
-            query.with_entities(
-                self.model.event_type, func.count(self.model.id).label("count")
-            )
-            .group_by(self.model.event_type)
-            .order_by(desc("count"))
-            .limit(10)
-            .all()
-        )
-
-        # 解决状态统计
-        resolved_events = query.filter(self.model.is_resolved).count()
+        # 未解决事件数量较少，已解决数量由总数推算
         pending_events = query.filter(self.model.is_resolved == False).count()
-
-        # 严重事件统计
-        critical_events = query.filter(
-            self.model.level == SecurityEventLevel.CRITICAL
-        ).count()
-
-        high_events = query.filter(self.model.level == SecurityEventLevel.HIGH).count()
+        resolved_events = total_events - pending_events
 
         # 按源IP统计
         source_ip_stats = (
@@ -254,21 +299,7 @@ class CRUDSecurityEvent(
             .all()
         )
 
-        # 按用户统计
-        user_stats = (
-            query.filter(self.model.user_id.isnot(None))
-            .with_entities(
-                self.model.user_id,
-                self.model.username,
-                func.count(self.model.id).label("count"),
-            )
-            .group_by(self.model.user_id, self.model.username)
-            .order_by(desc("count"))
-            .limit(10)
-            .all()
-        )
-
-        # 平均解决时间
+        # 平均解决时间（只取时间列，不加载完整对象）
         resolved_query = query.filter(
             and_(self.model.is_resolved, self.model.resolved_at.isnot(None))
         )
@@ -276,42 +307,91 @@ class CRUDSecurityEvent(
         avg_resolution_time = 0
         if resolved_events > 0:
             resolution_times = []
-            for event in resolved_query.all():
-                if event.resolved_at and event.created_at:
-                    duration = (
-                        event.resolved_at - event.created_at
-                    ).total_seconds() / 3600  # 小时
+            for created_at, resolved_at in resolved_query.with_entities(
+                self.model.created_at, self.model.resolved_at
+            ):
+                if resolved_at and created_at:
+                    duration = (resolved_at - created_at).total_seconds() / 3600  # 小时
                     resolution_times.append(duration)
 
             if resolution_times:
                 avg_resolution_time = sum(resolution_times) / len(resolution_times)
 
-        return {
+        result = {
             "total_events": total_events,
             "resolved_events": resolved_events,
             "pending_events": pending_events,
-            "critical_events": critical_events,
-            "high_events": high_events,
+            "critical_events": level_counts[SecurityEventLevel.CRITICAL.value],
+            "high_events": level_counts[SecurityEventLevel.HIGH.value],
             "avg_resolution_time": round(avg_resolution_time, 2),
-            "level_distribution": {
-                stat.level.value: stat.count for stat in level_stats
-            },
-            "type_distribution": {
-                stat.event_type.value: stat.count for stat in type_stats
-            },
+            "level_distribution": dict(level_counts),
+            "type_distribution": dict(type_counts.most_common(10)),
             "top_source_ips": [
                 {"ip_address": stat.source_ip, "count": stat.count}
                 for stat in source_ip_stats
             ],
             "top_users": [
                 {
-                    "user_id": stat.user_id,
-                    "username": stat.username,
-                    "count": stat.count,
+                    "user_id": user_id,
+                    "username": usernames.get(user_id),
+                    "count": count,
                 }
-                for stat in user_stats
+                for user_id, count in top_users
             ],
         }
+        self._set_cache(cache_key, result, self.stats_cache_ttl)
+        return result
+
+    def get_dashboard_counts(
+        self,
+        db: Session,
+        *,
+        today_start: datetime,
+        week_start: datetime,
+        prev_week_start: datetime,
+    ) -> Dict[str, int]:
+        """获取安全仪表板计数（单次扫描，短时缓存）"""
+        cache_key = self._stats_cache_key(
+            "get_dashboard_counts",
+            today_start=today_start,
+            week_start=week_start,
+            prev_week_start=prev_week_start,
+        )
+        cached_result = self._get_from_cache(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+        unresolved = self.model.is_resolved == False
+        counts = (
+            db.query(
+                func.count(self.model.id)
+                .filter(self.model.created_at >= today_start)
+                .label("today"),
+                func.count(self.model.id)
+                .filter(self.model.created_at >= week_start)
+                .label("week"),
+                func.count(self.model.id)
+                .filter(
+                    and_(
+                        self.model.created_at >= prev_week_start,
+                        self.model.created_at < week_start,
+                    )
+                )
+                .label("prev_week"),
+                func.count(self.model.id).filter(unresolved).label("active"),
+                func.count(self.model.id)
+                .filter(
+                    and_(unresolved, self.model.level == SecurityEventLevel.CRITICAL)
+                )
+                .label("critical"),
+            )
+            .filter(or_(self.model.created_at >= prev_week_start, unresolved))
+            .one()
+        )
+
+        result = dict(counts._mapping)
+        self._set_cache(cache_key, result, self.stats_cache_ttl)
+        return result
 
     def get_critical_events(
         self, db: Session, *, hours: int = 24, limit: int = 50
@@ -359,6 +439,11 @@ class CRUDSecurityEvent(
 
     def detect_attack_patterns(self, db: Session, *, hours: int = 24) -> Dict[str, Any]:
         """检测攻击模式"""
+        cache_key = self._stats_cache_key("detect_attack_patterns", hours=hours)
+        cached_result = self._get_from_cache(cache_key)
+        if cached_result is not None:
+            return cached_result
+
         start_time = datetime.utcnow() - timedelta(hours=hours)
 
         # 检测暴力破解攻击
@@ -381,66 +466,43 @@ class CRUDSecurityEvent(
             .all()
         )
 
-        # 检测DDoS攻击
-        ddos_attacks = (
-            db.query(self.model)
-            .filter(
-                and_(
-                    self.model.event_type == SecurityEventType.DDOS_ATTACK,
-                    self.model.created_at >= start_time,
-                )
-            )
-            .count()
-        )
-
-        # 检测注入攻击
-        injection_attacks = (
-            db.query(self.model)
-            .filter(
-                and_(
-                    self.model.event_type.in_(
+        # 检测DDoS、注入、内部威胁和账户接管攻击（单次扫描）
+        event_type = self.model.event_type
+        counts = (
+            db.query(
+                func.count(self.model.id)
+                .filter(event_type == SecurityEventType.DDOS_ATTACK)
+                .label("ddos_attacks"),
+                func.count(self.model.id)
+                .filter(
+                    event_type.in_(
                         [SecurityEventType.SQL_INJECTION, SecurityEventType.XSS_ATTACK]
-                    ),
-                    self.model.created_at >= start_time,
-                )
-            )
-            .count()
-        )
-
-        # 检测内部威胁
-        insider_threats = (
-            db.query(self.model)
-            .filter(
-                and_(
-                    self.model.event_type == SecurityEventType.INSIDER_THREAT,
-                    self.model.created_at >= start_time,
+                    )
                 )
+                .label("injection_attacks"),
+                func.count(self.model.id)
+                .filter(event_type == SecurityEventType.INSIDER_THREAT)
+                .label("insider_threats"),
+                func.count(self.model.id)
+                .filter(event_type == SecurityEventType.ACCOUNT_TAKEOVER)
+                .label("account_takeovers"),
             )
-            .count()
+            .filter(self.model.created_at >= start_time)
+            .one()
         )
 
-        # 检测账户接管
-        account_takeovers = (
-            db.query(self.model)
-            .filter(
-                and_(
-                    self.model.event_type == SecurityEventType.ACCOUNT_TAKEOVER,
-                    self.model.created_at >= start_time,
-                )
-            )
-            .count()
-        )
-
-        return {
+        result = {
             "brute_force_attacks": [
                 {"source_ip": attack.source_ip, "attack_count": attack.attack_count}
                 for attack in brute_force_attacks
             ],
-            "ddos_attacks": ddos_attacks,
-            "injection_attacks": injection_attacks,
-            "insider_threats": insider_threats,
-            "account_takeovers": account_takeovers,
+            "ddos_attacks": counts.ddos_attacks,
+            "injection_attacks": counts.injection_attacks,
+            "insider_threats": counts.insider_threats,
+            "account_takeovers": counts.account_takeovers,
         }
+        self._set_cache(cache_key, result, self.stats_cache_ttl)
+        return result
 
     def get_sla_breached_events(self, db: Session) -> List[SecurityEvent]:
         """获取违反SLA的事件"""
@@ -469,10 +531,25 @@ class CRUDSecurityEvent(
         db.commit()
         return updated_count
 
-    def cleanup_old_events(self, db: Session, *, days: int = 365) -> int:
-        """清理旧的安全事件"""
+    def cleanup_old_events(
+        self, db: Session, *, days: int = 365, detach: bool = False
+    ) -> int:
+        """
+        清理旧的安全事件
+
+        分区表先整月删除（或分离）不含未解决事件的过期分区，
+        剩余的过期已解决事件按行删除
+        """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
 
+        removed = drop_partitions_before(
+            db,
+            self.model.__tablename__,
+            cutoff_date,
+            detach=detach,
+            keep_if="is_resolved = false",
+        )
+
         # 只删除已解决的旧事件
         deleted_count = (
             db.query(self.model)
@@ -481,7 +558,7 @@ class CRUDSecurityEvent(
         )
 
         db.commit()
-        return deleted_count
+        return deleted_count + sum(removed.values())
 
 
 # 创建全局实例
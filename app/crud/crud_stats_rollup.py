@@ -0,0 +1,258 @@
+"""统计汇总CRUD操作
+
+按小时增量汇总审计日志和安全事件，统计查询读取汇总表，
+仅对高水位之后（尚未汇总）的尾部和不足一小时的边界区间聚合原始行
+"""
+
+import enum
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audit_log import AuditLog
+from app.models.security_event import SecurityEvent
+from app.models.stats_rollup import (
+    AuditLogHourlyRollup,
+    SecurityEventHourlyRollup,
+    StatsRollupWatermark,
+)
+
+# 按日期分组的特殊维度
+DATE = "date"
+
+
+def _value(value: Any) -> Any:
+    """枚举转换为值字符串，与汇总表存储一致"""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def floor_hour(value: datetime) -> datetime:
+    """向下取整到小时"""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(value: datetime) -> datetime:
+    """向上取整到小时"""
+    floored = floor_hour(value)
+    return floored if floored == value else floored + timedelta(hours=1)
+
+
+class CRUDStatsRollup:
+    """统计汇总操作类"""
+
+    def __init__(
+        self,
+        rollup_model: Any,
+        raw_model: Any,
+        name: str,
+        dimensions: Sequence[str],
+    ):
+        self.rollup_model = rollup_model
+        self.raw_model = raw_model
+        self.name = name
+        self.dimensions = tuple(dimensions)
+        self.batch_size = getattr(settings, "STATS_ROLLUP_BATCH_SIZE", 5000)
+        # 创建时间早于该延迟的行才汇总，避免跳过未提交事务中较小的ID
+        self.lag_seconds = getattr(settings, "STATS_ROLLUP_LAG_SECONDS", 120)
+
+    def get_watermark(self, db: Session) -> int:
+        """已汇总到的最大ID，从未汇总时为0"""
+        last_id = (
+            db.query(StatsRollupWatermark.last_id)
+            .filter(StatsRollupWatermark.name == self.name)
+            .scalar()
+        )
+        return last_id or 0
+
+    def aggregate_rows(self, rows: Iterable[Tuple]) -> Dict[Tuple, List[Any]]:
+        """将原始行 (created_at, *维度, username) 聚合为 小时+维度 -> [数量, 用户名]"""
+        groups: Dict[Tuple, List[Any]] = {}
+        for created_at, *dims, username in rows:
+            key = (floor_hour(created_at), *(_value(d) for d in dims))
+            entry = groups.get(key)
+            if entry is None:
+                groups[key] = [1, username]
+            else:
+                entry[0] += 1
+                if username:
+                    entry[1] = username
+        return groups
+
+    def refresh(self, db: Session, *, batch_size: Optional[int] = None) -> int:
+        """
+        增量汇总一批原始行，返回处理的行数
+
+        高水位行加锁，汇总表更新与高水位推进在同一事务内提交，
+        多个进程同时执行时不会重复计数
+        """
+        batch_size = batch_size or self.batch_size
+        raw = self.raw_model
+        rollup = self.rollup_model
+
+        watermark = (
+            db.query(StatsRollupWatermark)
+            .filter(StatsRollupWatermark.name == self.name)
+            .with_for_update()
+            .one_or_none()
+        )
+        if watermark is None:
+            watermark = StatsRollupWatermark(name=self.name, last_id=0)
+            db.add(watermark)
+            db.flush()
+
+        rows = (
+            db.query(
+                raw.id,
+                raw.created_at,
+                *[getattr(raw, d) for d in self.dimensions],
+                raw.username,
+            )
+            .filter(raw.id > watermark.last_id)
+            .order_by(raw.id)
+            .limit(batch_size)
+            .all()
+        )
+
+        # 只处理连续的、已超过延迟的前缀
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lag_seconds)
+        batch = []
+        for row in rows:
+            if row.created_at >= cutoff:
+                break
+            batch.append(row)
+
+        if not batch:
+            db.rollback()
+            return 0
+
+        groups = self.aggregate_rows(tuple(row)[1:] for row in batch)
+
+        buckets = {key[0] for key in groups}
+        existing = {
+            (item.bucket, *(getattr(item, d) for d in self.dimensions)): item
+            for item in db.query(rollup).filter(rollup.bucket.in_(buckets))
+        }
+        for key, (count, username) in groups.items():
+            item = existing.get(key)
+            if item is None:
+                item = rollup(
+                    bucket=key[0],
+                    count=0,
+                    **dict(zip(self.dimensions, key[1:])),
+                )
+                db.add(item)
+            item.count += count
+            if username:
+                item.username = username
+
+        watermark.last_id = batch[-1].id
+        watermark.updated_at = datetime.utcnow()
+        db.commit()
+        return len(batch)
+
+    def refresh_all(self, db: Session, *, max_batches: int = 20) -> int:
+        """连续汇总直到追上或达到批次上限，返回处理的行数"""
+        total = 0
+        for _ in range(max_batches):
+            processed = self.refresh(db)
+            total += processed
+            if processed < self.batch_size:
+                break
+        return total
+
+    def _columns(self, model: Any, group_by: Sequence[str]) -> List[Any]:
+        time_column = model.bucket if model is self.rollup_model else model.created_at
+        return [
+            func.date(time_column) if column == DATE else getattr(model, column)
+            for column in group_by
+        ]
+
+    def _apply_filters(
+        self, query: Any, model: Any, filters: Optional[Dict[str, Sequence[Any]]]
+    ) -> Any:
+        for column, values in (filters or {}).items():
+            if model is self.rollup_model:
+                values = [_value(v) for v in values]
+            query = query.filter(getattr(model, column).in_(values))
+        return query
+
+    def latest_usernames(self, db: Session, user_ids: Iterable[int]) -> Dict[int, str]:
+        """各用户最近一条原始行中的用户名（用户名为冗余字段，可能随改名变化）"""
+        raw = self.raw_model
+        user_ids = [user_id for user_id in set(user_ids) if user_id is not None]
+        if not user_ids:
+            return {}
+        latest_ids = (
+            db.query(func.max(raw.id))
+            .filter(raw.user_id.in_(user_ids), raw.username.isnot(None))
+            .group_by(raw.user_id)
+        )
+        rows = db.query(raw.user_id, raw.username).filter(raw.id.in_(latest_ids))
+        return {user_id: username for user_id, username in rows}
+
+    def grouped_counts(
+        self,
+        db: Session,
+        group_by: Sequence[str],
+        *,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        filters: Optional[Dict[str, Sequence[Any]]] = None,
+    ) -> Dict[Tuple, int]:
+        """
+        按维度分组计数，时间范围为 [start_time, end_time]
+
+        完整小时且ID不超过高水位的部分读取汇总表，其余部分聚合原始行；
+        枚举维度以值字符串返回，DATE维度按日期分组
+        """
+        watermark = self.get_watermark(db)
+        hour_start = ceil_hour(start_time) if start_time else None
+        hour_end = floor_hour(end_time) if end_time else None
+        counts: Dict[Tuple, int] = defaultdict(int)
+
+        if watermark:
+            rollup = self.rollup_model
+            columns = self._columns(rollup, group_by)
+            query = db.query(*columns, func.sum(rollup.count))
+            if hour_start:
+                query = query.filter(rollup.bucket >= hour_start)
+            if hour_end:
+                query = query.filter(rollup.bucket < hour_end)
+            query = self._apply_filters(query, rollup, filters)
+            for *key, count in query.group_by(*columns).all():
+                counts[tuple(key)] += int(count or 0)
+
+        raw = self.raw_model
+        columns = self._columns(raw, group_by)
+        query = db.query(*columns, func.count(raw.id))
+        if start_time:
+            query = query.filter(raw.created_at >= start_time)
+        if end_time:
+            query = query.filter(raw.created_at <= end_time)
+
+        # 未汇总的尾部，以及汇总表不覆盖的边界小时
+        uncovered = [raw.id > watermark]
+        if hour_start:
+            uncovered.append(raw.created_at < hour_start)
+        if hour_end:
+            uncovered.append(raw.created_at >= hour_end)
+        query = self._apply_filters(query.filter(or_(*uncovered)), raw, filters)
+        for *key, count in query.group_by(*columns).all():
+            counts[tuple(_value(k) for k in key)] += count
+
+        return dict(counts)
+
+
+audit_log_rollup = CRUDStatsRollup(
+    AuditLogHourlyRollup, AuditLog, "audit_logs", ("action", "status", "user_id")
+)
+security_event_rollup = CRUDStatsRollup(
+    SecurityEventHourlyRollup,
+    SecurityEvent,
+    "security_events",
+    ("event_type", "level", "user_id"),
+)
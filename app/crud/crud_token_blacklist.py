@@ -5,6 +5,8 @@ from typing import List, Optional
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from app.core.request_memo import memo_invalidate, memoize
+from app.core.token_revocation import get_token_revocation
 from app.crud.base import CRUDBase
 from app.models.token_blacklist import TokenBlacklist
 from app.schemas.token_blacklist import (
@@ -65,15 +67,33 @@ class CRUDTokenBlacklist(
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        memo_invalidate("token_blacklist")
+        get_token_revocation().revoke(jti, expires_at)
         return db_obj
 
     def is_token_blacklisted(
         self, db: Session, *, jti: str = None, token: str = None
     ) -> bool:
-        """检查token是否在黑名单中"""
+        """检查token是否在黑名单中
+
+        按jti检查时由进程内吊销集合应答；集合不可用或按token检查时查询数据库（同一请求内只查询一次）
+        """
         if not jti and not token:
             return False
 
+        if jti:
+            revoked = get_token_revocation().check(jti)
+            if revoked is not None:
+                return revoked
+
+        return memoize(
+            ("token_blacklist", jti, token),
+            lambda: self._query_blacklisted(db, jti=jti, token=token),
+        )
+
+    def _query_blacklisted(
+        self, db: Session, *, jti: str = None, token: str = None
+    ) -> bool:
         query = db.query(TokenBlacklist)
 
         if jti:
@@ -121,6 +141,7 @@ class CRUDTokenBlacklist(
             db.query(TokenBlacklist).filter(TokenBlacklist.expires_at < now).delete()
         )
         db.commit()
+        get_token_revocation().prune(now)
         return result
 
     def get_blacklist_by_query(
@@ -234,6 +255,9 @@ class CRUDTokenBlacklist(
         """从黑名单中移除token"""
         result = db.query(TokenBlacklist).filter(TokenBlacklist.jti == jti).delete()
         db.commit()
+        memo_invalidate("token_blacklist")
+        if result:
+            get_token_revocation().restore(jti)
         return result > 0
 
 
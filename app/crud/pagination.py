@@ -0,0 +1,176 @@
+"""键集分页
+
+按 (排序键, id) 定位下一页，游标对调用方不透明；
+深分页的代价与页码无关，不再依赖OFFSET。
+总数可选：无过滤条件时使用 pg_class.reltuples 估算，有过滤条件时为封顶计数
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import asc, desc, func, text, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# 支持键集分页的排序列（需有 (列, id) 复合索引）
+KEYSET_SORT_COLUMNS = ("created_at", "id")
+
+
+class InvalidCursorError(ValueError):
+    """游标无法解析或与当前排序不匹配"""
+
+
+@dataclass
+class Page(Generic[T]):
+    """一页结果"""
+
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_exact: bool = True
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _load(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+    return value
+
+
+def encode_cursor(order_by: str, order_desc: bool, values: Sequence[Any]) -> str:
+    """编码游标"""
+    payload = {
+        "k": order_by,
+        "o": "d" if order_desc else "a",
+        "v": [_dump(v) for v in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: str, order_desc: bool) -> List[Any]:
+    """解码游标，返回排序键值列表"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_load(v) for v in payload["v"]]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("无效的分页游标") from e
+
+    if payload.get("k") != order_by or payload.get("o") != ("d" if order_desc else "a"):
+        raise InvalidCursorError("分页游标与排序方式不匹配")
+    return values
+
+
+def keyset_paginate(
+    query: Query,
+    model: Any,
+    *,
+    order_by: str = "created_at",
+    order_desc: bool = True,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Tuple[List[Any], Optional[str]]:
+    """按 (排序键, id) 取一页，返回 (结果, 下一页游标)"""
+    if order_by not in KEYSET_SORT_COLUMNS:
+        raise InvalidCursorError(f"不支持按 {order_by} 进行游标分页")
+
+    columns = [model.id] if order_by == "id" else [getattr(model, order_by), model.id]
+    if cursor:
+        values = decode_cursor(cursor, order_by, order_desc)
+        if len(values) != len(columns):
+            raise InvalidCursorError("无效的分页游标")
+        key, bound = tuple_(*columns), tuple_(*values)
+        query = query.filter(key < bound if order_desc else key > bound)
+
+    direction = desc if order_desc else asc
+    rows = query.order_by(*[direction(c) for c in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            order_by, order_desc, [getattr(last, c.key) for c in columns]
+        )
+    return rows, next_cursor
+
+
+def estimated_row_count(db: Session, table: str) -> Optional[int]:
+    """按统计信息估算表行数（含分区），非PostgreSQL返回None"""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    estimate = db.execute(
+        text(
+            "SELECT sum(greatest(c.reltuples, 0))::bigint FROM pg_class c "
+            "WHERE c.oid = to_regclass(:table) OR c.oid IN "
+            "(SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table))"
+        ),
+        {"table": table},
+    ).scalar()
+    return int(estimate or 0)
+
+
+def capped_count(db: Session, query: Query, model: Any, cap: int) -> Tuple[int, bool]:
+    """最多数到cap+1行，返回 (数量, 是否精确)"""
+    subquery = query.with_entities(model.id).order_by(None).limit(cap + 1).subquery()
+    count = db.query(func.count()).select_from(subquery).scalar() or 0
+    return min(count, cap), count <= cap
+
+
+def page_total(db: Session, query: Query, model: Any) -> Tuple[int, bool]:
+    """计算分页总数：无过滤条件时估算，否则封顶计数"""
+    if query.whereclause is None:
+        estimate = estimated_row_count(db, model.__tablename__)
+        if estimate is not None:
+            return estimate, False
+    return capped_count(
+        db, query, model, getattr(settings, "PAGINATION_COUNT_CAP", 10000)
+    )
+
+
+def paginate(
+    db: Session,
+    query: Query,
+    model: Any,
+    *,
+    order_by: str = "created_at",
+    order_desc: bool = True,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    with_total: bool = False,
+) -> Page:
+    """键集分页，可选附带总数"""
+    items, next_cursor = keyset_paginate(
+        query,
+        model,
+        order_by=order_by,
+        order_desc=order_desc,
+        cursor=cursor,
+        limit=limit,
+    )
+    page = Page(items=items, next_cursor=next_cursor)
+    if with_total:
+        page.total, page.total_is_exact = page_total(db, query, model)
+    return page
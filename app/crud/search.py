@@ -0,0 +1,78 @@
+"""文本检索
+
+PostgreSQL上以 ILIKE 匹配（由 pg_trgm GIN 索引支撑，见迁移 search_trgm_indexes），
+按 similarity() 相关度排序；总数由同一条语句中的 count(*) OVER () 得出，
+匹配行数超过上限时只统计到上限。其他数据库退化为 LIKE 匹配、按id倒序
+"""
+
+from typing import Any, Sequence
+
+from sqlalchemy import func, literal, or_
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.crud.pagination import Page, capped_count
+
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def text_search_filter(db: Session, columns: Sequence[Any], term: str):
+    """任一列包含关键词"""
+    if _is_postgresql(db):
+        pattern = f"%{term}%"
+        return or_(*[column.ilike(pattern) for column in columns])
+    return or_(*[column.contains(term) for column in columns])
+
+
+def similarity_rank(db: Session, columns: Sequence[Any], term: str):
+    """相关度：各列与关键词三元组相似度的最大值"""
+    if not _is_postgresql(db):
+        return literal(0.0)
+    scores = [func.coalesce(func.similarity(column, term), 0) for column in columns]
+    return scores[0] if len(scores) == 1 else func.greatest(*scores)
+
+
+def ranked_search(
+    db: Session,
+    query: Query,
+    model: Any,
+    rank: Any,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+) -> Page:
+    """
+    按相关度分页，总数与结果在同一条语句中取得
+
+    候选集先按相关度取前 max(上限, skip+limit)+1 行（有界的top-N排序），
+    再在候选集上以窗口函数计数并截取当前页；
+    候选集被截断时 total 为候选集大小（下界），total_is_exact 为False
+    """
+    cap = getattr(settings, "PAGINATION_COUNT_CAP", 10000)
+    window = max(cap, skip + limit) + 1
+
+    candidates = (
+        query.with_entities(model.id.label("id"), rank.label("rank"))
+        .order_by(None)
+        .order_by(rank.desc(), model.id.desc())
+        .limit(window)
+        .subquery()
+    )
+    rows = (
+        db.query(model, func.count().over().label("total"))
+        .join(candidates, model.id == candidates.c.id)
+        .order_by(candidates.c.rank.desc(), model.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+    if rows:
+        total = min(rows[0].total, window - 1)
+        exact = rows[0].total < window
+    else:
+        # 越过末页时窗口计数不可用，退回封顶计数
+        total, exact = capped_count(db, query, model, cap)
+    return Page(items=[row[0] for row in rows], total=total, total_is_exact=exact)
@@ -6,5 +6,10 @@ from app.models.document import Document  # noqa
 from app.models.oauth2_client import OAuth2AuthorizationCode, OAuth2Client  # noqa
 from app.models.ocr import OCRResult  # noqa
 from app.models.project import Project  # noqa
+from app.models.stats_rollup import (  # noqa
+    AuditLogHourlyRollup,
+    SecurityEventHourlyRollup,
+    StatsRollupWatermark,
+)
 from app.models.token_blacklist import TokenBlacklist  # noqa
 from app.models.user import User  # noqa
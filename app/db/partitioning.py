@@ -0,0 +1,192 @@
+"""按月范围分区维护
+
+audit_logs、security_events 在PostgreSQL上按 created_at 做原生月分区
+（见迁移 monthly_partition_audit_security），本模块负责：
+- 预先创建未来月份的分区
+- 按月删除或分离过期分区，替代大批量DELETE
+分区命名为 {表名}_pYYYYMM，另有 {表名}_default 默认分区兜底
+"""
+
+import logging
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("audit_logs", "security_events")
+
+
+def month_start(value: datetime) -> date:
+    """所在月份的第一天"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """按月偏移，返回该月第一天"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """月分区表名"""
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    """表是否已转换为分区表（非PostgreSQL始终为False）"""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(
+        db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table)"
+            ),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def list_partitions(db: Session, table: str) -> List[date]:
+    """已挂载的月分区，按月份升序"""
+    names = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalars()
+
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})(\d{{2}})$")
+    months = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def _create_partition(db: Session, table: str, name: str, month: date) -> None:
+    """
+    创建月分区
+
+    默认分区中已有该月数据时无法直接创建（与默认分区的约束冲突）：
+    先分离默认分区，建好新分区后把该月数据移入，再重新挂载默认分区
+    """
+    default = f"{table}_default"
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_range = "created_at >= :start AND created_at < :end"
+    # 新分区自动继承父表上的索引（含created_at的BRIN索引）
+    create = text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+        f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    )
+
+    has_default = db.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": default}
+    ).scalar()
+    if (
+        not has_default
+        or not db.execute(
+            text(f'SELECT 1 FROM "{default}" WHERE {in_range} LIMIT 1'), bounds
+        ).scalar()
+    ):
+        db.execute(create)
+        return
+
+    db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+    db.execute(create)
+    moved = db.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE {in_range} RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        bounds,
+    ).rowcount
+    db.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+    logger.info(f"Moved {moved} rows from {default} into {name}")
+
+
+def ensure_partitions(
+    db: Session, table: str, *, months_ahead: int = 3, now: Optional[datetime] = None
+) -> List[str]:
+    """预先创建当前月及未来若干月的分区，返回新建的分区名"""
+    if not is_partitioned(db, table):
+        return []
+
+    existing = set(list_partitions(db, table))
+    current = month_start(now or datetime.utcnow())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        name = partition_name(table, month)
+        # 每个月份使用独立的保存点，单个月份失败不影响其余月份
+        try:
+            with db.begin_nested():
+                _create_partition(db, table, name, month)
+        except Exception as e:
+            logger.error(f"Failed to create partition {name}: {e}")
+            continue
+        created.append(name)
+
+    db.commit()
+    if created:
+        logger.info(f"Created partitions for {table}: {created}")
+    return created
+
+
+def drop_partitions_before(
+    db: Session,
+    table: str,
+    cutoff: datetime,
+    *,
+    detach: bool = False,
+    keep_if: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    删除（或仅分离）整月早于截止时间的分区，返回 分区名 -> 估算行数
+
+    截止时间所在月份的分区保留，待整月过期后再处理；
+    keep_if 为SQL条件，分区内存在满足条件的行时保留该分区；
+    分离的分区保留为独立表，可归档后手动删除
+    """
+    if not is_partitioned(db, table):
+        return {}
+
+    boundary = month_start(cutoff)
+    removed = {}
+    for month in list_partitions(db, table):
+        if add_months(month, 1) > boundary:
+            break
+        name = partition_name(table, month)
+        if (
+            keep_if
+            and db.execute(
+                text(f'SELECT 1 FROM "{name}" WHERE {keep_if} LIMIT 1')
+            ).scalar()
+        ):
+            continue
+
+        rows = db.execute(
+            text(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"
+            ),
+            {"name": name},
+        ).scalar()
+        db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+        if not detach:
+            db.execute(text(f'DROP TABLE "{name}"'))
+        removed[name] = max(rows or 0, 0)
+
+    db.commit()
+    if removed:
+        action = "Detached" if detach else "Dropped"
+        logger.info(f"{action} partitions for {table}: {list(removed)}")
+    return removed
@@ -0,0 +1,268 @@
+"""连接池遥测与自适应容量
+
+InstrumentedQueuePool 在 QueuePool 基础上记录：
+- 获取连接的等待时间（直方图）与超时次数，等待过长时按路由告警
+- 使用中、溢出连接数及容量（Gauge），失效连接数（Counter）
+PoolSizeController 按观测到的等待时间在上下限内调整 pool_size/max_overflow
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.monitoring import Counter, Gauge, Histogram
+from app.db.query_instrumentation import BACKGROUND_ROUTE, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check out a pooled connection",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+db_pool_checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that timed out waiting for the pool",
+    ["pool"],
+)
+db_pool_invalidated = Counter(
+    "db_pool_invalidated_total",
+    "Pooled connections invalidated",
+    ["pool"],
+)
+db_pool_in_use = Gauge("db_pool_in_use", "Connections checked out", ["pool"])
+db_pool_overflow = Gauge("db_pool_overflow", "Overflow connections open", ["pool"])
+db_pool_size = Gauge("db_pool_size", "Configured pool size", ["pool"])
+db_pool_max_overflow = Gauge(
+    "db_pool_max_overflow", "Configured pool max overflow", ["pool"]
+)
+
+
+@dataclass
+class PoolWindow:
+    """一个观测窗口内的连接获取统计"""
+
+    checkouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    timeouts: int = 0
+    peak_in_use: int = 0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.checkouts if self.checkouts else 0.0
+
+
+class InstrumentedQueuePool(QueuePool):
+    """带遥测的QueuePool，容量可在运行时调整"""
+
+    # 指标标签，引擎创建后可按用途改名（如 primary、replica0）
+    label = "primary"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._window = PoolWindow()
+        self._window_lock = threading.Lock()
+        # recreate()时沿用原池的事件分发，不重复注册
+        if kwargs.get("_dispatch") is None:
+            event.listen(self, "invalidate", self._on_invalidate)
+            event.listen(self, "soft_invalidate", self._on_invalidate)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        db_pool_invalidated.labels(pool=self.label).inc()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except sa_exc.TimeoutError:
+            self._observe_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        self._observe_checkout(time.perf_counter() - started)
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    def _observe_checkout(self, wait: float, timed_out: bool = False) -> None:
+        in_use = self.checkedout()
+        with self._window_lock:
+            window = self._window
+            window.checkouts += 1
+            window.total_wait += wait
+            window.max_wait = max(window.max_wait, wait)
+            window.timeouts += int(timed_out)
+            window.peak_in_use = max(window.peak_in_use, in_use)
+
+        db_pool_checkout_wait.labels(pool=self.label).observe(wait)
+        if timed_out:
+            db_pool_checkout_timeouts.labels(pool=self.label).inc()
+        self._update_gauges()
+
+        if timed_out or wait >= getattr(settings, "DB_POOL_CHECKOUT_WARN_SECONDS", 0.5):
+            stats = current_query_stats()
+            route = stats.route if stats is not None else BACKGROUND_ROUTE
+            logger.warning(
+                f"连接池获取{'超时' if timed_out else '等待过长'}: {route} "
+                f"{wait * 1000:.1f}ms",
+                extra={
+                    "pool": self.label,
+                    "route": route,
+                    "wait_ms": round(wait * 1000, 2),
+                    "timed_out": timed_out,
+                    "in_use": self.checkedout(),
+                    "pool_size": self.size(),
+                    "overflow": self.overflow(),
+                },
+            )
+
+    def _update_gauges(self) -> None:
+        db_pool_in_use.labels(pool=self.label).set(self.checkedout())
+        db_pool_overflow.labels(pool=self.label).set(max(self.overflow(), 0))
+        db_pool_size.labels(pool=self.label).set(self.size())
+        db_pool_max_overflow.labels(pool=self.label).set(self._max_overflow)
+
+    def take_window(self) -> PoolWindow:
+        """取出当前观测窗口并开始新窗口"""
+        with self._window_lock:
+            window, self._window = self._window, PoolWindow()
+        return window
+
+    def resize(self, pool_size: int, max_overflow: int) -> None:
+        """
+        运行时调整容量
+
+        QueuePool以 _overflow = 已建连接数 - pool_size 计数，改变pool_size时同步平移；
+        缩容后多出的连接在归还时因队列已满被关闭
+        """
+        with self._overflow_lock:
+            delta = pool_size - self._pool.maxsize
+            self._pool.maxsize = pool_size
+            self._overflow -= delta
+            self._max_overflow = max_overflow
+        self._update_gauges()
+
+
+def recommend_pool_size(
+    current: int,
+    window: PoolWindow,
+    *,
+    min_size: int,
+    max_size: int,
+    target_wait: float,
+    step: int = 2,
+) -> int:
+    """根据窗口内的等待情况给出新的pool_size
+
+    超时或平均等待超过目标时扩容；无等待且峰值占用不到一半时缩容
+    """
+    if window.timeouts or window.mean_wait > target_wait:
+        return min(current + step, max_size)
+    if window.max_wait < target_wait and window.peak_in_use * 2 < current:
+        return max(current - step, min_size)
+    return current
+
+
+class PoolSizeController:
+    """按观测到的等待时间周期性调整连接池容量"""
+
+    def __init__(self, engine: Engine):
+        # 引擎dispose()后连接池会重建，每次调整时重新取engine.pool
+        self.engine = engine
+        pool = self.pool
+        self.interval = getattr(settings, "DB_POOL_TUNING_INTERVAL", 60)
+        self.min_size = getattr(settings, "DB_POOL_MIN_SIZE", 5)
+        self.max_size = getattr(settings, "DB_POOL_MAX_SIZE", 50)
+        self.target_wait = getattr(settings, "DB_POOL_TARGET_WAIT", 0.05)
+        self.step = getattr(settings, "DB_POOL_TUNING_STEP", 2)
+        # 溢出上限与池容量保持初始配置的比例
+        size = pool.size() or 1
+        self.overflow_ratio = max(pool._max_overflow, 0) / size
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def pool(self) -> InstrumentedQueuePool:
+        return self.engine.pool
+
+    def tune(self) -> int:
+        """执行一次调整，返回调整后的pool_size"""
+        window = self.pool.take_window()
+        current = self.pool.size()
+        size = recommend_pool_size(
+            current,
+            window,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            target_wait=self.target_wait,
+            step=self.step,
+        )
+        if size != current:
+            max_overflow = round(size * self.overflow_ratio)
+            self.pool.resize(size, max_overflow)
+            logger.info(
+                f"Resized {self.pool.label} pool: pool_size {current} -> {size}, "
+                f"max_overflow {max_overflow} (mean wait "
+                f"{window.mean_wait * 1000:.1f}ms, timeouts {window.timeouts})"
+            )
+        return size
+
+    async def start(self):
+        """启动周期调整"""
+        if self.task is not None and not self.task.done():
+            logger.warning("Pool size controller is already running")
+            return
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止周期调整"""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                self.tune()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in pool size controller: {e}")
+
+
+_pool_size_controller: Optional[PoolSizeController] = None
+
+
+def get_pool_size_controller() -> Optional[PoolSizeController]:
+    """获取主库连接池的容量控制器；未开启 DB_POOL_AUTOTUNE 时返回None"""
+    global _pool_size_controller
+    if not getattr(settings, "DB_POOL_AUTOTUNE", False):
+        return None
+    if _pool_size_controller is None:
+        from app.db.session import engine
+
+        if not isinstance(engine.pool, InstrumentedQueuePool):
+            return None
+        _pool_size_controller = PoolSizeController(engine)
+    return _pool_size_controller
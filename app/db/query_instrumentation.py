@@ -0,0 +1,232 @@
+"""SQL执行埋点
+
+在引擎的 before/after_cursor_execute 事件上统计每条语句耗时：
+- 请求内的查询次数与数据库总耗时记入contextvar，请求结束时按路由输出
+- 同一请求内相同语句形态重复执行达到阈值时记为疑似N+1
+- 超过慢查询阈值的SELECT按采样率在后台线程中执行 EXPLAIN (ANALYZE, BUFFERS)
+指标以Prometheus直方图/计数器输出，明细写结构化日志
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter as ShapeCounter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.monitoring import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# 不在请求作用域内执行的语句（定时任务、启动阶段等）使用的路由标签
+BACKGROUND_ROUTE = "background"
+
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time in seconds",
+    ["route"],
+)
+db_request_queries = Histogram(
+    "db_request_queries",
+    "Number of SQL statements executed per request",
+    ["route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+db_request_duration = Histogram(
+    "db_request_duration_seconds",
+    "Total SQL execution time per request in seconds",
+    ["route"],
+)
+db_suspected_n_plus_one = Counter(
+    "db_suspected_n_plus_one_total",
+    "Requests that repeated one statement shape past the N+1 threshold",
+    ["route"],
+)
+db_slow_statements = Counter(
+    "db_slow_statements_total",
+    "SQL statements slower than the slow query threshold",
+    ["route"],
+)
+
+
+@dataclass
+class QueryStats:
+    """单个请求的SQL统计"""
+
+    scope: Optional[dict] = None
+    count: int = 0
+    duration: float = 0.0
+    shapes: ShapeCounter = field(default_factory=ShapeCounter)
+
+    @property
+    def route(self) -> str:
+        """路由模板（如 /api/v1/documents/{document_id}），路由匹配前为unmatched"""
+        route = (self.scope or {}).get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETERS = re.compile(r"%\(\w+\)s|%s|\?|:\w+|\$\d+")
+_IN_LISTS = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """语句形态：参数、字面量、IN列表归一后的SQL，用于识别重复执行"""
+    shape = _PARAMETERS.sub("?", statement)
+    shape = _LITERALS.sub("?", shape)
+    shape = _IN_LISTS.sub("IN (?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@contextmanager
+def query_stats_scope(scope: Optional[dict] = None) -> Iterator[QueryStats]:
+    """开启请求级SQL统计作用域，退出时输出指标；路由从ASGI scope中读取"""
+    stats = QueryStats(scope=scope)
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+        report_query_stats(stats)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """当前请求的SQL统计，不在作用域内返回None"""
+    return _query_stats.get()
+
+
+def suspected_n_plus_one(stats: QueryStats) -> List[tuple]:
+    """重复次数达到阈值的语句形态及次数"""
+    threshold = getattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 10)
+    return [(shape, n) for shape, n in stats.shapes.most_common() if n >= threshold]
+
+
+def report_query_stats(stats: QueryStats) -> None:
+    """按路由输出请求的SQL统计"""
+    if not stats.count:
+        return
+    db_request_queries.labels(route=stats.route).observe(stats.count)
+    db_request_duration.labels(route=stats.route).observe(stats.duration)
+
+    repeated = suspected_n_plus_one(stats)
+    if repeated:
+        db_suspected_n_plus_one.labels(route=stats.route).inc()
+        logger.warning(
+            f"疑似N+1查询: {stats.route} 执行 {stats.count} 条SQL",
+            extra={
+                "route": stats.route,
+                "query_count": stats.count,
+                "db_time_ms": round(stats.duration * 1000, 2),
+                "repeated_statements": [
+                    {"statement": shape[:500], "count": n} for shape, n in repeated[:5]
+                ],
+            },
+        )
+
+
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+# 同时排队的EXPLAIN数量上限，慢查询集中出现时直接丢弃采样
+_explain_slots = threading.BoundedSemaphore(2)
+
+
+def _explain(engine: Engine, statement: str, parameters: Any, route: str) -> None:
+    """在独立连接上执行 EXPLAIN ANALYZE 并记录计划，事务总是回滚"""
+    try:
+        timeout_ms = int(getattr(settings, "DB_EXPLAIN_TIMEOUT_MS", 10000))
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+            cursor.execute(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+            )
+            plan = cursor.fetchone()[0]
+            cursor.close()
+        finally:
+            connection.rollback()
+            connection.close()
+
+        logger.warning(
+            f"慢查询执行计划: {route}",
+            extra={
+                "route": route,
+                "statement": statement[:2000],
+                "plan": plan if isinstance(plan, str) else json.dumps(plan),
+            },
+        )
+    except Exception as e:
+        logger.debug(f"EXPLAIN failed for slow query on {route}: {e}")
+    finally:
+        _explain_slots.release()
+
+
+def _maybe_explain(conn, statement: str, parameters: Any, route: str) -> None:
+    """按采样率为慢SELECT提交后台EXPLAIN；写语句不做ANALYZE以免重复执行"""
+    if conn.dialect.name != "postgresql":
+        return
+    if statement.lstrip()[:6].upper() != "SELECT":
+        return
+    if random.random() >= getattr(settings, "DB_EXPLAIN_SAMPLE_RATE", 0.1):
+        return
+    if not _explain_slots.acquire(blocking=False):
+        return
+    try:
+        _explain_executor.submit(_explain, conn.engine, statement, parameters, route)
+    except RuntimeError:
+        _explain_slots.release()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 计时存放在本次执行的上下文上，语句出错时随上下文丢弃
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started_at", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    stats = _query_stats.get()
+    route = stats.route if stats is not None else BACKGROUND_ROUTE
+    db_statement_duration.labels(route=route).observe(elapsed)
+
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+        stats.shapes[statement_shape(statement)] += 1
+
+    if elapsed < getattr(settings, "DB_SLOW_QUERY_THRESHOLD", 0.5):
+        return
+    db_slow_statements.labels(route=route).inc()
+    logger.warning(
+        f"慢查询: {route} {elapsed * 1000:.1f}ms",
+        extra={
+            "route": route,
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": statement[:2000],
+        },
+    )
+    if not executemany:
+        _maybe_explain(conn, statement, parameters, route)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """为引擎注册SQL执行埋点（重复调用无副作用）"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
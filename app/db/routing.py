@@ -0,0 +1,159 @@
+"""只读副本路由
+
+标记为只读的工作单元（统计看板、审计日志检索、报表数据、搜索等）的查询
+发往只读副本，其余全部走主库：
+- 副本复制延迟超过上限或不可达时回退主库
+- 会话内发生过写入（flush或DML）后，该会话后续读取固定走主库，保证读到自己的写入
+"""
+
+import itertools
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY = "read_only"
+WROTE = "wrote"
+
+_DML_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+# PostgreSQL副本复制延迟（秒）；已回放到最新WAL时为0，主库为0
+_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReplicaSet:
+    """一组只读副本引擎，按复制延迟筛选后轮询使用
+
+    复制延迟由后台线程测量，请求线程只读取最近一次结果：
+    尚未测得或结果长时间未更新（测量卡在连接超时）的副本视为不可用，读取走主库
+    """
+
+    def __init__(
+        self,
+        engines: List[Engine],
+        *,
+        max_lag: float = 10.0,
+        check_interval: float = 5.0,
+    ):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # 测量结果超过该时长未更新时不再采信
+        self.max_age = check_interval * 3
+        # 引擎序号 -> (检查时间, 延迟秒数；不可达为None)
+        self._lag: Dict[int, tuple] = {}
+        # 每个副本一把锁，同一副本同一时刻只有一个测量线程
+        self._checking = [threading.Lock() for _ in engines]
+        self._next = itertools.cycle(range(len(engines))) if engines else None
+
+    def measure_lag(self, engine: Engine) -> Optional[float]:
+        """查询副本复制延迟，不可达返回None"""
+        try:
+            with engine.connect() as conn:
+                if conn.dialect.name != "postgresql":
+                    return 0.0
+                return float(conn.execute(_LAG_SQL).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"Read replica unavailable: {e}")
+            return None
+
+    def refresh(self, index: int) -> Optional[float]:
+        """同步测量一个副本的延迟并记录"""
+        lag = self.measure_lag(self.engines[index])
+        self._lag[index] = (time.monotonic(), lag)
+        return lag
+
+    def _refresh_in_background(self, index: int) -> None:
+        """在后台线程中测量延迟；该副本已有测量在进行时直接返回"""
+        lock = self._checking[index]
+        if not lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.refresh(index)
+            finally:
+                lock.release()
+
+        threading.Thread(target=run, name=f"replica-lag-{index}", daemon=True).start()
+
+    def lag(self, index: int) -> Optional[float]:
+        """副本最近一次测得的延迟，不阻塞调用方；结果过期时触发后台重新测量"""
+        checked_at, lag = self._lag.get(index, (None, None))
+        age = None if checked_at is None else time.monotonic() - checked_at
+        if age is None or age >= self.check_interval:
+            self._refresh_in_background(index)
+        if age is None or age >= self.max_age:
+            return None
+        return lag
+
+    def choose(self) -> Optional[Engine]:
+        """选择一个延迟在上限内的副本，均不可用时返回None"""
+        if not self._next:
+            return None
+        for _ in range(len(self.engines)):
+            index = next(self._next)
+            lag = self.lag(index)
+            if lag is not None and lag <= self.max_lag:
+                return self.engines[index]
+        return None
+
+
+class RoutingSession(Session):
+    """按工作单元是否只读选择主库或副本的会话"""
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._is_write(clause):
+            self.info[WROTE] = True
+        elif self.info.get(READ_ONLY) and not self.info.get(WROTE) and self.replicas:
+            # 同一会话固定使用首次选中的副本，避免跨副本读到不同快照
+            if self._replica is None:
+                self._replica = self.replicas.choose()
+            if self._replica is not None:
+                return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def _is_write(self, clause) -> bool:
+        """flush及DML语句为写入；写入标记在会话存续期间一直保留"""
+        if self._flushing:
+            return True
+        if clause is None:
+            return False
+        if isinstance(clause, TextClause):
+            words = clause.text.split(None, 1)
+            keyword = words[0].upper() if words else ""
+            if keyword == "WITH":
+                # 数据修改型CTE（WITH ... AS (UPDATE ...)）按写入处理
+                return bool(_DML_KEYWORDS.search(clause.text))
+            return keyword != "SELECT"
+        return bool(getattr(clause, "is_dml", False))
+
+
+@contextmanager
+def replica_reads(db: Session) -> Iterator[Session]:
+    """在作用域内将会话的读取发往只读副本（会话未写入过时）"""
+    previous = db.info.get(READ_ONLY, False)
+    db.info[READ_ONLY] = True
+    try:
+        yield db
+    finally:
+        db.info[READ_ONLY] = previous
@@ -2,15 +2,17 @@ from typing import Generator
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.db.pool_telemetry import InstrumentedQueuePool
+from app.db.query_instrumentation import instrument_engine
+from app.db.routing import READ_ONLY, ReplicaSet, RoutingSession
 
 # 创建PostgreSQL生产环境数据库引擎
 # 使用配置文件中的数据库URL
 engine = create_engine(
     settings.DATABASE_URL,
-    poolclass=QueuePool,
+    poolclass=InstrumentedQueuePool,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
@@ -26,7 +28,58 @@ engine = create_engine(
     },
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 只读副本引擎，连接参数与主库一致
+replica_engines = [
+    create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        echo=settings.DATABASE_ECHO,
+        connect_args={
+            "connect_timeout": 30,
+            "application_name": "sys_rev_tech_app_replica",
+            "client_encoding": "utf8",
+            "options": "-c timezone=UTC",
+            "sslmode": "disable",
+        },
+    )
+    for url in settings.database_replica_urls_list
+]
+# 连接池指标按用途区分
+for _index, _replica in enumerate(replica_engines):
+    _replica.pool.label = f"replica{_index}"
+
+replicas = ReplicaSet(
+    replica_engines,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG,
+    check_interval=settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL,
+)
+
+# SQL执行埋点：按请求统计查询次数与耗时、识别N+1、采样慢查询执行计划
+if getattr(settings, "DB_QUERY_INSTRUMENTATION", True):
+    for _engine in [engine, *replica_engines]:
+        instrument_engine(_engine)
+
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    replicas=replicas,
+)
+
+# 只读工作单元使用的会话：读取发往副本，发生写入后回到主库
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    replicas=replicas,
+    info={READ_ONLY: True},
+)
 
 
 def get_db() -> Generator:
@@ -36,3 +89,12 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator:
+    """获取只读工作单元的数据库会话（优先使用只读副本）"""
+    try:
+        db = ReadSessionLocal()
+        yield db
+    finally:
+        db.close()
@@ -22,6 +22,10 @@ from app.core.exceptions import (
     response_validation_exception_handler,
     validation_exception_handler,
 )
+from app.core.partition_maintenance import get_partition_maintenance_scheduler
+from app.core.stats_rollup import get_stats_rollup_scheduler
+from app.core.token_revocation import get_token_revocation
+from app.db.pool_telemetry import get_pool_size_controller
 from app.db.session import SessionLocal, get_db
 from app.middleware.auth import AuthMiddleware
 from app.middleware.enhanced_monitoring import (
@@ -33,7 +37,9 @@ from app.middleware.monitoring import (
     MonitoringMiddleware,
     setup_monitoring,
 )
+from app.middleware.query_stats import QueryStatsMiddleware
 from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.request_memo import RequestMemoMiddleware
 from app.services.cache_init import initialize_cache_system, shutdown_cache_system
 
 # 设置日志
@@ -80,6 +86,25 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Failed to start cache scheduler: {e}")
 
+    # 启动统计汇总任务
+    logger.info("Starting stats rollup scheduler...")
+    try:
+        await get_stats_rollup_scheduler().start()
+        logger.info("Stats rollup scheduler started successfully")
+    except Exception as e:
+        logger.error(f"Failed to start stats rollup scheduler: {e}")
+
+    # 启动分区维护任务
+    await get_partition_maintenance_scheduler().start()
+
+    # 启动连接池容量自适应调整（DB_POOL_AUTOTUNE开启时）
+    pool_size_controller = get_pool_size_controller()
+    if pool_size_controller is not None:
+        await pool_size_controller.start()
+
+    # 加载令牌吊销集合并订阅其他worker的吊销通知
+    await get_token_revocation().start()
+
     # 启动增强监控系统
     logger.info("Starting enhanced monitoring system...")
     try:
@@ -103,6 +128,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to stop enhanced monitoring system: {e}")
 
+    # 停止统计汇总和分区维护任务
+    await get_stats_rollup_scheduler().stop()
+    await get_partition_maintenance_scheduler().stop()
+    if pool_size_controller is not None:
+        await pool_size_controller.stop()
+    await get_token_revocation().stop()
+
     # 停止缓存调度器
     if settings.CACHE_ENABLED:
         logger.info("Stopping cache scheduler...")
@@ -184,6 +216,12 @@ app.add_middleware(EnhancedMonitoringMiddleware)
 # 添加基础监控中间件
 app.add_middleware(MonitoringMiddleware)
 
+# 添加SQL统计中间件（认证阶段的查询也计入请求）
+app.add_middleware(QueryStatsMiddleware)
+
+# 添加请求级记忆化中间件（最外层，认证阶段的查找结果可被路由依赖复用）
+app.add_middleware(RequestMemoMiddleware)
+
 # 创建静态文件目录（如果不存在）
 static_dir = "static"
 if not os.path.exists(static_dir):
@@ -1,6 +1,7 @@
 from .auth import AuthMiddleware, RequireAuthMiddleware, get_current_user_from_request
 from .monitoring import MonitoringMiddleware
 from .request_id import RequestIDMiddleware
+from .request_memo import RequestMemoMiddleware
 
 __all__ = [
     "AuthMiddleware",
@@ -8,4 +9,5 @@ __all__ = [
     "get_current_user_from_request",
     "MonitoringMiddleware",
     "RequestIDMiddleware",
+    "RequestMemoMiddleware",
 ]
@@ -0,0 +1,23 @@
+"""
+SQL统计中间件
+"""
+
+from app.db.query_instrumentation import query_stats_scope
+
+
+class QueryStatsMiddleware:
+    """为每个HTTP请求开启SQL统计作用域的ASGI中间件
+
+    路由匹配后FastAPI将路由写入scope，统计按路由模板打标签
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with query_stats_scope(scope):
+            await self.app(scope, receive, send)
@@ -0,0 +1,23 @@
+"""
+请求级记忆化中间件
+"""
+
+from app.core.request_memo import request_memo_scope
+
+
+class RequestMemoMiddleware:
+    """为每个HTTP请求开启记忆化作用域的ASGI中间件
+
+    需注册在认证中间件外层，使认证阶段的查找结果可被路由依赖复用
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_memo_scope():
+            await self.app(scope, receive, send)
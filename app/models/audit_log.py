@@ -12,7 +12,10 @@ from app.db.base_class import Base
 
 
 class AuditLog(Base):
-    """审计日志模型"""
+    """审计日志模型
+
+    PostgreSQL上按created_at月分区，数据库主键为(id, created_at)
+    """
 
     __tablename__ = "audit_logs"
 
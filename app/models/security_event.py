@@ -56,7 +56,10 @@ class SecurityEventLevel(enum.Enum):
 
 
 class SecurityEvent(Base):
-    """安全事件模型"""
+    """安全事件模型
+
+    PostgreSQL上按created_at月分区，数据库主键为(id, created_at)
+    """
 
     __tablename__ = "security_events"
 
@@ -0,0 +1,82 @@
+"""统计汇总模型
+
+审计日志、安全事件按小时预聚合的汇总表，以及增量汇总任务的高水位记录
+"""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+
+from app.db.base_class import Base
+
+
+class AuditLogHourlyRollup(Base):
+    """审计日志小时汇总"""
+
+    __tablename__ = "audit_log_hourly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 汇总维度
+    bucket = Column(DateTime, nullable=False)  # 小时起点
+    action = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    username = Column(String(100), nullable=True)  # 冗余字段，取最近一次
+
+    # 汇总值
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index(
+            "ix_audit_log_hourly_rollups_key",
+            "bucket",
+            "action",
+            "status",
+            "user_id",
+        ),
+    )
+
+
+class SecurityEventHourlyRollup(Base):
+    """安全事件小时汇总
+
+    解决状态会在事件创建后变化，不作为汇总维度
+    """
+
+    __tablename__ = "security_event_hourly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 汇总维度（枚举存储为值字符串）
+    bucket = Column(DateTime, nullable=False)  # 小时起点
+    event_type = Column(String(50), nullable=False)
+    level = Column(String(20), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    username = Column(String(100), nullable=True)  # 冗余字段，取最近一次
+
+    # 汇总值
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index(
+            "ix_security_event_hourly_rollups_key",
+            "bucket",
+            "event_type",
+            "level",
+            "user_id",
+        ),
+    )
+
+
+class StatsRollupWatermark(Base):
+    """增量汇总高水位
+
+    记录每张源表已汇总到的最大ID，ID不超过该值的行由汇总表覆盖
+    """
+
+    __tablename__ = "stats_rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)  # 源表名
+    last_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
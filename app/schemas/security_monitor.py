@@ -42,6 +42,8 @@ class AuditLogSearch(BaseModel):
     end_time: Optional[datetime] = None
     skip: int = Field(0, ge=0)
     limit: int = Field(100, ge=1, le=1000)
+    cursor: Optional[str] = Field(None, description="游标分页的下一页游标")
+    with_total: bool = Field(True, description="是否返回总数（估算或封顶计数）")
 
     model_config = {
         "json_schema_extra": {
@@ -69,6 +71,8 @@ class SecurityEventSearch(BaseModel):
     end_time: Optional[datetime] = None
     skip: int = Field(0, ge=0)
     limit: int = Field(100, ge=1, le=1000)
+    cursor: Optional[str] = Field(None, description="游标分页的下一页游标")
+    with_total: bool = Field(True, description="是否返回总数（估算或封顶计数）")
 
     model_config = {
         "json_schema_extra": {
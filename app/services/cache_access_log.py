@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存访问日志
+在进程内累积键访问次数，批量写入Redis中的访问草图：
+- 频率：按时间窗口分片的count-min sketch（BITFIELD饱和计数器）
+- 近期性：按最后访问时间排序的有界候选集合（ZSET）
+预热服务据此预测各缓存类型的热点键
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheAccessLog:
+    """缓存访问草图"""
+
+    def __init__(self, key_prefix: str = "cache:access"):
+        self.key_prefix = key_prefix
+        self.enabled = getattr(settings, "CACHE_ACCESS_LOG_ENABLED", True)
+        self.width = getattr(settings, "CACHE_ACCESS_SKETCH_WIDTH", 8192)
+        self.depth = getattr(settings, "CACHE_ACCESS_SKETCH_DEPTH", 4)
+        self.window_seconds = getattr(settings, "CACHE_ACCESS_WINDOW_SECONDS", 3600)
+        self.max_candidates = getattr(settings, "CACHE_ACCESS_CANDIDATES", 2000)
+        self.flush_threshold = getattr(settings, "CACHE_ACCESS_FLUSH_THRESHOLD", 1000)
+
+        # 命名空间 -> 键 -> [未写入的访问次数, 最后访问时间]
+        self._pending: Dict[str, Dict[str, list]] = defaultdict(dict)
+        self._pending_count = 0
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _cms_key(self, namespace: str, window: int) -> str:
+        return f"{self.key_prefix}:cms:{namespace}:{window}"
+
+    def _recent_key(self, namespace: str) -> str:
+        return f"{self.key_prefix}:recent:{namespace}"
+
+    def _indexes(self, key: str) -> List[int]:
+        """各行计数器的位置，使用稳定哈希保证跨进程一致"""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        h1 = int.from_bytes(digest[:4], "little")
+        h2 = int.from_bytes(digest[4:], "little") | 1
+        return [
+            row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)
+        ]
+
+    def record(self, namespace: str, key: str, redis_client=None) -> None:
+        """记录一次访问，累积到阈值后在后台批量写入Redis；没有Redis时不记录"""
+        if not self.enabled or redis_client is None:
+            return
+
+        entry = self._pending[namespace].get(key)
+        if entry is None:
+            self._pending[namespace][key] = [1, time.time()]
+        else:
+            entry[0] += 1
+            entry[1] = time.time()
+        self._pending_count += 1
+
+        if self._pending_count >= self.flush_threshold and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self.flush(redis_client)
+            )
+
+    async def flush(self, redis_client) -> int:
+        """将累积的访问写入Redis，返回写入的键数"""
+        if not self._pending or redis_client is None:
+            return 0
+
+        pending, self._pending = self._pending, defaultdict(dict)
+        self._pending_count = 0
+        window = int(time.time() // self.window_seconds)
+
+        written = 0
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for namespace, entries in pending.items():
+                cms_key = self._cms_key(namespace, window)
+                recent_key = self._recent_key(namespace)
+
+                args = ["OVERFLOW", "SAT"]
+                for key, (count, _) in entries.items():
+                    for index in self._indexes(key):
+                        args.extend(("INCRBY", "u16", f"#{index}", count))
+                pipe.execute_command("BITFIELD", cms_key, *args)
+                # 保留当前和上一个窗口，用于平滑窗口切换
+                pipe.expire(cms_key, self.window_seconds * 2)
+
+                pipe.zadd(
+                    recent_key,
+                    {key: last_seen for key, (_, last_seen) in entries.items()},
+                )
+                pipe.zremrangebyrank(recent_key, 0, -(self.max_candidates + 1))
+                pipe.expire(recent_key, self.window_seconds * 24)
+                written += len(entries)
+
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache access log flush error: {e}")
+            return 0
+
+        return written
+
+    async def top_keys(self, redis_client, namespace: str, limit: int) -> List[str]:
+        """
+        预测热点键
+
+        从近期候选集中取键，按 频率估计 × 近期衰减 排序：
+        频率为当前窗口计数加上一窗口计数的一半，近期衰减按窗口长度指数衰减
+        """
+        if redis_client is None or limit <= 0:
+            return []
+
+        try:
+            candidates: List[Tuple[bytes, float]] = await redis_client.zrevrange(
+                self._recent_key(namespace), 0, self.max_candidates - 1, withscores=True
+            )
+            if not candidates:
+                return []
+
+            window = int(time.time() // self.window_seconds)
+            pipe = redis_client.pipeline(transaction=False)
+            for member, _ in candidates:
+                key = member.decode("utf-8") if isinstance(member, bytes) else member
+                args = []
+                for index in self._indexes(key):
+                    args.extend(("GET", "u16", f"#{index}"))
+                for cms_window in (window, window - 1):
+                    pipe.execute_command(
+                        "BITFIELD", self._cms_key(namespace, cms_window), *args
+                    )
+            counters = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache access log read error: {e}")
+            return []
+
+        now = time.time()
+        scored = []
+        for i, (member, last_seen) in enumerate(candidates):
+            key = member.decode("utf-8") if isinstance(member, bytes) else member
+            current = min(counters[2 * i] or [0])
+            previous = min(counters[2 * i + 1] or [0])
+            frequency = current + previous / 2
+            recency = math.exp(-max(0.0, now - last_seen) / self.window_seconds)
+            scored.append((frequency * recency, key))
+
+        scored.sort(reverse=True)
+        return [key for score, key in scored[:limit] if score > 0]
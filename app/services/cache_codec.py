@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存值编解码
+提供可插拔的序列化器和压缩器注册表，编码结果带一个头字节记录所用编解码器，
+更换格式时无需清空Redis
+"""
+
+import gzip
+import json
+import logging
+import pickle
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# 头字节布局: 0b11SSSCCC, S为序列化器ID, C为压缩器ID。
+# 高两位固定为1, 与旧格式的首字节(pickle 0x80、gzip 0x1f、JSON ASCII)不冲突
+_HEADER_MARK = 0xC0
+
+
+class _Missing:
+    """负缓存哨兵: 表示"已确认不存在", 区别于缓存未命中"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __reduce__(self):
+        return (_Missing, ())
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+# 负缓存条目只有一个头字节(序列化器ID 0保留), 两级缓存之间可无损传递
+_NEGATIVE_ENTRY = bytes((_HEADER_MARK,))
+
+
+@dataclass(frozen=True)
+class Serializer:
+    """序列化器"""
+
+    codec_id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+    accepts: Optional[Callable[[Any], bool]] = None  # 不适用的值回退到pickle
+
+
+@dataclass(frozen=True)
+class Compressor:
+    """压缩器"""
+
+    codec_id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_json_compatible(value: Any) -> bool:
+    """
+    值解码后类型不变时才使用JSON类编码:
+    元组会变成列表、非字符串键会变成字符串, 这类值回退到pickle
+    """
+    if isinstance(value, _JSON_SCALARS):
+        return True
+    if type(value) is list:
+        return all(_is_json_compatible(v) for v in value)
+    if type(value) is dict:
+        return all(
+            isinstance(k, str) and _is_json_compatible(v) for k, v in value.items()
+        )
+    return False
+
+
+def _is_float_vector(value: Any) -> bool:
+    """仅浮点数列表使用float32编码, 解码后仍为浮点数列表; 整数、元组等回退到pickle"""
+    return type(value) is list and all(type(v) is float for v in value)
+
+
+def _float32_dumps(value: Any) -> bytes:
+    """向量按小端float32原始字节存储, 体积约为pickle的一半(精度降为单精度)"""
+    data = array("f", value)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _float32_loads(data: bytes) -> list:
+    values = array("f")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+class CacheCodec:
+    """缓存值编解码器"""
+
+    def __init__(self):
+        self.serializers: Dict[str, Serializer] = {}
+        self.compressors: Dict[str, Compressor] = {}
+        self._serializers_by_id: Dict[int, Serializer] = {}
+        self._compressors_by_id: Dict[int, Compressor] = {}
+
+        self.compression_codec = getattr(settings, "CACHE_COMPRESSION_CODEC", "zstd")
+        self.compression_min_bytes = getattr(
+            settings, "CACHE_COMPRESSION_MIN_BYTES", 1024
+        )
+        self._register_builtin()
+
+    def register_serializer(self, serializer: Serializer):
+        """注册序列化器"""
+        if not 0 < serializer.codec_id < 8:
+            raise ValueError("Serializer id must be between 1 and 7")
+        self.serializers[serializer.name] = serializer
+        self._serializers_by_id[serializer.codec_id] = serializer
+
+    def register_compressor(self, compressor: Compressor):
+        """注册压缩器"""
+        if not 0 < compressor.codec_id < 8:
+            raise ValueError("Compressor id must be between 1 and 7")
+        self.compressors[compressor.name] = compressor
+        self._compressors_by_id[compressor.codec_id] = compressor
+
+    def _register_builtin(self):
+        """注册内置编解码器, 可选依赖未安装时跳过"""
+        self.register_serializer(
+            Serializer(
+                1,
+                "pickle",
+                lambda v: pickle.dumps(v, pickle.HIGHEST_PROTOCOL),
+                pickle.loads,
+            )
+        )
+        self.register_serializer(
+            Serializer(
+                2,
+                "json",
+                lambda v: json.dumps(v, ensure_ascii=False).encode("utf-8"),
+                lambda d: json.loads(d.decode("utf-8")),
+                _is_json_compatible,
+            )
+        )
+        if msgpack is not None:
+            self.register_serializer(
+                Serializer(
+                    3,
+                    "msgpack",
+                    lambda v: msgpack.packb(v, use_bin_type=True),
+                    lambda d: msgpack.unpackb(d, raw=False, strict_map_key=False),
+                    _is_json_compatible,
+                )
+            )
+        if orjson is not None:
+            self.register_serializer(
+                Serializer(
+                    4,
+                    "orjson",
+                    lambda v: orjson.dumps(v, option=orjson.OPT_NON_STR_KEYS),
+                    orjson.loads,
+                    _is_json_compatible,
+                )
+            )
+        self.register_serializer(
+            Serializer(5, "float32", _float32_dumps, _float32_loads, _is_float_vector)
+        )
+
+        self.register_compressor(
+            Compressor(
+                1,
+                "gzip",
+                lambda d: gzip.compress(d, compresslevel=1),
+                gzip.decompress,
+            )
+        )
+        if zstandard is not None:
+            self.register_compressor(
+                Compressor(
+                    2,
+                    "zstd",
+                    # 压缩/解压对象不可跨线程共享, 每次调用单独创建
+                    lambda d: zstandard.ZstdCompressor(level=3).compress(d),
+                    lambda d: zstandard.ZstdDecompressor().decompress(d),
+                )
+            )
+        if lz4_frame is not None:
+            self.register_compressor(
+                Compressor(3, "lz4", lz4_frame.compress, lz4_frame.decompress)
+            )
+
+    def _select_compressor(self) -> Compressor:
+        """优先使用配置的压缩器, 未安装时依次回退到zstd、lz4、gzip"""
+        for name in (self.compression_codec, "zstd", "lz4", "gzip"):
+            if name in self.compressors:
+                return self.compressors[name]
+        return self.compressors["gzip"]
+
+    def encode(
+        self, value: Any, serialization: str = "pickle", compression: bool = False
+    ) -> bytes:
+        """
+        编码缓存值
+
+        Args:
+            value: 缓存值
+            serialization: 序列化方式, 未注册或不适用于该值时回退到pickle
+            compression: 是否压缩, 仅超过阈值的数据才实际压缩
+
+        Returns:
+            头字节 + 编码数据
+        """
+        if value is MISSING:
+            return _NEGATIVE_ENTRY
+
+        serializer = self.serializers.get(serialization) or self.serializers["pickle"]
+        if serializer.accepts is not None and not serializer.accepts(value):
+            serializer = self.serializers["pickle"]
+
+        try:
+            data = serializer.dumps(value)
+        except (TypeError, ValueError, OverflowError) as e:
+            if serializer.name == "pickle":
+                raise
+            logger.debug(f"{serializer.name} cannot encode value, using pickle: {e}")
+            serializer = self.serializers["pickle"]
+            data = serializer.dumps(value)
+
+        compressor_id = 0
+        if compression and len(data) >= self.compression_min_bytes:
+            compressor = self._select_compressor()
+            compressed = compressor.compress(data)
+            if len(compressed) < len(data):
+                data = compressed
+                compressor_id = compressor.codec_id
+
+        header = _HEADER_MARK | (serializer.codec_id << 3) | compressor_id
+        return bytes((header,)) + data
+
+    def decode(
+        self,
+        data: bytes,
+        legacy_serialization: str = "pickle",
+        legacy_compression: bool = False,
+    ) -> Any:
+        """
+        解码缓存值
+
+        Args:
+            data: 编码数据
+            legacy_serialization: 无头字节的旧数据所用的序列化方式
+            legacy_compression: 旧数据是否gzip压缩
+        """
+        if data == _NEGATIVE_ENTRY:
+            return MISSING
+        if not data or data[0] & _HEADER_MARK != _HEADER_MARK:
+            return self._decode_legacy(data, legacy_serialization, legacy_compression)
+
+        header = data[0]
+        serializer_id = (header >> 3) & 0x07
+        compressor_id = header & 0x07
+
+        serializer = self._serializers_by_id.get(serializer_id)
+        if serializer is None:
+            raise ValueError(f"Unknown cache serializer id: {serializer_id}")
+
+        payload = data[1:]
+        if compressor_id:
+            compressor = self._compressors_by_id.get(compressor_id)
+            if compressor is None:
+                raise ValueError(f"Unknown cache compressor id: {compressor_id}")
+            payload = compressor.decompress(payload)
+
+        return serializer.loads(payload)
+
+    @staticmethod
+    def _decode_legacy(data: bytes, serialization: str, compression: bool) -> Any:
+        """兼容引入头字节之前写入的数据"""
+        if compression:
+            data = gzip.decompress(data)
+        if serialization == "json":
+            return json.loads(data.decode("utf-8"))
+        return pickle.loads(data)
+
+
+# 全局编解码器实例
+cache_codec = CacheCodec()
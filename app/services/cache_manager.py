@@ -8,7 +8,7 @@
 import asyncio
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from app.config.cache_strategy import (
     CacheStrategy,
@@ -29,6 +29,7 @@ from app.services.cache_optimizer import (
     cache_optimizer,
 )
 from app.services.cache_service import cache_service
+from app.services.multi_level_cache import CacheHitType
 
 
 @dataclass
@@ -358,14 +359,17 @@ class CacheManager:
         start_time = datetime.now()
 
         try:
-            value = await cache_service.get(key, cache_type)
+            value, hit_type = await cache_service.get_with_status(key, cache_type)
 
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
-            hit = value is not None
+            # 命中负缓存同样算命中：已确认数据不存在，调用方无需再查数据库
+            hit = hit_type != CacheHitType.MISS
+            negative = hit_type == CacheHitType.NEGATIVE_HIT
 
             # 记录指标
             monitor = get_cache_monitor()
-            monitor.record_operation(cache_type, "get", True, execution_time, hit)
+            monitor.record_request_time(execution_time)
+            monitor.record_cache_hit(hit_type)
 
             return CacheOperationResult(
                 success=True,
@@ -373,7 +377,7 @@ class CacheManager:
                 cache_type=cache_type,
                 key=key,
                 execution_time=execution_time,
-                metadata={"value": value, "hit": hit},
+                metadata={"value": value, "hit": hit, "negative": negative},
             )
 
         except Exception as e:
@@ -381,7 +385,7 @@ class CacheManager:
 
             # 记录错误指标
             monitor = get_cache_monitor()
-            monitor.record_operation(cache_type, "get", False, execution_time)
+            monitor.record_cache_error()
 
             return CacheOperationResult(
                 success=False,
@@ -494,30 +498,31 @@ class CacheManager:
         self,
         items: Dict[str, Any],
         cache_type: str = "default",
-        ttl: Optional[int] = None,
-    ) -> List[CacheOperationResult]:
+        ttl: Optional[Union[int, Dict[str, int]]] = None,
+    ) -> Dict[str, bool]:
         """
         批量设置缓存
 
         Args:
             items: 键值对字典
             cache_type: 缓存类型
-            ttl: 过期时间（秒）
+            ttl: 过期时间（秒），或键到过期时间的字典
 
         Returns:
-            操作结果列表
+            键到是否设置成功的字典
         """
-        results = []
+        start_time = datetime.now()
 
-        for key, value in items.items():
-            result = await self.set_cache(key, value, cache_type, ttl)
-            results.append(result)
+        results = await cache_service.batch_set(items, cache_type, ttl)
+
+        execution_time = (datetime.now() - start_time).total_seconds() * 1000
+        get_cache_monitor().record_request_time(execution_time)
 
         return results
 
     async def batch_get(
         self, keys: List[str], cache_type: str = "default"
-    ) -> List[CacheOperationResult]:
+    ) -> Dict[str, Any]:
         """
         批量获取缓存
 
@@ -526,13 +531,14 @@ class CacheManager:
             cache_type: 缓存类型
 
         Returns:
-            操作结果列表
+            键到缓存值的字典，未命中为None
         """
-        results = []
+        start_time = datetime.now()
 
-        for key in keys:
-            result = await self.get_cache(key, cache_type)
-            results.append(result)
+        results = await cache_service.batch_get(keys, cache_type)
+
+        execution_time = (datetime.now() - start_time).total_seconds() * 1000
+        get_cache_monitor().record_request_time(execution_time)
 
         return results
 
@@ -432,7 +432,7 @@ class CacheMonitor:
             if hit_type == CacheHitType.L1_HIT:
                 self.hit_miss_stats["total_hits"] += 1
                 self.hit_miss_stats["l1_hits"] += 1
-            elif hit_type == CacheHitType.L2_HIT:
+            elif hit_type in (CacheHitType.L2_HIT, CacheHitType.NEGATIVE_HIT):
                 self.hit_miss_stats["total_hits"] += 1
             elif hit_type == CacheHitType.MISS:
                 self.hit_miss_stats["total_misses"] += 1
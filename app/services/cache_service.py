@@ -5,10 +5,9 @@
 提供Redis缓存操作的核心功能
 """
 
-import gzip
-import pickle
 from datetime import datetime
-from typing import Any, Dict, Optional
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import redis.asyncio as redis
 from redis.asyncio import Redis
@@ -20,6 +19,8 @@ from app.config.cache_strategy import (
 )
 from app.core.config import settings
 from app.core.logger import logger
+from app.services.cache_codec import MISSING, cache_codec
+from app.services.multi_level_cache import CacheHitType
 
 
 class CacheService:
@@ -28,12 +29,16 @@ class CacheService:
     提供统一的缓存操作接口
     """
 
+    # 默认使用pickle；策略显式选择以下编码时才采用（编解码器只对解码后类型不变的值生效）
+    fast_serializations = {"msgpack", "orjson", "float32"}
+
     def __init__(self):
         self.redis_client: Optional[Redis] = None
         self.local_cache: Dict[str, Any] = {}  # L1本地缓存
         self.cache_stats = {
             "hits": 0,
             "misses": 0,
+            "negative_hits": 0,
             "sets": 0,
             "deletes": 0,
             "errors": 0,
@@ -113,13 +118,31 @@ class CacheService:
             cache_type: 缓存类型
 
         Returns:
-            缓存值或None
+            缓存值或None（未命中和命中负缓存均为None，需区分时使用get_with_status）
+        """
+        value, _ = await self.get_with_status(key, cache_type)
+        return value
+
+    async def get_with_status(
+        self, key: str, cache_type: str = "default"
+    ) -> Tuple[Optional[Any], CacheHitType]:
+        """
+        获取缓存值及命中类型
+
+        Args:
+            key: 缓存键
+            cache_type: 缓存类型
+
+        Returns:
+            (缓存值, 命中类型)；命中负缓存时为 (None, NEGATIVE_HIT)，
+            调用方据此跳过数据库查询
         """
+        full_key = key
         try:
             strategy = get_cache_strategy(cache_type)
             if not strategy:
                 logger.warning(f"未找到缓存策略: {cache_type}")
-                return None
+                return None, CacheHitType.MISS
 
             full_key = f"{strategy.key_prefix}:{key}"
 
@@ -127,28 +150,31 @@ class CacheService:
             if strategy.level == CacheLevel.L1_MEMORY:
                 if full_key in self.local_cache:
                     self.cache_stats["hits"] += 1
-                    return self.local_cache[full_key]
+                    return self.local_cache[full_key], CacheHitType.L1_HIT
 
             # L2 Redis缓存查找
             if strategy.level == CacheLevel.L2_REDIS and self.redis_client:
                 value = await self.redis_client.get(full_key)
                 if value is not None:
-                    self.cache_stats["hits"] += 1
                     deserialized_value = self._deserialize(value, strategy)
+                    if deserialized_value is MISSING:
+                        self.cache_stats["negative_hits"] += 1
+                        return None, CacheHitType.NEGATIVE_HIT
+                    self.cache_stats["hits"] += 1
 
                     # 回填L1缓存（对于L2_REDIS策略，也可以回填到L1）
                     self.local_cache[full_key] = deserialized_value
                     await self._evict_local_cache_if_needed()
 
-                    return deserialized_value
+                    return deserialized_value, CacheHitType.L2_HIT
 
             self.cache_stats["misses"] += 1
-            return None
+            return None, CacheHitType.MISS
 
         except Exception as e:
             logger.error(f"获取缓存失败 {full_key}: {e}")
             self.cache_stats["errors"] += 1
-            return None
+            return None, CacheHitType.MISS
 
     async def set(
         self,
@@ -201,6 +227,44 @@ class CacheService:
             self.cache_stats["errors"] += 1
             return False
 
+    async def set_negative(
+        self, key: str, cache_type: str = "default", ttl: Optional[int] = None
+    ) -> bool:
+        """
+        写入负缓存，记录该键对应的数据不存在
+
+        本地缓存没有过期机制，负缓存只写入Redis；数据创建后调用delete清除
+
+        Args:
+            key: 缓存键
+            cache_type: 缓存类型
+            ttl: 过期时间（秒），默认使用策略的负缓存TTL
+
+        Returns:
+            是否设置成功
+        """
+        strategy = get_cache_strategy(cache_type)
+        if not strategy or strategy.level != CacheLevel.L2_REDIS:
+            return False
+        if not self.redis_client:
+            return False
+
+        full_key = f"{strategy.key_prefix}:{key}"
+        negative_ttl = ttl or min(
+            strategy.negative_ttl or getattr(settings, "CACHE_NEGATIVE_TTL", 60),
+            strategy.ttl,
+        )
+        try:
+            await self.redis_client.setex(
+                full_key, negative_ttl, self._serialize(MISSING, strategy)
+            )
+            self.cache_stats["sets"] += 1
+            return True
+        except Exception as e:
+            logger.error(f"设置负缓存失败 {full_key}: {e}")
+            self.cache_stats["errors"] += 1
+            return False
+
     async def delete(self, key: str, cache_type: str = "default") -> bool:
         """
         删除缓存
@@ -237,6 +301,163 @@ class CacheService:
             self.cache_stats["errors"] += 1
             return False
 
+    async def batch_get(
+        self, keys: List[str], cache_type: str = "default"
+    ) -> Dict[str, Any]:
+        """
+        批量获取缓存值
+
+        先查L1，未命中的键通过一次MGET从Redis获取，并批量回填L1
+
+        Args:
+            keys: 缓存键列表
+            cache_type: 缓存类型
+
+        Returns:
+            键到缓存值的字典，未命中为None
+        """
+        results: Dict[str, Any] = {key: None for key in keys}
+        try:
+            strategy = get_cache_strategy(cache_type)
+            if not strategy:
+                logger.warning(f"未找到缓存策略: {cache_type}")
+                return results
+
+            misses = []
+            for key in keys:
+                full_key = f"{strategy.key_prefix}:{key}"
+                if (
+                    strategy.level == CacheLevel.L1_MEMORY
+                    and full_key in self.local_cache
+                ):
+                    results[key] = self.local_cache[full_key]
+                    self.cache_stats["hits"] += 1
+                else:
+                    misses.append((key, full_key))
+
+            if misses and strategy.level == CacheLevel.L2_REDIS and self.redis_client:
+                values = await self.redis_client.mget(
+                    [full_key for _, full_key in misses]
+                )
+                remaining = []
+                for (key, full_key), value in zip(misses, values):
+                    if value is None:
+                        remaining.append((key, full_key))
+                        continue
+                    deserialized_value = self._deserialize(value, strategy)
+                    if deserialized_value is MISSING:
+                        self.cache_stats["negative_hits"] += 1
+                        continue
+                    results[key] = deserialized_value
+                    self.local_cache[full_key] = deserialized_value
+                    self.cache_stats["hits"] += 1
+                misses = remaining
+
+                # 批量回填后统一检查一次容量
+                await self._evict_local_cache_if_needed()
+
+            self.cache_stats["misses"] += len(misses)
+            return results
+
+        except Exception as e:
+            logger.error(f"批量获取缓存失败: {e}")
+            self.cache_stats["errors"] += 1
+            return results
+
+    async def batch_set(
+        self,
+        items: Dict[str, Any],
+        cache_type: str = "default",
+        ttl: Optional[Union[int, Dict[str, int]]] = None,
+    ) -> Dict[str, bool]:
+        """
+        批量设置缓存值
+
+        所有Redis写入通过一个流水线完成，每个键可单独指定TTL
+
+        Args:
+            items: 键值对字典
+            cache_type: 缓存类型
+            ttl: 统一过期时间（秒），或键到过期时间的字典
+
+        Returns:
+            键到是否设置成功的字典
+        """
+        results = {key: False for key in items}
+        try:
+            strategy = get_cache_strategy(cache_type)
+            if not strategy:
+                logger.warning(f"未找到缓存策略: {cache_type}")
+                return results
+
+            if strategy.level == CacheLevel.L1_MEMORY:
+                for key, value in items.items():
+                    self.local_cache[f"{strategy.key_prefix}:{key}"] = value
+                await self._evict_local_cache_if_needed()
+
+            if strategy.level == CacheLevel.L2_REDIS and self.redis_client:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, value in items.items():
+                    full_key = f"{strategy.key_prefix}:{key}"
+                    key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+                    effective_ttl = key_ttl or strategy.ttl
+                    serialized_value = self._serialize(value, strategy)
+                    if effective_ttl > 0:
+                        pipe.setex(full_key, effective_ttl, serialized_value)
+                    else:
+                        pipe.set(full_key, serialized_value)
+                responses = await pipe.execute(raise_on_error=False)
+                results = {
+                    key: not isinstance(response, Exception) and bool(response)
+                    for key, response in zip(items, responses)
+                }
+            else:
+                results = {key: True for key in items}
+
+            self.cache_stats["sets"] += sum(results.values())
+            return results
+
+        except Exception as e:
+            logger.error(f"批量设置缓存失败: {e}")
+            self.cache_stats["errors"] += 1
+            return results
+
+    async def batch_delete(
+        self, keys: List[str], cache_type: str = "default"
+    ) -> int:
+        """
+        批量删除缓存
+
+        Args:
+            keys: 缓存键列表
+            cache_type: 缓存类型
+
+        Returns:
+            删除的键数量
+        """
+        try:
+            strategy = get_cache_strategy(cache_type)
+            if not strategy or not keys:
+                return 0
+
+            full_keys = [f"{strategy.key_prefix}:{key}" for key in keys]
+            deleted_count = 0
+
+            for full_key in full_keys:
+                if self.local_cache.pop(full_key, None) is not None:
+                    deleted_count += 1
+
+            if strategy.level == CacheLevel.L2_REDIS and self.redis_client:
+                deleted_count = await self.redis_client.delete(*full_keys)
+
+            self.cache_stats["deletes"] += len(keys)
+            return deleted_count
+
+        except Exception as e:
+            logger.error(f"批量删除缓存失败: {e}")
+            self.cache_stats["errors"] += 1
+            return 0
+
     async def exists(self, key: str, cache_type: str = "default") -> bool:
         """
         检查缓存是否存在
@@ -292,26 +513,27 @@ class CacheService:
             search_pattern = f"{strategy.key_prefix}:{pattern}"
             deleted_count = 0
 
-            # 清除L1缓存
-            if strategy.level in [CacheLevel.L1, CacheLevel.HYBRID]:
-                keys_to_delete = [
-                    k
-                    for k in self.local_cache.keys()
-                    if k.startswith(search_pattern.replace("*", ""))
-                ]
-                for key in keys_to_delete:
-                    self.local_cache.pop(key, None)
-                    deleted_count += 1
+            # 清除L1缓存（L2命中时也会回填L1，因此不区分级别）
+            keys_to_delete = [
+                k for k in self.local_cache.keys() if fnmatch(k, search_pattern)
+            ]
+            for key in keys_to_delete:
+                self.local_cache.pop(key, None)
+                deleted_count += 1
 
-            # 清除L2缓存
-            if (
-                strategy.level in [CacheLevel.L2, CacheLevel.HYBRID]
-                and self.redis_client
-            ):
-                keys = await self.redis_client.keys(search_pattern)
-                if keys:
-                    deleted = await self.redis_client.delete(*keys)
-                    deleted_count += deleted
+            # 清除L2缓存：SCAN增量遍历代替阻塞的KEYS，分批流水线删除
+            if strategy.level == CacheLevel.L2_REDIS and self.redis_client:
+                batch_size = getattr(settings, "CACHE_TAG_BATCH_SIZE", 500)
+                batch = []
+                async for key in self.redis_client.scan_iter(
+                    match=search_pattern, count=batch_size
+                ):
+                    batch.append(key)
+                    if len(batch) >= batch_size:
+                        deleted_count += await self._delete_batch(batch)
+                        batch = []
+                if batch:
+                    deleted_count += await self._delete_batch(batch)
 
             logger.info(f"清除了 {deleted_count} 个匹配模式的键: {search_pattern}")
             return deleted_count
@@ -320,6 +542,21 @@ class CacheService:
             logger.error(f"按模式清除缓存失败 {pattern}: {e}")
             return 0
 
+    async def _delete_batch(self, keys: List[bytes]) -> int:
+        """
+        流水线批量删除键
+
+        Args:
+            keys: 键列表
+
+        Returns:
+            删除的键数量
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.delete(key)
+        return sum(await pipe.execute())
+
     async def get_stats(self) -> Dict[str, Any]:
         """
         获取缓存统计信息
@@ -381,13 +618,13 @@ class CacheService:
             序列化后的字节数据
         """
         try:
-            if strategy.compression:
-                # 使用pickle序列化后压缩
-                pickled_data = pickle.dumps(value)
-                return gzip.compress(pickled_data)
-            else:
-                # 直接pickle序列化
-                return pickle.dumps(value)
+            # 超过阈值才压缩，头字节记录编解码器
+            serialization = (
+                strategy.serialization
+                if strategy.serialization in self.fast_serializations
+                else "pickle"
+            )
+            return cache_codec.encode(value, serialization, strategy.compression)
         except Exception as e:
             logger.error(f"序列化失败: {e}")
             raise
@@ -404,13 +641,8 @@ class CacheService:
             反序列化后的值
         """
         try:
-            if strategy.compression:
-                # 解压缩后反序列化
-                decompressed_data = gzip.decompress(data)
-                return pickle.loads(decompressed_data)
-            else:
-                # 直接反序列化
-                return pickle.loads(data)
+            # 无头字节的旧数据按原格式（pickle，可选gzip）解码
+            return cache_codec.decode(data, "pickle", strategy.compression)
         except Exception as e:
             logger.error(f"反序列化失败: {e}")
             raise
@@ -460,6 +692,7 @@ class CacheService:
                 self.cache_stats = {
                     "hits": 0,
                     "misses": 0,
+                    "negative_hits": 0,
                     "sets": 0,
                     "deletes": 0,
                     "errors": 0,
@@ -520,12 +753,9 @@ class CacheService:
             是否预热成功
         """
         try:
-            success_count = 0
             total_count = len(data)
-
-            for key, value in data.items():
-                if await self.set(key, value, cache_type=cache_type):
-                    success_count += 1
+            results = await self.batch_set(data, cache_type=cache_type)
+            success_count = sum(results.values())
 
             logger.info(f"缓存预热完成: {success_count}/{total_count} 项成功")
             return success_count == total_count
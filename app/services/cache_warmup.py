@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 """
 缓存预热机制
-提供智能缓存预热功能，提升系统启动后的响应速度
+提供智能缓存预热功能，提升系统启动后的响应速度。
+预测性任务根据访问草图预取各缓存类型的热点键，整体受时间和内存预算约束
 """
 
 import asyncio
@@ -11,7 +12,7 @@ import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from app.config.cache_strategy import get_cache_strategy
 from app.core.config import settings
@@ -46,6 +47,8 @@ class WarmupTask:
     max_items: Optional[int] = None
     batch_size: int = 100
     delay_seconds: float = 0.1
+    predictive: bool = False  # 按访问草图预取热点键，max_items为Top-N
+    key_loader: Optional[Callable] = None  # 预测键在Redis中缺失时按键批量加载
 
 
 @dataclass
@@ -57,6 +60,22 @@ class WarmupResult:
     items_loaded: int
     duration_seconds: float
     error_message: Optional[str] = None
+    budget_exhausted: bool = False
+
+
+@dataclass
+class WarmupBudget:
+    """预热预算：截止时间和L1内存增长上限"""
+
+    deadline: float
+    memory_limit: int
+    memory_baseline: int
+
+    def exhausted(self, cache_service) -> bool:
+        if time.monotonic() >= self.deadline:
+            return True
+        memory_usage = cache_service.l1_cache.get_stats()["memory_usage_bytes"]
+        return memory_usage - self.memory_baseline >= self.memory_limit
 
 
 class CacheWarmupService:
@@ -88,7 +107,37 @@ class CacheWarmupService:
                 key_generator=lambda user: f"user:{user.id}",
                 max_items=100,
             ),
-            # 热门项目预热
+            # 按访问草图预测的热点数据
+            WarmupTask(
+                name="predicted_db_query",
+                priority=WarmupPriority.HIGH,
+                cache_type="db_query",
+                data_loader=None,
+                key_generator=None,
+                max_items=500,
+                predictive=True,
+                key_loader=self._load_entities_by_key,
+            ),
+            WarmupTask(
+                name="predicted_api_response",
+                priority=WarmupPriority.MEDIUM,
+                cache_type="api_response",
+                data_loader=None,
+                key_generator=None,
+                max_items=500,
+                predictive=True,
+            ),
+            # 常用搜索结果预热（搜索结果无法按键重算，只从Redis预取到本地缓存）
+            WarmupTask(
+                name="common_searches",
+                priority=WarmupPriority.MEDIUM,
+                cache_type="search_result",
+                data_loader=None,
+                key_generator=None,
+                max_items=200,
+                predictive=True,
+            ),
+            # 热门项目预热（无访问记录时的兜底）
             WarmupTask(
                 name="popular_projects",
                 priority=WarmupPriority.HIGH,
@@ -106,15 +155,6 @@ class CacheWarmupService:
                 key_generator=lambda doc: f"document:{doc.id}",
                 max_items=200,
             ),
-            # 常用搜索结果预热
-            WarmupTask(
-                name="common_searches",
-                priority=WarmupPriority.MEDIUM,
-                cache_type="search_result",
-                data_loader=self._load_common_searches,
-                key_generator=lambda search: f"search:{search['query_hash']}",
-                max_items=100,
-            ),
             # 统计数据预热
             WarmupTask(
                 name="statistics",
@@ -127,9 +167,20 @@ class CacheWarmupService:
         ]
 
     async def warmup_all(
-        self, priority_filter: Optional[WarmupPriority] = None
+        self,
+        priority_filter: Optional[WarmupPriority] = None,
+        time_budget: Optional[float] = None,
+        memory_budget: Optional[int] = None,
+        predictive_only: bool = False,
     ) -> List[WarmupResult]:
-        """执行所有预热任务"""
+        """执行所有预热任务
+
+        Args:
+            priority_filter: 只执行指定优先级的任务
+            time_budget: 时间预算（秒），耗尽后跳过剩余任务
+            memory_budget: L1内存增长预算（字节）
+            predictive_only: 只执行预测性任务（定时刷新使用）
+        """
         logger.info("Starting cache warmup process")
         start_time = time.time()
 
@@ -139,6 +190,8 @@ class CacheWarmupService:
             tasks_to_run = [
                 task for task in tasks_to_run if task.priority == priority_filter
             ]
+        if predictive_only:
+            tasks_to_run = [task for task in tasks_to_run if task.predictive]
 
         # 按优先级排序
         priority_order = {
@@ -149,11 +202,26 @@ class CacheWarmupService:
         }
         tasks_to_run.sort(key=lambda t: priority_order[t.priority])
 
+        cache_service = await get_multi_cache_service()
+        budget = WarmupBudget(
+            deadline=time.monotonic()
+            + (time_budget or getattr(settings, "CACHE_WARMUP_TIME_BUDGET", 30.0)),
+            memory_limit=memory_budget
+            or getattr(settings, "CACHE_WARMUP_MEMORY_BUDGET", 32 * 1024 * 1024),
+            memory_baseline=cache_service.l1_cache.get_stats()["memory_usage_bytes"],
+        )
+
         # 执行任务
         results = []
         for task in tasks_to_run:
             if task.enabled:
-                result = await self._execute_warmup_task(task)
+                if budget.exhausted(cache_service):
+                    logger.warning(
+                        f"Warmup budget exhausted, skipping task: {task.name}"
+                    )
+                    continue
+
+                result = await self._execute_warmup_task(task, budget)
                 results.append(result)
 
                 # 任务间延迟
@@ -176,6 +244,10 @@ class CacheWarmupService:
         """仅预热关键数据"""
         return await self.warmup_all(WarmupPriority.CRITICAL)
 
+    async def warmup_predictive(self) -> List[WarmupResult]:
+        """按最新访问草图刷新热点数据"""
+        return await self.warmup_all(predictive_only=True)
+
     async def warmup_by_task_name(self, task_name: str) -> Optional[WarmupResult]:
         """按任务名称预热"""
         task = next((t for t in self.warmup_tasks if t.name == task_name), None)
@@ -185,7 +257,9 @@ class CacheWarmupService:
 
         return await self._execute_warmup_task(task)
 
-    async def _execute_warmup_task(self, task: WarmupTask) -> WarmupResult:
+    async def _execute_warmup_task(
+        self, task: WarmupTask, budget: Optional[WarmupBudget] = None
+    ) -> WarmupResult:
         """执行单个预热任务"""
         logger.info(f"Starting warmup task: {task.name}")
         start_time = time.time()
@@ -195,6 +269,23 @@ class CacheWarmupService:
             cache_service = await get_multi_cache_service()
             strategy = get_cache_strategy(task.cache_type)
 
+            if task.predictive:
+                items_loaded, budget_exhausted = await self._execute_predictive_task(
+                    task, cache_service, strategy, budget
+                )
+                duration = time.time() - start_time
+                logger.info(
+                    f"Warmup task '{task.name}' completed: {items_loaded} predicted "
+                    f"items in {duration:.2f}s"
+                )
+                return WarmupResult(
+                    task_name=task.name,
+                    success=True,
+                    items_loaded=items_loaded,
+                    duration_seconds=duration,
+                    budget_exhausted=budget_exhausted,
+                )
+
             # 加载数据
             data_items = await task.data_loader()
 
@@ -202,22 +293,22 @@ class CacheWarmupService:
             if task.max_items and len(data_items) > task.max_items:
                 data_items = data_items[: task.max_items]
 
-            # 批量预热
+            # 批量预热：每批一次流水线写入
             items_loaded = 0
+            budget_exhausted = False
             for i in range(0, len(data_items), task.batch_size):
-                batch = data_items[i : i + task.batch_size]
-
-                for item in batch:
+                if budget and budget.exhausted(cache_service):
+                    budget_exhausted = True
+                    break
+                batch = {}
+                for item in data_items[i : i + task.batch_size]:
                     try:
-                        cache_key = task.key_generator(item)
-                        await cache_service.set(cache_key, item, strategy)
-                        items_loaded += 1
+                        batch[task.key_generator(item)] = item
                     except Exception as e:
                         logger.warning(f"Failed to cache item in task {task.name}: {e}")
 
-                # 批次间短暂延迟
-                if i + task.batch_size < len(data_items):
-                    await asyncio.sleep(0.01)
+                if batch and await cache_service.batch_set(batch, strategy):
+                    items_loaded += len(batch)
 
             duration = time.time() - start_time
             logger.info(
@@ -229,6 +320,7 @@ class CacheWarmupService:
                 success=True,
                 items_loaded=items_loaded,
                 duration_seconds=duration,
+                budget_exhausted=budget_exhausted,
             )
 
         except Exception as e:
@@ -244,19 +336,81 @@ class CacheWarmupService:
                 error_message=error_msg,
             )
 
+    async def _execute_predictive_task(
+        self,
+        task: WarmupTask,
+        cache_service,
+        strategy,
+        budget: Optional[WarmupBudget],
+    ) -> Tuple[int, bool]:
+        """
+        预取访问草图预测的Top-N热点键
+
+        Redis中仍有的值直接回填L1；已过期的键交给key_loader按键重新加载
+        """
+        keys = await cache_service.access_log.top_keys(
+            cache_service.redis_client, strategy.key_prefix, task.max_items or 100
+        )
+
+        items_loaded = 0
+        for i in range(0, len(keys), task.batch_size):
+            if budget and budget.exhausted(cache_service):
+                return items_loaded, True
+
+            batch_keys = keys[i : i + task.batch_size]
+            values = await cache_service.batch_get(
+                batch_keys, strategy, record_access=False
+            )
+            missing = [key for key, value in values.items() if value is None]
+            items_loaded += len(batch_keys) - len(missing)
+
+            if missing and task.key_loader:
+                loaded = await task.key_loader(missing)
+                if loaded and await cache_service.batch_set(loaded, strategy):
+                    items_loaded += len(loaded)
+
+        return items_loaded, False
+
+    async def _load_entities_by_key(self, keys: List[str]) -> Dict[str, Any]:
+        """按缓存键批量加载实体，支持 project:{id} 和 document:{id}"""
+        models = {"project": Project, "document": Document}
+        ids_by_type: Dict[str, List[int]] = {}
+        for key in keys:
+            entity_type, _, entity_id = key.partition(":")
+            if entity_type in models and entity_id.isdigit():
+                ids_by_type.setdefault(entity_type, []).append(int(entity_id))
+
+        if not ids_by_type:
+            return {}
+
+        loaded = {}
+        db = SessionLocal()
+        try:
+            for entity_type, ids in ids_by_type.items():
+                model = models[entity_type]
+                for obj in db.query(model).filter(model.id.in_(ids)).all():
+                    loaded[f"{entity_type}:{obj.id}"] = obj
+        except Exception as e:
+            logger.error(f"Failed to load predicted entities: {e}")
+        finally:
+            db.close()
+        return loaded
+
     async def _load_system_config(self) -> List[Dict[str, Any]]:
         """加载系统配置"""
-        # 模拟系统配置数据
         configs = [
             {
                 "key": "app_name",
                 "value": getattr(settings, "PROJECT_NAME", "System Review"),
             },
-            {"key": "version", "value": "1.0.0"},
+            {"key": "version", "value": getattr(settings, "VERSION", "1.0.0")},
             {"key": "debug_mode", "value": getattr(settings, "DEBUG", False)},
-            {"key": "max_upload_size", "value": "10MB"},
-            {"key": "supported_formats", "value": ["pdf", "docx", "txt", "md"]},
-            {"key": "cache_enabled", "value": True},
+            {
+                "key": "max_upload_size",
+                "value": f"{getattr(settings, 'MAX_FILE_SIZE', 10)}MB",
+            },
+            {"key": "supported_formats", "value": settings.allowed_file_types_list},
+            {"key": "cache_enabled", "value": settings.CACHE_ENABLED},
             {
                 "key": "ai_service_url",
                 "value": getattr(settings, "AI_SERVICE_URL", "http://localhost:8001"),
@@ -323,18 +477,6 @@ class CacheWarmupService:
             logger.error(f"Failed to load recent documents: {e}")
             return []
 
-    async def _load_common_searches(self) -> List[Dict[str, Any]]:
-        """加载常用搜索"""
-        # 模拟常用搜索查询
-        common_searches = [
-            {"query_hash": "project_status", "query": "项目状态", "results": []},
-            {"query_hash": "document_review", "query": "文档审查", "results": []},
-            {"query_hash": "compliance_check", "query": "合规检查", "results": []},
-            {"query_hash": "risk_assessment", "query": "风险评估", "results": []},
-            {"query_hash": "audit_report", "query": "审计报告", "results": []},
-        ]
-        return common_searches
-
     async def _load_statistics(self) -> List[Dict[str, Any]]:
         """加载统计数据"""
         try:
@@ -390,6 +532,7 @@ class CacheWarmupService:
                     "items_loaded": r.items_loaded,
                     "duration_seconds": r.duration_seconds,
                     "error_message": r.error_message,
+                    "budget_exhausted": r.budget_exhausted,
                 }
                 for r in self.results
             ],
@@ -5,22 +5,41 @@
 提供L1内存缓存 + L2 Redis缓存的多级缓存策略
 """
 
-import gzip
+import asyncio
+import inspect
 import json
 import logging
+import math
 import pickle
+import random
+import sys
 import threading
 import time
-from collections import OrderedDict
+import uuid
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import islice
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import redis.asyncio as redis
 from redis.asyncio import Redis
 
-from app.config.cache_strategy import CacheLevel, CacheStrategy
+from app.config.cache_strategy import CacheLevel, CacheStrategy, EvictionPolicy
 from app.core.config import settings
+from app.services.cache_access_log import CacheAccessLog
+from app.services.cache_codec import MISSING, cache_codec
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +50,7 @@ class CacheHitType(Enum):
     L1_HIT = "l1_hit"  # L1缓存命中
     L2_HIT = "l2_hit"  # L2缓存命中
     MISS = "miss"  # 缓存未命中
+    NEGATIVE_HIT = "negative_hit"  # 命中负缓存（已确认不存在）
 
 
 @dataclass
@@ -43,6 +63,17 @@ class CacheItem:
     access_count: int = 0
     ttl: Optional[int] = None
     compressed: bool = False
+    compute_time: float = 0.0  # 生成该值的耗时（秒），用于提前刷新
+    tags: Tuple[str, ...] = ()  # 缓存标签
+    size: int = 0  # 写入时记录的字节数
+    eviction_policy: EvictionPolicy = EvictionPolicy.LRU
+    in_window: bool = True  # 是否仍在W-TinyLFU准入窗口中
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        if self.ttl is None:
+            return None
+        return self.created_at + self.ttl
 
     def is_expired(self) -> bool:
         """检查是否过期"""
@@ -62,21 +93,27 @@ class CacheStats:
 
     l1_hits: int = 0
     l2_hits: int = 0
+    negative_hits: int = 0
     misses: int = 0
     l1_size: int = 0
     l2_size: int = 0
     l1_memory_usage: int = 0
     evictions: int = 0
+    admission_rejections: int = 0  # 未通过TinyLFU准入而被丢弃的条目数
+    loads: int = 0  # loader实际执行次数
+    coalesced: int = 0  # 合并到进行中计算的请求数
+    early_refreshes: int = 0  # 概率提前刷新次数
+    lock_waits: int = 0  # 等待其他worker计算的次数
 
     @property
     def total_requests(self) -> int:
-        return self.l1_hits + self.l2_hits + self.misses
+        return self.l1_hits + self.l2_hits + self.negative_hits + self.misses
 
     @property
     def hit_rate(self) -> float:
         if self.total_requests == 0:
             return 0.0
-        return (self.l1_hits + self.l2_hits) / self.total_requests
+        return (self.l1_hits + self.l2_hits + self.negative_hits) / self.total_requests
 
     @property
     def l1_hit_rate(self) -> float:
@@ -85,46 +122,152 @@ class CacheStats:
         return self.l1_hits / self.total_requests
 
 
-class L1MemoryCache:
-    """L1内存缓存实现"""
+class CountMinSketch:
+    """
+    Count-Min Sketch访问频率估计（TinyLFU）
+
+    计数器上限为15，累计增量达到采样窗口后全部减半，使历史热度随时间衰减
+    """
+
+    _SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+    _MAX_COUNT = 15
+    _HALVE = bytes(i >> 1 for i in range(256))
+
+    def __init__(self, capacity: int):
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in self._SEEDS]
+        self._sample_size = 10 * width
+        self._additions = 0
+
+    def _indexes(self, key: str) -> List[int]:
+        h = hash(key)
+        return [((h ^ seed) * 0x01000193 >> 8) & self._mask for seed in self._SEEDS]
+
+    def increment(self, key: str):
+        """记录一次访问"""
+        added = False
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self._MAX_COUNT:
+                row[index] += 1
+                added = True
+
+        if added:
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._age()
+
+    def frequency(self, key: str) -> int:
+        """估计访问频率"""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _age(self):
+        """所有计数减半"""
+        for row in self._rows:
+            row[:] = row.translate(self._HALVE)
+        self._additions //= 2
 
-    def __init__(self, max_size: int = 1000, default_ttl: int = 300):
+
+class L1MemoryCache:
+    """
+    L1内存缓存实现
+
+    同时按条目数和字节数限额，条目大小在写入时记录一次。
+    采用W-TinyLFU：新条目先进入小的LRU窗口，被挤出窗口时与主区的淘汰候选
+    比较访问频率，频率更高才能进入主区，一次性扫描不会冲掉热点数据。
+    主区按条目所属策略的淘汰方式（LRU/LFU/FIFO/TTL/RANDOM）分段维护，
+    各分段给出候选后淘汰其中频率最低者。
+    """
+
+    _EVICTION_SAMPLE = 5  # LFU/TTL/RANDOM分段每次采样的候选数
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl: int = 300,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        window_ratio: float = 0.01,
+    ):
         self.max_size = max_size
+        self.max_memory_bytes = max_memory_bytes
         self.default_ttl = default_ttl
-        self._cache: OrderedDict[str, CacheItem] = OrderedDict()
+        self._cache: Dict[str, CacheItem] = {}
+        self._window: OrderedDict[str, None] = OrderedDict()
+        self._segments: Dict[EvictionPolicy, OrderedDict[str, None]] = {
+            policy: OrderedDict() for policy in EvictionPolicy
+        }
+        self._window_max_size = max(1, int(max_size * window_ratio))
+        self._window_max_bytes = max(1, int(max_memory_bytes * window_ratio))
+        self._window_bytes = 0
+        self._memory_usage = 0
+        self._sketch = CountMinSketch(max_size)
+        self._tag_index: Dict[str, Set[str]] = defaultdict(set)  # 标签 -> 键
         self._lock = threading.RLock()
         self._stats = CacheStats()
 
     def get(self, key: str) -> Tuple[Any, CacheHitType]:
         """获取缓存值"""
+        item = self.get_item(key)
+        if item is None:
+            return None, CacheHitType.MISS
+        return item.value, CacheHitType.L1_HIT
+
+    def get_item(self, key: str) -> Optional[CacheItem]:
+        """获取缓存项（含过期时间等元数据）"""
         with self._lock:
-            if key not in self._cache:
-                self._stats.misses += 1
-                return None, CacheHitType.MISS
+            # 命中与否都计入频率，反复未命中的键更容易被准入
+            self._sketch.increment(key)
 
-            item = self._cache[key]
+            item = self._cache.get(key)
+            if item is None:
+                self._stats.misses += 1
+                return None
 
             # 检查是否过期
             if item.is_expired():
-                del self._cache[key]
+                self._remove(key)
                 self._stats.misses += 1
-                return None, CacheHitType.MISS
+                return None
 
             # 更新访问信息
             item.touch()
-            # 移到末尾（LRU策略）
-            self._cache.move_to_end(key)
+            if item.in_window:
+                self._window.move_to_end(key)
+            elif item.eviction_policy != EvictionPolicy.FIFO:
+                self._segments[item.eviction_policy].move_to_end(key)
 
             self._stats.l1_hits += 1
-            return item.value, CacheHitType.L1_HIT
-
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """设置缓存值"""
+            return item
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        compute_time: float = 0.0,
+        tags: Iterable[str] = (),
+        size: Optional[int] = None,
+        eviction_policy: EvictionPolicy = EvictionPolicy.LRU,
+    ) -> bool:
+        """
+        设置缓存值
+
+        Args:
+            size: 条目字节数，已序列化的调用方可直接传入，否则写入时估算一次
+
+        Returns:
+            条目是否留在缓存中（超出容量或未通过准入时为False）
+        """
         with self._lock:
             try:
-                # 检查是否需要淘汰
-                if len(self._cache) >= self.max_size and key not in self._cache:
-                    self._evict_one()
+                self._remove(key)
+
+                if size is None:
+                    size = self._estimate_size(key, value)
+                if size > self.max_memory_bytes:
+                    return False
 
                 # 创建缓存项
                 item = CacheItem(
@@ -132,54 +275,220 @@ class L1MemoryCache:
                     created_at=time.time(),
                     last_accessed=time.time(),
                     ttl=ttl or self.default_ttl,
+                    compute_time=compute_time,
+                    tags=tuple(tags),
+                    size=size,
+                    eviction_policy=eviction_policy,
                 )
 
                 self._cache[key] = item
-                self._cache.move_to_end(key)
-
-                return True
+                self._window[key] = None
+                self._window_bytes += size
+                self._memory_usage += size
+                for tag in item.tags:
+                    self._tag_index[tag].add(key)
+
+                self._drain_window()
+                return key in self._cache
             except Exception as e:
                 logger.error(f"L1 cache set error: {e}")
                 return False
 
+    def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        sizes: Optional[Dict[str, int]] = None,
+        eviction_policy: EvictionPolicy = EvictionPolicy.LRU,
+    ):
+        """批量设置缓存值（一次加锁）"""
+        sizes = sizes or {}
+        with self._lock:
+            for key, value in items.items():
+                self.set(
+                    key,
+                    value,
+                    ttl,
+                    size=sizes.get(key),
+                    eviction_policy=eviction_policy,
+                )
+
     def delete(self, key: str) -> bool:
         """删除缓存项"""
         with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+            return self._remove(key)
+
+    def delete_by_tags(self, tags: Iterable[str]) -> int:
+        """删除带有任一标签的缓存项"""
+        with self._lock:
+            deleted = 0
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    deleted += self._remove(key)
+            return deleted
 
     def clear(self):
         """清空缓存"""
         with self._lock:
             self._cache.clear()
+            self._window.clear()
+            for segment in self._segments.values():
+                segment.clear()
+            self._tag_index.clear()
+            self._window_bytes = 0
+            self._memory_usage = 0
+
+    @staticmethod
+    def _estimate_size(key: str, value: Any) -> int:
+        """估算条目占用字节数（以序列化长度近似）"""
+        if isinstance(value, (bytes, bytearray, str)):
+            return len(key) + len(value)
+        try:
+            return len(key) + len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return len(key) + sys.getsizeof(value)
+
+    def _remove(self, key: str) -> bool:
+        """移除缓存项并同步窗口/分段、字节数和标签索引"""
+        item = self._cache.pop(key, None)
+        if item is None:
+            return False
+
+        if item.in_window:
+            del self._window[key]
+            self._window_bytes -= item.size
+        else:
+            del self._segments[item.eviction_policy][key]
+        self._memory_usage -= item.size
+
+        for tag in item.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+        return True
+
+    def _over_budget(self) -> bool:
+        return (
+            len(self._cache) > self.max_size
+            or self._memory_usage > self.max_memory_bytes
+        )
+
+    def _drain_window(self):
+        """窗口超限时将最旧条目移入主区，并进行准入判断"""
+        while self._window and (
+            len(self._window) > self._window_max_size
+            or self._window_bytes > self._window_max_bytes
+        ):
+            key, _ = self._window.popitem(last=False)
+            item = self._cache[key]
+            self._window_bytes -= item.size
+            item.in_window = False
+            self._segments[item.eviction_policy][key] = None
 
-    def _evict_one(self):
-        """淘汰一个缓存项（LRU策略）"""
-        if self._cache:
-            # 移除最旧的项
-            self._cache.popitem(last=False)
+            if not self._admit(key):
+                self._remove(key)
+                self._stats.admission_rejections += 1
+
+        # 窗口本身仍超出总限额时（主区已空），按LRU淘汰窗口
+        while self._window and self._over_budget():
+            self._remove(next(iter(self._window)))
             self._stats.evictions += 1
 
+    def _admit(self, candidate: str) -> bool:
+        """为候选条目腾出主区空间，候选频率不高于淘汰对象时拒绝准入"""
+        if not self._over_budget():
+            return True
+
+        victim = self._select_victim(candidate)
+        if victim is None:
+            return False
+        if not self._cache[victim].is_expired() and (
+            self._sketch.frequency(victim) >= self._sketch.frequency(candidate)
+        ):
+            return False
+
+        while victim is not None and self._over_budget():
+            self._remove(victim)
+            self._stats.evictions += 1
+            victim = self._select_victim(candidate)
+        return not self._over_budget()
+
+    def _select_victim(self, exclude: str) -> Optional[str]:
+        """各分段按自身策略给出候选，淘汰其中已过期或频率最低者"""
+        candidates = []
+        for policy, segment in self._segments.items():
+            victim = self._segment_victim(policy, segment, exclude)
+            if victim is not None:
+                candidates.append(victim)
+        if not candidates:
+            return None
+
+        return min(
+            candidates,
+            key=lambda k: (
+                not self._cache[k].is_expired(),
+                self._sketch.frequency(k),
+                -self._cache[k].size,
+            ),
+        )
+
+    def _segment_victim(
+        self, policy: EvictionPolicy, segment: OrderedDict, exclude: str
+    ) -> Optional[str]:
+        sample = [
+            key for key in islice(segment, self._EVICTION_SAMPLE + 1) if key != exclude
+        ][: self._EVICTION_SAMPLE]
+        if not sample:
+            return None
+
+        if policy == EvictionPolicy.LFU:
+            return min(sample, key=self._sketch.frequency)
+        if policy == EvictionPolicy.TTL:
+            return min(sample, key=lambda k: self._cache[k].expires_at or float("inf"))
+        if policy == EvictionPolicy.RANDOM:
+            return random.choice(sample)
+        # LRU按访问顺序、FIFO按写入顺序，队首即候选
+        return sample[0]
+
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
         with self._lock:
             self._stats.l1_size = len(self._cache)
-            # 估算内存使用量
-            self._stats.l1_memory_usage = sum(
-                len(str(k)) + len(str(v.value)) for k, v in self._cache.items()
-            )
+            self._stats.l1_memory_usage = self._memory_usage
 
             return {
                 "size": self._stats.l1_size,
                 "max_size": self.max_size,
                 "hits": self._stats.l1_hits,
                 "memory_usage_bytes": self._stats.l1_memory_usage,
+                "max_memory_bytes": self.max_memory_bytes,
+                "window_size": len(self._window),
                 "evictions": self._stats.evictions,
+                "admission_rejections": self._stats.admission_rejections,
+                "tags": len(self._tag_index),
             }
 
 
+# 仅当锁仍由自己持有时才释放（避免误删其他worker续租后的锁）
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# 递增全局失效版本并广播，消息格式为 "版本|JSON"
+_PUBLISH_INVALIDATION_SCRIPT = """
+local version = redis.call("incr", KEYS[1])
+redis.call("publish", ARGV[1], version .. "|" .. ARGV[2])
+return version
+"""
+
+Loader = Callable[[], Union[Any, Awaitable[Any]]]
+
+
 class MultiLevelCacheService:
     """多级缓存服务"""
 
@@ -187,11 +496,42 @@ class MultiLevelCacheService:
         self.l1_cache = L1MemoryCache(
             max_size=getattr(settings, "L1_CACHE_SIZE", 1000),
             default_ttl=getattr(settings, "L1_CACHE_TTL", 300),
+            max_memory_bytes=getattr(settings, "L1_CACHE_MAX_BYTES", 64 * 1024 * 1024),
         )
         self.redis_client: Optional[Redis] = None
         self._stats = CacheStats()
         self._initialized = False
 
+        # 防缓存击穿
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._compute_times: Dict[str, float] = {}  # 策略名 -> 计算耗时EWMA
+        self.lock_timeout = getattr(settings, "CACHE_LOCK_TIMEOUT", 10.0)
+        self.early_refresh_beta = getattr(settings, "CACHE_EARLY_REFRESH_BETA", 1.0)
+
+        # 访问草图，供预测性预热使用
+        self.access_log = CacheAccessLog()
+
+        # 标签失效
+        self.tag_batch_size = getattr(settings, "CACHE_TAG_BATCH_SIZE", 500)
+        self.tag_set_ttl = getattr(settings, "CACHE_TAG_SET_TTL", 86400)
+        self._generations: Dict[str, int] = {}  # 无Redis时的本地标签代数
+
+        # 跨worker L1失效广播
+        self.instance_id = uuid.uuid4().hex
+        self.invalidation_enabled = getattr(
+            settings, "CACHE_INVALIDATION_BUS_ENABLED", True
+        )
+        self.invalidation_channel = getattr(
+            settings, "CACHE_INVALIDATION_CHANNEL", "cache:invalidation"
+        )
+        self._invalidation_version = 0  # 已观察到的最大失效版本
+        # 最近失效的键/标签 -> 失效版本，用于丢弃失效前读取的计算结果
+        self._invalidated_at: OrderedDict[str, int] = OrderedDict()
+        self._invalidation_history_size = getattr(
+            settings, "CACHE_INVALIDATION_HISTORY_SIZE", 10000
+        )
+        self._listener_task: Optional[asyncio.Task] = None
+
     async def initialize(self):
         """初始化缓存服务"""
         if self._initialized:
@@ -200,8 +540,9 @@ class MultiLevelCacheService:
         try:
             # 优先使用REDIS_URL环境变量
             import os
-            redis_url = os.getenv('REDIS_URL')
-            
+
+            redis_url = os.getenv("REDIS_URL")
+
             if redis_url:
                 # 使用REDIS_URL创建连接
                 self.redis_client = redis.Redis.from_url(
@@ -226,7 +567,9 @@ class MultiLevelCacheService:
                     retry_on_timeout=True,
                     health_check_interval=30,
                 )
-                logger.info(f"Multi-level cache using individual params: {getattr(settings, 'REDIS_HOST', 'redis')}:{getattr(settings, 'REDIS_PORT', 6379)}")
+                logger.info(
+                    f"Multi-level cache using individual params: {getattr(settings, 'REDIS_HOST', 'redis')}:{getattr(settings, 'REDIS_PORT', 6379)}"
+                )
 
             # 测试连接
             await self.redis_client.ping()
@@ -238,30 +581,43 @@ class MultiLevelCacheService:
 
         self._initialized = True
 
+        if self.redis_client and self.invalidation_enabled:
+            self._listener_task = asyncio.create_task(self._listen_invalidations())
+
     async def get(self, key: str, strategy: CacheStrategy) -> Tuple[Any, CacheHitType]:
         """获取缓存值（多级查找）"""
         if not self._initialized:
             await self.initialize()
 
         # 构建完整键名
-        full_key = f"{strategy.key_prefix}:{key}" if strategy.key_prefix else key
+        full_key = self._build_key(key, strategy)
+        self.access_log.record(strategy.key_prefix, key, self.redis_client)
 
         # L1缓存查找（所有级别都先查L1）
         value, hit_type = self.l1_cache.get(full_key)
         if hit_type == CacheHitType.L1_HIT:
+            if value is MISSING:
+                self._stats.negative_hits += 1
+                return None, CacheHitType.NEGATIVE_HIT
             return value, hit_type
 
         # L2 Redis缓存查找（仅当策略级别为L2_REDIS时）
         if strategy.level == CacheLevel.L2_REDIS and self.redis_client:
             try:
+                read_version = self._invalidation_version
                 cached_data = await self.redis_client.get(full_key)
                 if cached_data:
                     # 反序列化
                     value = self._deserialize(cached_data, strategy)
 
-                    # 回填到L1缓存
-                    self.l1_cache.set(full_key, value, strategy.ttl)
+                    # 回填到L1缓存（负缓存沿用负缓存TTL）
+                    self._backfill_l1(
+                        full_key, value, strategy, len(cached_data), read_version
+                    )
 
+                    if value is MISSING:
+                        self._stats.negative_hits += 1
+                        return None, CacheHitType.NEGATIVE_HIT
                     self._stats.l2_hits += 1
                     return value, CacheHitType.L2_HIT
             except Exception as e:
@@ -270,40 +626,551 @@ class MultiLevelCacheService:
         self._stats.misses += 1
         return None, CacheHitType.MISS
 
-    async def set(self, key: str, value: Any, strategy: CacheStrategy) -> bool:
-        """设置缓存值（多级存储）"""
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        strategy: CacheStrategy,
+        tags: Optional[List[str]] = None,
+    ) -> bool:
+        """设置缓存值（多级存储）
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            strategy: 缓存策略
+            tags: 额外标签（与策略标签合并），用于clear_by_tags精确失效
+        """
         if not self._initialized:
             await self.initialize()
 
         # 构建完整键名
-        full_key = f"{strategy.key_prefix}:{key}" if strategy.key_prefix else key
+        full_key = self._build_key(key, strategy)
+
+        return await self._set_full_key(full_key, value, strategy, tags=tags)
+
+    async def set_negative(
+        self,
+        key: str,
+        strategy: CacheStrategy,
+        tags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        写入负缓存，记录该键对应的数据不存在
+
+        使用较短的负缓存TTL；get返回(None, NEGATIVE_HIT)。数据创建后应通过
+        delete或clear_by_tags清除对应条目
+        """
+        if not self._initialized:
+            await self.initialize()
 
+        full_key = self._build_key(key, strategy)
+        return await self._set_full_key(full_key, MISSING, strategy, tags=tags)
+
+    def _negative_ttl(self, strategy: CacheStrategy) -> int:
+        """负缓存TTL，不超过策略本身的TTL"""
+        ttl = strategy.negative_ttl or getattr(settings, "CACHE_NEGATIVE_TTL", 60)
+        return min(ttl, strategy.ttl)
+
+    def _entry_ttl(self, value: Any, strategy: CacheStrategy) -> int:
+        """条目TTL：负缓存使用负缓存TTL，其余使用策略TTL"""
+        return self._negative_ttl(strategy) if value is MISSING else strategy.ttl
+
+    def _backfill_l1(
+        self,
+        full_key: str,
+        value: Any,
+        strategy: CacheStrategy,
+        size: int,
+        read_version: int,
+        ttl: Optional[int] = None,
+        compute_time: float = 0.0,
+    ) -> bool:
+        """
+        将从Redis读到的值回填L1
+
+        读取期间该键或策略标签被失效时，读到的可能是失效前的旧值，不回填；
+        ttl为空时按条目类型取策略TTL或负缓存TTL
+        """
+        if self._invalidated_since(
+            read_version, self._invalidation_names(full_key, strategy)
+        ):
+            logger.debug(f"Skip stale L1 backfill for {full_key}")
+            return False
+        self.l1_cache.set(
+            full_key,
+            value,
+            ttl if ttl is not None else self._entry_ttl(value, strategy),
+            compute_time,
+            size=size,
+            eviction_policy=strategy.eviction_policy,
+        )
+        return True
+
+    def _invalidation_names(self, full_key: str, strategy: CacheStrategy) -> List[str]:
+        """键及策略标签在失效记录中的名称"""
+        return [full_key, *(self._tag_key(tag) for tag in strategy.tags)]
+
+    async def _set_full_key(
+        self,
+        full_key: str,
+        value: Any,
+        strategy: CacheStrategy,
+        compute_time: float = 0.0,
+        tags: Optional[List[str]] = None,
+        read_version: Optional[int] = None,
+    ) -> bool:
+        """按完整键名写入各级缓存，并登记到标签集合
+
+        read_version为计算开始时的失效版本；若期间该键或其标签已被失效，
+        结果可能基于旧数据，直接丢弃
+        """
         success = True
+        all_tags = list(dict.fromkeys([*strategy.tags, *(tags or [])]))
+        ttl = self._entry_ttl(value, strategy)
 
-        # L1缓存存储（所有级别都存储到L1）
-        self.l1_cache.set(full_key, value, strategy.ttl)
+        if read_version is not None and self._invalidated_since(
+            read_version, [full_key, *(self._tag_key(tag) for tag in all_tags)]
+        ):
+            logger.debug(f"Discard stale result for {full_key}")
+            return False
 
-        # L2 Redis缓存存储（仅当策略级别为L2_REDIS时）
+        # L2需要序列化时顺带得到条目大小，L1无需再估算
+        serialized_data = None
         if strategy.level == CacheLevel.L2_REDIS and self.redis_client:
             try:
-                # 序列化
                 serialized_data = self._serialize(value, strategy)
+            except Exception as e:
+                logger.warning(f"Cache set failed for {full_key}: {e}")
+                return False
 
-                # 存储到Redis
-                await self.redis_client.setex(full_key, strategy.ttl, serialized_data)
+        # L1缓存存储（所有级别都存储到L1）
+        self.l1_cache.set(
+            full_key,
+            value,
+            ttl,
+            compute_time,
+            all_tags,
+            size=len(serialized_data) if serialized_data is not None else None,
+            eviction_policy=strategy.eviction_policy,
+        )
+
+        # L2 Redis缓存存储（仅当策略级别为L2_REDIS时）
+        if serialized_data is not None:
+            try:
+                # 值与标签集合在同一次往返中写入
+                pipe = self.redis_client.pipeline(transaction=False)
+                self._queue_l2_write(pipe, full_key, serialized_data, ttl, all_tags)
+                await pipe.execute()
             except Exception as e:
                 logger.error(f"Redis set error: {e}")
                 success = False
 
         return success
 
+    def _queue_l2_write(
+        self,
+        pipe,
+        full_key: str,
+        data: bytes,
+        ttl: int,
+        tags: List[str],
+    ):
+        """将值写入和标签登记加入流水线"""
+        pipe.setex(full_key, ttl, data)
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.sadd(tag_key, full_key)
+            pipe.expire(tag_key, max(ttl, self.tag_set_ttl))
+
+    async def batch_get(
+        self, keys: List[str], strategy: CacheStrategy, record_access: bool = True
+    ) -> Dict[str, Any]:
+        """
+        批量获取缓存值
+
+        先查L1，未命中的键通过一次MGET从Redis获取，并批量回填L1。
+        预热读取应传入record_access=False，避免污染访问草图
+
+        Returns:
+            键到缓存值的字典，未命中为None
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        results: Dict[str, Any] = {key: None for key in keys}
+        misses: List[Tuple[str, str]] = []
+
+        for key in keys:
+            full_key = self._build_key(key, strategy)
+            if record_access:
+                self.access_log.record(strategy.key_prefix, key, self.redis_client)
+            value, hit_type = self.l1_cache.get(full_key)
+            if hit_type != CacheHitType.L1_HIT:
+                misses.append((key, full_key))
+            elif value is MISSING:
+                self._stats.negative_hits += 1
+            else:
+                results[key] = value
+                self._stats.l1_hits += 1
+
+        if misses and strategy.level == CacheLevel.L2_REDIS and self.redis_client:
+            try:
+                read_version = self._invalidation_version
+                values = await self.redis_client.mget(
+                    [full_key for _, full_key in misses]
+                )
+                backfill = {}
+                negative_backfill = {}
+                sizes = {}
+                remaining = []
+                for (key, full_key), cached_data in zip(misses, values):
+                    if not cached_data:
+                        remaining.append((key, full_key))
+                        continue
+                    value = self._deserialize(cached_data, strategy)
+                    if value is MISSING:
+                        self._stats.negative_hits += 1
+                    else:
+                        self._stats.l2_hits += 1
+                        results[key] = value
+                    # 读取期间被失效的键不回填L1
+                    if self._invalidated_since(
+                        read_version, self._invalidation_names(full_key, strategy)
+                    ):
+                        continue
+                    sizes[full_key] = len(cached_data)
+                    if value is MISSING:
+                        negative_backfill[full_key] = value
+                    else:
+                        backfill[full_key] = value
+
+                self.l1_cache.set_many(
+                    backfill, strategy.ttl, sizes, strategy.eviction_policy
+                )
+                self.l1_cache.set_many(
+                    negative_backfill,
+                    self._negative_ttl(strategy),
+                    sizes,
+                    strategy.eviction_policy,
+                )
+                misses = remaining
+            except Exception as e:
+                logger.error(f"Redis mget error: {e}")
+
+        self._stats.misses += len(misses)
+        return results
+
+    async def batch_set(
+        self,
+        items: Dict[str, Any],
+        strategy: CacheStrategy,
+        ttl: Optional[Union[int, Dict[str, int]]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        批量设置缓存值
+
+        所有Redis写入（含标签登记）通过一个流水线完成
+
+        Args:
+            items: 键值对字典
+            strategy: 缓存策略
+            ttl: 统一过期时间（秒），或键到过期时间的字典，默认使用策略TTL
+            tags: 额外标签
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        all_tags = list(dict.fromkeys([*strategy.tags, *(tags or [])]))
+        entries = []
+        for key, value in items.items():
+            key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+            entries.append(
+                (self._build_key(key, strategy), value, key_ttl or strategy.ttl)
+            )
+
+        use_l2 = strategy.level == CacheLevel.L2_REDIS and self.redis_client
+        pipe = self.redis_client.pipeline(transaction=False) if use_l2 else None
+
+        for full_key, value, key_ttl in entries:
+            serialized_data = self._serialize(value, strategy) if use_l2 else None
+            self.l1_cache.set(
+                full_key,
+                value,
+                key_ttl,
+                tags=all_tags,
+                size=len(serialized_data) if use_l2 else None,
+                eviction_policy=strategy.eviction_policy,
+            )
+            if use_l2:
+                self._queue_l2_write(pipe, full_key, serialized_data, key_ttl, all_tags)
+
+        if not use_l2:
+            return True
+
+        try:
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Redis batch set error: {e}")
+            return False
+
+    async def get_or_compute(
+        self,
+        key: str,
+        loader: Loader,
+        strategy: CacheStrategy,
+        distributed_lock: bool = False,
+        lock_timeout: Optional[float] = None,
+        beta: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        cache_negative: bool = True,
+    ) -> Any:
+        """
+        获取缓存值，未命中时调用loader计算并回写
+
+        - 进程内single-flight：同一键的并发未命中共享同一次计算
+        - 可选跨worker Redis锁（带租约超时），其他worker等待结果
+        - XFetch概率提前刷新：越临近过期、计算越慢，越可能提前重算
+        - 负缓存：loader返回None时以较短TTL缓存"不存在"，避免反复穿透到数据库
+
+        Args:
+            key: 缓存键
+            loader: 计算函数（同步或异步），返回None表示数据不存在
+            strategy: 缓存策略
+            distributed_lock: 是否启用跨worker锁
+            lock_timeout: 锁租约时间（秒）
+            beta: 提前刷新系数，0表示关闭
+            tags: 额外标签，用于clear_by_tags精确失效
+            cache_negative: loader返回None时是否写入负缓存
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        full_key = self._build_key(key, strategy)
+        self.access_log.record(strategy.key_prefix, key, self.redis_client)
+        beta = self.early_refresh_beta if beta is None else beta
+
+        value, expires_at, compute_time = await self._lookup_with_expiry(
+            full_key, strategy
+        )
+        if value is MISSING:
+            return None
+        if value is not None:
+            if not self._should_refresh_early(expires_at, compute_time, beta):
+                return value
+            self._stats.early_refreshes += 1
+
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            self._stats.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        # 无等待者时也标记异常已读取，避免"exception was never retrieved"日志
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[full_key] = future
+        try:
+            value = await self._compute_and_store(
+                full_key,
+                loader,
+                strategy,
+                distributed_lock,
+                lock_timeout or self.lock_timeout,
+                tags,
+                cache_negative,
+            )
+            if value is MISSING:
+                value = None
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+
+    async def _lookup_with_expiry(
+        self, full_key: str, strategy: CacheStrategy
+    ) -> Tuple[Any, Optional[float], float]:
+        """查找缓存值，同时返回过期时间戳和计算耗时"""
+        item = self.l1_cache.get_item(full_key)
+        if item is not None:
+            if item.value is MISSING:
+                self._stats.negative_hits += 1
+            else:
+                self._stats.l1_hits += 1
+            return item.value, item.expires_at, item.compute_time
+
+        if strategy.level == CacheLevel.L2_REDIS and self.redis_client:
+            try:
+                read_version = self._invalidation_version
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(full_key)
+                pipe.pttl(full_key)
+                cached_data, pttl = await pipe.execute()
+                if cached_data:
+                    value = self._deserialize(cached_data, strategy)
+                    remaining = pttl / 1000 if pttl and pttl > 0 else strategy.ttl
+                    compute_time = self._compute_times.get(strategy.name, 0.0)
+
+                    # 回填L1时沿用L2剩余TTL，避免L1比L2活得更久
+                    self._backfill_l1(
+                        full_key,
+                        value,
+                        strategy,
+                        len(cached_data),
+                        read_version,
+                        ttl=max(1, int(remaining)),
+                        compute_time=compute_time,
+                    )
+
+                    if value is MISSING:
+                        self._stats.negative_hits += 1
+                    else:
+                        self._stats.l2_hits += 1
+                    return value, time.time() + remaining, compute_time
+            except Exception as e:
+                logger.error(f"Redis get error: {e}")
+
+        self._stats.misses += 1
+        return None, None, 0.0
+
+    @staticmethod
+    def _should_refresh_early(
+        expires_at: Optional[float], compute_time: float, beta: float
+    ) -> bool:
+        """XFetch: now - delta * beta * ln(rand) >= expiry 时提前刷新"""
+        if expires_at is None or compute_time <= 0 or beta <= 0:
+            return False
+        jitter = -compute_time * beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= expires_at
+
+    async def _compute_and_store(
+        self,
+        full_key: str,
+        loader: Loader,
+        strategy: CacheStrategy,
+        distributed_lock: bool,
+        lock_timeout: float,
+        tags: Optional[List[str]] = None,
+        cache_negative: bool = True,
+    ) -> Any:
+        """执行loader并写入缓存，必要时持有跨worker锁"""
+        lock_key = f"lock:{full_key}"
+        token = None
+
+        if (
+            distributed_lock
+            and self.redis_client
+            and strategy.level == CacheLevel.L2_REDIS
+        ):
+            token = uuid.uuid4().hex
+            try:
+                acquired = await self.redis_client.set(
+                    lock_key, token, nx=True, px=int(lock_timeout * 1000)
+                )
+            except Exception as e:
+                logger.error(f"Redis lock error: {e}")
+                acquired, token = True, None
+
+            if not acquired:
+                token = None
+                self._stats.lock_waits += 1
+                value = await self._wait_for_value(
+                    full_key, lock_key, strategy, lock_timeout
+                )
+                if value is not None:
+                    return value
+                # 租约到期仍无结果（持有者失败），自行计算
+
+        try:
+            read_version = self._invalidation_version
+            start = time.perf_counter()
+            value = loader()
+            if inspect.isawaitable(value):
+                value = await value
+            compute_time = time.perf_counter() - start
+
+            self._stats.loads += 1
+            self._record_compute_time(strategy.name, compute_time)
+
+            if value is None and cache_negative:
+                value = MISSING
+            if value is not None:
+                # 写缓存失败不影响返回计算结果
+                try:
+                    await self._set_full_key(
+                        full_key, value, strategy, compute_time, tags, read_version
+                    )
+                except Exception as e:
+                    logger.warning(f"Cache set failed for {full_key}: {e}")
+            return value
+        finally:
+            if token is not None:
+                try:
+                    await self.redis_client.eval(
+                        _RELEASE_LOCK_SCRIPT, 1, lock_key, token
+                    )
+                except Exception as e:
+                    logger.error(f"Redis unlock error: {e}")
+
+    async def _wait_for_value(
+        self,
+        full_key: str,
+        lock_key: str,
+        strategy: CacheStrategy,
+        timeout: float,
+        poll_interval: float = 0.05,
+    ) -> Any:
+        """等待持有锁的worker写入结果"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            read_version = self._invalidation_version
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(full_key)
+                pipe.exists(lock_key)
+                cached_data, locked = await pipe.execute()
+            except Exception as e:
+                logger.error(f"Redis wait error: {e}")
+                return None
+
+            if cached_data:
+                value = self._deserialize(cached_data, strategy)
+                self._backfill_l1(
+                    full_key, value, strategy, len(cached_data), read_version
+                )
+                return value
+            if not locked:
+                return None
+        return None
+
+    def _record_compute_time(self, strategy_name: str, compute_time: float):
+        """记录策略的计算耗时（EWMA），供L2命中时估算提前刷新"""
+        previous = self._compute_times.get(strategy_name)
+        if previous is None:
+            self._compute_times[strategy_name] = compute_time
+        else:
+            self._compute_times[strategy_name] = 0.8 * previous + 0.2 * compute_time
+
+    @staticmethod
+    def _build_key(key: str, strategy: CacheStrategy) -> str:
+        """构建完整键名"""
+        return f"{strategy.key_prefix}:{key}" if strategy.key_prefix else key
+
     async def delete(self, key: str, strategy: CacheStrategy) -> bool:
         """删除缓存项"""
         if not self._initialized:
             await self.initialize()
 
         # 构建完整键名
-        full_key = f"{strategy.key_prefix}:{key}" if strategy.key_prefix else key
+        full_key = self._build_key(key, strategy)
 
         success = True
 
@@ -318,69 +1185,234 @@ class MultiLevelCacheService:
                 logger.error(f"Redis delete error: {e}")
                 success = False
 
+        # 通知其他worker删除各自的L1副本
+        await self._publish_invalidation(keys=[full_key])
+
         return success
 
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        """标签集合键名"""
+        return f"tag:{tag}"
+
+    @staticmethod
+    def _generation_key(tag: str) -> str:
+        """标签代数计数器键名"""
+        return f"tag_gen:{tag}"
+
     async def clear_by_tags(self, tags: List[str]) -> int:
-        """根据标签清除缓存"""
+        """
+        根据标签清除缓存
+
+        只删除标签集合中登记的键，不扫描键空间；L1按进程内标签索引删除。
+        标签集合先原子改名再分批删除成员，期间新写入的键登记到新集合，不会漏删。
+
+        Returns:
+            删除的键数量（Redis可用时以L2为准）
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        deleted_count = self.l1_cache.delete_by_tags(tags)
+        await self._publish_invalidation(tags=tags)
         if not self.redis_client:
-            return 0
+            return deleted_count
 
         try:
-            # 构建标签模式
-            patterns = [f"*{tag}*" for tag in tags]
             deleted_count = 0
+            for tag in tags:
+                purge_key = f"{self._tag_key(tag)}:purge:{uuid.uuid4().hex}"
+                try:
+                    await self.redis_client.rename(self._tag_key(tag), purge_key)
+                except redis.ResponseError:
+                    continue  # 标签集合不存在
 
-            for pattern in patterns:
-                keys = await self.redis_client.keys(pattern)
-                if keys:
-                    deleted_count += await self.redis_client.delete(*keys)
-
-            # 清除L1缓存中匹配的项
-            self.l1_cache.clear()  # 简化实现，清除所有L1缓存
+                deleted_count += await self._delete_members(purge_key)
+                await self.redis_client.delete(purge_key)
 
             return deleted_count
         except Exception as e:
             logger.error(f"Clear by tags error: {e}")
             return 0
 
+    async def _delete_members(self, set_key: str) -> int:
+        """分批流水线删除集合中的成员键，并广播各批键的L1失效"""
+        deleted = 0
+        batch: List[bytes] = []
+
+        async def flush() -> int:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for member in batch:
+                pipe.delete(member)
+            count = sum(await pipe.execute())
+
+            # L2回填的L1副本不带标签，按键名逐个失效
+            keys = [member.decode("utf-8") for member in batch]
+            for key in keys:
+                self.l1_cache.delete(key)
+            await self._publish_invalidation(keys=keys)
+            return count
+
+        async for member in self.redis_client.sscan_iter(
+            set_key, count=self.tag_batch_size
+        ):
+            batch.append(member)
+            if len(batch) >= self.tag_batch_size:
+                deleted += await flush()
+                batch = []
+        if batch:
+            deleted += await flush()
+        return deleted
+
+    async def _publish_invalidation(
+        self, keys: Optional[List[str]] = None, tags: Optional[List[str]] = None
+    ):
+        """记录本地失效并广播给其他worker，Redis不可用时仅本地生效"""
+        version = None
+        if self.redis_client and self.invalidation_enabled:
+            message = json.dumps(
+                {"origin": self.instance_id, "keys": keys or [], "tags": tags or []}
+            )
+            try:
+                version = int(
+                    await self.redis_client.eval(
+                        _PUBLISH_INVALIDATION_SCRIPT,
+                        1,
+                        f"{self.invalidation_channel}:version",
+                        self.invalidation_channel,
+                        message,
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"Publish cache invalidation failed: {e}")
+
+        if version is None:
+            version = self._invalidation_version + 1
+        self._record_invalidation(version, keys or [], tags or [])
+
+    def _record_invalidation(self, version: int, keys: List[str], tags: List[str]):
+        """更新失效版本和最近失效记录"""
+        self._invalidation_version = max(self._invalidation_version, version)
+        for name in [*keys, *(self._tag_key(tag) for tag in tags)]:
+            self._invalidated_at[name] = version
+            self._invalidated_at.move_to_end(name)
+        while len(self._invalidated_at) > self._invalidation_history_size:
+            self._invalidated_at.popitem(last=False)
+
+    def _invalidated_since(self, read_version: int, names: List[str]) -> bool:
+        """检查键/标签在read_version之后是否被失效过"""
+        if self._invalidation_version <= read_version:
+            return False
+        if len(self._invalidated_at) >= self._invalidation_history_size:
+            # 历史记录已截断，无法判断时按已失效处理
+            oldest = next(iter(self._invalidated_at.values()))
+            if oldest > read_version:
+                return True
+        return any(self._invalidated_at.get(name, 0) > read_version for name in names)
+
+    def _apply_invalidation_message(self, data: bytes):
+        """处理其他worker广播的失效消息"""
+        raw_version, _, payload = data.decode("utf-8").partition("|")
+        message = json.loads(payload)
+        if message.get("origin") == self.instance_id:
+            return
+
+        keys = message.get("keys", [])
+        tags = message.get("tags", [])
+        for key in keys:
+            self.l1_cache.delete(key)
+        if tags:
+            self.l1_cache.delete_by_tags(tags)
+        self._record_invalidation(int(raw_version), keys, tags)
+
+    async def _listen_invalidations(self):
+        """后台订阅失效广播；断线期间可能错过消息，重连后清空L1"""
+        retry_delay = 1.0
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                retry_delay = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        self._apply_invalidation_message(message["data"])
+                    except Exception as e:
+                        logger.error(f"Invalid cache invalidation message: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener disconnected: {e}")
+                self.l1_cache.clear()
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def get_tag_generations(self, tags: List[str]) -> List[int]:
+        """获取标签当前代数"""
+        if not self._initialized:
+            await self.initialize()
+
+        if self.redis_client:
+            try:
+                values = await self.redis_client.mget(
+                    [self._generation_key(tag) for tag in tags]
+                )
+                return [int(value or 0) for value in values]
+            except Exception as e:
+                logger.error(f"Get tag generation error: {e}")
+        return [self._generations.get(tag, 0) for tag in tags]
+
+    async def bump_tag_generations(self, tags: List[str]) -> None:
+        """
+        递增标签代数
+
+        O(1)失效方式：键名中嵌入代数（见generation_key），代数递增后旧键不再被访问，
+        由TTL自然过期，适合成员很多、无需立即回收内存的标签
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for tag in tags:
+                    pipe.incr(self._generation_key(tag))
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"Bump tag generation error: {e}")
+
+    async def generation_key(self, key: str, tags: List[str]) -> str:
+        """在缓存键中嵌入标签代数"""
+        generations = await self.get_tag_generations(tags)
+        return f"{key}@g" + ".".join(str(generation) for generation in generations)
+
     async def warmup_cache(self, warmup_data: Dict[str, Any], strategy: CacheStrategy):
         """缓存预热"""
         logger.info(f"Starting cache warmup with {len(warmup_data)} items")
 
-        for key, value in warmup_data.items():
-            await self.set(key, value, strategy)
+        batch_size = getattr(settings, "CACHE_WARMUP_BATCH_SIZE", 1000)
+        items = list(warmup_data.items())
+        for i in range(0, len(items), batch_size):
+            await self.batch_set(dict(items[i : i + batch_size]), strategy)
 
         logger.info("Cache warmup completed")
 
     def _serialize(self, value: Any, strategy: CacheStrategy) -> bytes:
-        """序列化数据"""
-        if strategy.serialization == "json":
-            data = json.dumps(value, ensure_ascii=False).encode("utf-8")
-        elif strategy.serialization == "pickle":
-            data = pickle.dumps(value)
-        else:
-            # 默认使用pickle
-            data = pickle.dumps(value)
-
-        # 压缩
-        if strategy.compression:
-            data = gzip.compress(data)
-
-        return data
+        """序列化数据（带编解码头字节）"""
+        return cache_codec.encode(value, strategy.serialization, strategy.compression)
 
     def _deserialize(self, data: bytes, strategy: CacheStrategy) -> Any:
-        """反序列化数据"""
-        # 解压缩
-        if strategy.compression:
-            data = gzip.decompress(data)
-
-        if strategy.serialization == "json":
-            return json.loads(data.decode("utf-8"))
-        elif strategy.serialization == "pickle":
-            return pickle.loads(data)
-        else:
-            # 默认使用pickle
-            return pickle.loads(data)
+        """反序列化数据，兼容无头字节的旧数据"""
+        return cache_codec.decode(data, strategy.serialization, strategy.compression)
 
     async def get_comprehensive_stats(self) -> Dict[str, Any]:
         """获取综合统计信息"""
@@ -411,8 +1443,21 @@ class MultiLevelCacheService:
                 "l1_hit_rate": self._stats.l1_hit_rate,
                 "l1_hits": self._stats.l1_hits,
                 "l2_hits": self._stats.l2_hits,
+                "negative_hits": self._stats.negative_hits,
                 "misses": self._stats.misses,
             },
+            "invalidation_bus": {
+                "enabled": self._listener_task is not None
+                and not self._listener_task.done(),
+                "version": self._invalidation_version,
+            },
+            "stampede_protection": {
+                "loads": self._stats.loads,
+                "coalesced": self._stats.coalesced,
+                "early_refreshes": self._stats.early_refreshes,
+                "lock_waits": self._stats.lock_waits,
+                "inflight": len(self._inflight),
+            },
         }
 
     async def health_check(self) -> Dict[str, Any]:
@@ -433,7 +1478,15 @@ class MultiLevelCacheService:
 
     async def close(self):
         """关闭缓存服务"""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
         if self.redis_client:
+            await self.access_log.flush(self.redis_client)
             await self.redis_client.close()
         self.l1_cache.clear()
         logger.info("Multi-level cache service closed")
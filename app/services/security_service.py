@@ -6,7 +6,7 @@
 import asyncio
 import logging
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from typing import Any, Dict, List
 
 from sqlalchemy import and_, desc, func, or_
@@ -15,6 +15,11 @@ from sqlalchemy.orm import Session
 from app.core.security.threat_detector import ThreatDetector
 from app.crud.crud_audit_log import audit_log as audit_log_crud
 from app.crud.crud_security_event import security_event as security_event_crud
+from app.crud.crud_stats_rollup import (
+    DATE,
+    audit_log_rollup,
+    security_event_rollup,
+)
 from app.models.audit_log import AuditLog
 from app.models.security_event import (
     SecurityEvent,
@@ -77,106 +82,34 @@ class SecurityService:
         now = datetime.utcnow()
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
         week_start = today_start - timedelta(days=7)
-        month_start = today_start - timedelta(days=30)
-
-        # 今日威胁数量
-        today_threats = (
-            self.db.query(func.count(SecurityEvent.id))
-            .filter(SecurityEvent.created_at >= today_start)
-            .scalar()
-            or 0
-        )
-
-        # 本周威胁数量
-        week_threats = (
-            self.db.query(func.count(SecurityEvent.id))
-            .filter(SecurityEvent.created_at >= week_start)
-            .scalar()
-            or 0
-        )
-
-        # 活跃威胁数量（未解决）
-        active_threats = (
-            self.db.query(func.count(SecurityEvent.id))
-            .filter(SecurityEvent.is_resolved == False)
-            .scalar()
-            or 0
-        )
-
-        # 高危威胁数量
-        critical_threats = (
-            self.db.query(func.count(SecurityEvent.id))
-            .filter(
-                and_(
-                    SecurityEvent.level == SecurityEventLevel.CRITICAL,
-                    SecurityEvent.is_resolved == False,
-                )
-            )
-            .scalar()
-            or 0
-        )
+        prev_week_start = week_start - timedelta(days=7)
 
-        # 今日登录失败次数
-        today_failed_logins = (
-            self.db.query(func.count(AuditLog.id))
-            .filter(
-                and_(
-                    AuditLog.action == "login",
-                    AuditLog.status == "failed",
-                    AuditLog.created_at >= today_start,
-                )
-            )
-            .scalar()
-            or 0
+        # 每张表一次扫描，结果短时缓存
+        threat_counts = security_event_crud.get_dashboard_counts(
+            self.db,
+            today_start=today_start,
+            week_start=week_start,
+            prev_week_start=prev_week_start,
         )
+        activity_counts = audit_log_crud.get_activity_counts(self.db, since=today_start)
 
-        # 今日活跃用户数
-        today_active_users = (
-            self.db.query(func.count(func.distinct(AuditLog.user_id)))
-            .filter(
-                and_(AuditLog.created_at >= today_start, AuditLog.user_id.isnot(None))
-            )
-            .scalar()
-            or 0
-        )
+        today_threats = threat_counts["today"]
+        week_threats = threat_counts["week"]
+        active_threats = threat_counts["active"]
+        critical_threats = threat_counts["critical"]
+        today_failed_logins = activity_counts["failed_logins"]
+        today_active_users = activity_counts["active_users"]
 
         # 系统可用性（简化计算）
-        total_requests = (
-            self.db.query(func.count(AuditLog.id))
-            .filter(AuditLog.created_at >= today_start)
-            .scalar()
-            or 1
-        )
-
-        failed_requests = (
-            self.db.query(func.count(AuditLog.id))
-            .filter(
-                and_(
-                    AuditLog.created_at >= today_start,
-                    AuditLog.status.in_(["failed", "error"]),
-                )
-            )
-            .scalar()
-            or 0
-        )
+        total_requests = activity_counts["total"] or 1
+        failed_requests = activity_counts["failed"]
 
         system_availability = (
             (total_requests - failed_requests) / total_requests
         ) * 100
 
         # 威胁趋势（与上周比较）
-        prev_week_start = week_start - timedelta(days=7)
-        prev_week_threats = (
-            self.db.query(func.count(SecurityEvent.id))
-            .filter(
-                and_(
-                    SecurityEvent.created_at >= prev_week_start,
-                    SecurityEvent.created_at < week_start,
-                )
-            )
-            .scalar()
-            or 1
-        )
+        prev_week_threats = threat_counts["prev_week"] or 1
 
         threat_trend = ((week_threats - prev_week_threats) / prev_week_threats) * 100
 
@@ -237,37 +170,23 @@ class SecurityService:
         end_date = datetime.utcnow().date()
         start_date = end_date - timedelta(days=days)
 
-        # 按日期统计威胁数量
-        daily_threats = (
-            self.db.query(
-                func.date(SecurityEvent.created_at).label("date"),
-                func.count(SecurityEvent.id).label("count"),
-            )
-            .filter(func.date(SecurityEvent.created_at) >= start_date)
-            .group_by(func.date(SecurityEvent.created_at))
-            .all()
-        )
-
-        # 按日期统计失败登录
-        daily_failed_logins = (
-            self.db.query(
-                func.date(AuditLog.created_at).label("date"),
-                func.count(AuditLog.id).label("count"),
-            )
-            .filter(
-                and_(
-                    func.date(AuditLog.created_at) >= start_date,
-                    AuditLog.action == "login",
-                    AuditLog.status == "failed",
-                )
-            )
-            .group_by(func.date(AuditLog.created_at))
-            .all()
-        )
-
-        # 创建日期到数量的映射
-        threats_map = {threat.date: threat.count for threat in daily_threats}
-        failed_logins_map = {login.date: login.count for login in daily_failed_logins}
+        # 按日期统计威胁数量和失败登录：完整小时读取汇总表，其余聚合原始行
+        start_time = datetime.combine(start_date, time.min)
+        threats_map = {
+            key[0]: count
+            for key, count in security_event_rollup.grouped_counts(
+                self.db, (DATE,), start_time=start_time
+            ).items()
+        }
+        failed_logins_map = {
+            key[0]: count
+            for key, count in audit_log_rollup.grouped_counts(
+                self.db,
+                (DATE,),
+                start_time=start_time,
+                filters={"action": ["login"], "status": ["failed"]},
+            ).items()
+        }
 
         # 生成完整的日期序列
         trends = []
@@ -677,14 +596,12 @@ class SecurityService:
         return await self.threat_detector.run_scan(scan_type)
 
     async def cleanup_old_data(self, days: int = 90) -> Dict[str, int]:
-        """清理旧数据"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-
+        """清理旧数据（分区表按整月删除过期分区）"""
         # 清理旧的审计日志
-        deleted_logs = audit_log_crud.cleanup_old_logs(self.db, cutoff_date)
+        deleted_logs = audit_log_crud.cleanup_old_logs(self.db, days=days)
 
         # 清理旧的已解决安全事件
-        deleted_events = security_event_crud.cleanup_old_events(self.db, cutoff_date)
+        deleted_events = security_event_crud.cleanup_old_events(self.db, days=days)
 
         return {
             "deleted_audit_logs": deleted_logs,
@@ -12,15 +12,17 @@ import decimal
 import hashlib
 import inspect
 import json
+from dataclasses import replace
 from functools import wraps
 from typing import Any, Optional
 
 from fastapi import Request
 from sqlalchemy.orm import Session
 
+from app.config.cache_strategy import CacheStrategy, get_cache_strategy
 from app.core.logging import logger
 from app.models.user import User
-from app.services.cache_service import cache_service
+from app.services.multi_level_cache import get_multi_cache_service
 
 
 def _is_fastapi_dependency(obj: Any) -> bool:
@@ -96,7 +98,19 @@ def _generate_model_cache_key(
     return hashlib.sha256(key_data.encode("utf-8")).hexdigest()[:16]
 
 
-def _clear_cache(
+def _resolve_strategy(prefix: str, expire: Optional[int]) -> CacheStrategy:
+    """根据前缀获取缓存策略，未注册的前缀基于默认策略派生"""
+    strategy = get_cache_strategy(prefix)
+    if strategy is None:
+        strategy = replace(
+            get_cache_strategy("default"), name=prefix, key_prefix=prefix
+        )
+    if expire:
+        strategy = replace(strategy, ttl=expire)
+    return strategy
+
+
+async def _clear_cache(
     func_name: str,
     args: tuple,
     kwargs: dict,
@@ -109,7 +123,8 @@ def _clear_cache(
     else:
         cache_key = _generate_cache_key(func_name, args, kwargs)
 
-    return cache_service.delete(cache_key, prefix)
+    multi_cache = await get_multi_cache_service()
+    return await multi_cache.delete(cache_key, _resolve_strategy(prefix, None))
 
 
 def cache_result(
@@ -117,6 +132,9 @@ def cache_result(
     prefix: str = "func",
     key_func: Optional[Any] = None,
     skip_cache: Optional[Any] = None,
+    distributed_lock: bool = False,
+    tags: Optional[Any] = None,
+    cache_none: bool = True,
 ):
     """缓存函数结果的装饰器
 
@@ -125,6 +143,10 @@ def cache_result(
         prefix: 缓存键前缀
         key_func: 自定义键生成函数
         skip_cache: 跳过缓存的条件函数
+        distributed_lock: 是否使用跨worker锁防止缓存击穿
+        tags: 缓存标签列表, 或根据函数参数生成标签列表的函数,
+            如 lambda project_id, **_: [f"project:{project_id}"]
+        cache_none: 函数返回None时是否以短TTL写入负缓存
     """
 
     def decorator(func: Any) -> Any:
@@ -157,26 +179,21 @@ def cache_result(
                     func.__name__, tuple(filtered_args), filtered_kwargs
                 )
 
-            # 尝试从缓存获取
             try:
-                cached_result = await cache_service.get(cache_key, prefix)
-                if cached_result is not None:
-                    logger.debug(f"Cache hit for {func.__name__}: {cache_key}")
-                    return cached_result
+                multi_cache = await get_multi_cache_service()
             except Exception as e:
-                logger.warning(f"Cache get failed for {func.__name__}: {e}")
-
-            # 执行函数
-            logger.debug(f"Cache miss for {func.__name__}: {cache_key}")
-            result = await func(*args, **kwargs)
-
-            # 缓存结果
-            try:
-                await cache_service.set(cache_key, result, prefix, expire)
-            except Exception as e:
-                logger.warning(f"Cache set failed for {func.__name__}: {e}")
+                logger.warning(f"Cache unavailable for {func.__name__}: {e}")
+                return await func(*args, **kwargs)
 
-            return result
+            # 并发未命中合并为一次计算，临近过期时概率提前刷新
+            return await multi_cache.get_or_compute(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                _resolve_strategy(prefix, expire),
+                distributed_lock=distributed_lock,
+                tags=tags(*args, **kwargs) if callable(tags) else tags,
+                cache_negative=cache_none,
+            )
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs) -> Any:
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识图谱流式导出
+
+通过服务端游标逐批读取节点和关系, 以JSON Lines、GraphML或GEXF
+格式增量输出, 可选实时gzip压缩, 内存占用与图谱规模无关
+"""
+
+import json
+import logging
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping
+from xml.sax.saxutils import escape, quoteattr
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "jsonl": "application/x-ndjson",
+    "graphml": "application/graphml+xml",
+    "gexf": "application/gexf+xml",
+}
+
+# 服务端游标每批读取的行数
+DEFAULT_BATCH_SIZE = 2000
+
+_NODES_SQL = """
+SELECT entity_id, entity_name, entity_type, confidence
+FROM knowledge_graph_nodes
+ORDER BY id
+"""
+
+_EDGES_SQL = """
+SELECT id, source_entity_id, target_entity_id, relation_type, confidence
+FROM knowledge_graph_relations
+ORDER BY id
+"""
+
+
+def _stream_rows(db: Session, sql: str, batch_size: int) -> Iterator[Mapping[str, Any]]:
+    """使用服务端游标逐批读取结果"""
+    result = db.execute(
+        text(sql).execution_options(stream_results=True, yield_per=batch_size)
+    )
+    try:
+        for row in result.mappings():
+            yield row
+    finally:
+        result.close()
+
+
+def _xml_value(value: Any) -> str:
+    return escape("" if value is None else str(value))
+
+
+def _graphml_data(key: str, value: Any) -> str:
+    """数值型属性为空时省略data元素"""
+    if value is None:
+        return ""
+    return f'<data key="{key}">{value}</data>'
+
+
+def _gexf_attvalue(attribute_id: str, value: Any) -> str:
+    """数值型属性为空时省略attvalue元素, 不以默认值代替"""
+    if value is None:
+        return ""
+    return f'<attvalue for="{attribute_id}" value="{value}"/>'
+
+
+def _gexf_weight(value: Any) -> str:
+    """置信度为空时省略weight属性"""
+    if value is None:
+        return ""
+    return f' weight="{value}"'
+
+
+# ==================== JSON Lines ====================
+
+
+def _iter_jsonl(nodes: Iterable, edges: Iterable) -> Iterator[str]:
+    for node in nodes:
+        yield json.dumps(
+            {
+                "kind": "node",
+                "id": node["entity_id"],
+                "name": node["entity_name"],
+                "type": node["entity_type"],
+                "confidence": node["confidence"],
+            },
+            ensure_ascii=False,
+        ) + "\n"
+
+    for edge in edges:
+        yield json.dumps(
+            {
+                "kind": "edge",
+                "id": edge["id"],
+                "source": edge["source_entity_id"],
+                "target": edge["target_entity_id"],
+                "type": edge["relation_type"],
+                "confidence": edge["confidence"],
+            },
+            ensure_ascii=False,
+        ) + "\n"
+
+
+# ==================== GraphML ====================
+
+
+def _iter_graphml(nodes: Iterable, edges: Iterable) -> Iterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        '  <key id="name" for="node" attr.name="name" attr.type="string"/>\n'
+        '  <key id="type" for="node" attr.name="type" attr.type="string"/>\n'
+        '  <key id="confidence" for="node" attr.name="confidence" '
+        'attr.type="double"/>\n'
+        '  <key id="relation_type" for="edge" attr.name="type" '
+        'attr.type="string"/>\n'
+        '  <key id="weight" for="edge" attr.name="confidence" '
+        'attr.type="double"/>\n'
+        '  <graph id="knowledge_graph" edgedefault="directed">\n'
+    )
+
+    for node in nodes:
+        yield (
+            f'    <node id={quoteattr(str(node["entity_id"]))}>'
+            f'<data key="name">{_xml_value(node["entity_name"])}</data>'
+            f'<data key="type">{_xml_value(node["entity_type"])}</data>'
+            f"{_graphml_data('confidence', node['confidence'])}"
+            "</node>\n"
+        )
+
+    for edge in edges:
+        yield (
+            f'    <edge id="e{edge["id"]}" '
+            f'source={quoteattr(str(edge["source_entity_id"]))} '
+            f'target={quoteattr(str(edge["target_entity_id"]))}>'
+            f'<data key="relation_type">{_xml_value(edge["relation_type"])}</data>'
+            f"{_graphml_data('weight', edge['confidence'])}"
+            "</edge>\n"
+        )
+
+    yield "  </graph>\n</graphml>\n"
+
+
+# ==================== GEXF ====================
+
+
+def _iter_gexf(nodes: Iterable, edges: Iterable) -> Iterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n'
+        '  <graph mode="static" defaultedgetype="directed">\n'
+        '    <attributes class="node">\n'
+        '      <attribute id="0" title="type" type="string"/>\n'
+        '      <attribute id="1" title="confidence" type="double"/>\n'
+        "    </attributes>\n"
+        '    <attributes class="edge">\n'
+        '      <attribute id="0" title="type" type="string"/>\n'
+        "    </attributes>\n"
+        "    <nodes>\n"
+    )
+
+    for node in nodes:
+        yield (
+            f'      <node id={quoteattr(str(node["entity_id"]))} '
+            f'label={quoteattr(str(node["entity_name"] or ""))}><attvalues>'
+            f'<attvalue for="0" value={quoteattr(str(node["entity_type"] or ""))}/>'
+            f"{_gexf_attvalue('1', node['confidence'])}"
+            "</attvalues></node>\n"
+        )
+
+    yield "    </nodes>\n    <edges>\n"
+
+    for edge in edges:
+        yield (
+            f'      <edge id="{edge["id"]}" '
+            f'source={quoteattr(str(edge["source_entity_id"]))} '
+            f'target={quoteattr(str(edge["target_entity_id"]))}'
+            f'{_gexf_weight(edge["confidence"])}><attvalues>'
+            f'<attvalue for="0" value={quoteattr(str(edge["relation_type"] or ""))}/>'
+            "</attvalues></edge>\n"
+        )
+
+    yield "    </edges>\n  </graph>\n</gexf>\n"
+
+
+_WRITERS: Dict[str, Callable[[Iterable, Iterable], Iterator[str]]] = {
+    "jsonl": _iter_jsonl,
+    "graphml": _iter_graphml,
+    "gexf": _iter_gexf,
+}
+
+
+def _gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """对输出块进行流式gzip压缩"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip头
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _buffer_chunks(parts: Iterable[str], chunk_size: int) -> Iterator[bytes]:
+    """将细碎的文本片段合并为较大的字节块, 减少写出次数"""
+    buffer = []
+    size = 0
+    for part in parts:
+        data = part.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_graph_export(
+    db: Session,
+    format_type: str = "jsonl",
+    compress: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    chunk_size: int = 64 * 1024,
+) -> Iterator[bytes]:
+    """
+    流式导出知识图谱
+
+    Args:
+        db: 数据库会话
+        format_type: 导出格式 jsonl/graphml/gexf
+        compress: 是否gzip压缩
+        batch_size: 服务端游标每批读取的行数
+        chunk_size: 输出块大小(字节)
+
+    Yields:
+        导出内容的字节块
+    """
+    writer = _WRITERS.get(format_type)
+    if writer is None:
+        raise ValueError(f"Unsupported format: {format_type}")
+
+    # 节点全部输出后才开始读取关系, 两个游标不会同时打开
+    nodes = _stream_rows(db, _NODES_SQL, batch_size)
+    edges = _stream_rows(db, _EDGES_SQL, batch_size)
+
+    chunks = _buffer_chunks(writer(nodes, edges), chunk_size)
+    if compress:
+        chunks = _gzip_chunks(chunks)
+
+    for chunk in chunks:
+        yield chunk
+
+    logger.info(f"Knowledge graph exported as {format_type} (gzip={compress})")
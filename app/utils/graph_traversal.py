@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识图谱遍历引擎
+
+基于单次BFS(父指针 + deque)计算实体的k跳邻域及最短路径,
+支持关系类型过滤、枢纽节点扇出限制以及流式输出
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set
+
+import networkx as nx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TraversalHit:
+    """一次遍历发现的连接"""
+
+    node_id: Hashable
+    parent_id: Hashable
+    depth: int
+    path: List[Hashable]
+    edge_data: Dict[str, Any]
+    node_data: Dict[str, Any]
+
+    def to_connection(self) -> Dict[str, Any]:
+        """转换为find_entity_connections的连接格式"""
+        return {
+            "entity": {
+                "id": self.node_id,
+                "name": self.node_data.get("name"),
+                "type": self.node_data.get("type"),
+            },
+            "relation": {
+                "type": self.edge_data.get("type"),
+                "confidence": self.edge_data.get("confidence"),
+            },
+            "depth": self.depth,
+            "path": self.path,
+        }
+
+
+@dataclass
+class TraversalResult:
+    """遍历结果汇总"""
+
+    source_id: Hashable
+    hits: List[TraversalHit] = field(default_factory=list)
+    truncated_nodes: List[Hashable] = field(default_factory=list)
+
+    @property
+    def connections(self) -> List[Dict[str, Any]]:
+        return [hit.to_connection() for hit in self.hits]
+
+    def shortest_paths(
+        self, min_length: int = 2, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        返回BFS树中的最短路径(按长度升序)
+
+        Args:
+            min_length: 最小路径长度(边数), 默认排除直接连接
+            limit: 返回的最大路径数
+        """
+        # BFS按层发现节点, hits本身已按深度有序
+        paths = [
+            {
+                "target": hit.to_connection()["entity"],
+                "path": hit.path,
+                "length": hit.depth,
+            }
+            for hit in self.hits
+            if hit.depth >= min_length
+        ]
+        return paths[:limit] if limit is not None else paths
+
+
+class GraphTraversalEngine:
+    """
+    图遍历引擎
+
+    在一次广度优先遍历中记录父指针, 每个被发现节点的最短路径
+    都可以直接由父指针回溯得到, 无需为每个连接单独求最短路径
+    """
+
+    def __init__(self, graph: nx.DiGraph):
+        self.graph = graph
+
+    def iter_neighborhood(
+        self,
+        source_id: Hashable,
+        max_depth: int = 2,
+        relation_types: Optional[Iterable[str]] = None,
+        max_fanout: Optional[int] = None,
+        truncated: Optional[Set[Hashable]] = None,
+    ) -> Iterator[TraversalHit]:
+        """
+        流式遍历实体的k跳邻域
+
+        Args:
+            source_id: 起始节点
+            max_depth: 最大遍历深度
+            relation_types: 允许的关系类型, 为空时不过滤
+            max_fanout: 单个节点最多展开的邻居数(按关系置信度优先),
+                用于限制采购单位等枢纽实体的扇出
+            truncated: 可选集合, 用于收集因扇出限制被截断的节点
+
+        Yields:
+            按深度顺序发现的TraversalHit, 每个节点只出现一次
+        """
+        if source_id not in self.graph or max_depth <= 0:
+            return
+
+        allowed = set(relation_types) if relation_types else None
+        parents: Dict[Hashable, Hashable] = {source_id: None}
+        depths: Dict[Hashable, int] = {source_id: 0}
+        queue = deque([source_id])
+
+        while queue:
+            current_id = queue.popleft()
+            depth = depths[current_id]
+            if depth >= max_depth:
+                continue
+
+            for neighbor_id, edge_data in self._expand(
+                current_id, allowed, max_fanout, truncated
+            ):
+                if neighbor_id in parents:
+                    continue
+
+                parents[neighbor_id] = current_id
+                depths[neighbor_id] = depth + 1
+                queue.append(neighbor_id)
+
+                yield TraversalHit(
+                    node_id=neighbor_id,
+                    parent_id=current_id,
+                    depth=depth + 1,
+                    path=self.reconstruct_path(parents, neighbor_id),
+                    edge_data=edge_data,
+                    node_data=self.graph.nodes[neighbor_id],
+                )
+
+    def neighborhood(
+        self,
+        source_id: Hashable,
+        max_depth: int = 2,
+        relation_types: Optional[Iterable[str]] = None,
+        max_fanout: Optional[int] = None,
+    ) -> TraversalResult:
+        """一次遍历得到全部连接及其最短路径"""
+        truncated: Set[Hashable] = set()
+        hits = list(
+            self.iter_neighborhood(
+                source_id,
+                max_depth=max_depth,
+                relation_types=relation_types,
+                max_fanout=max_fanout,
+                truncated=truncated,
+            )
+        )
+        return TraversalResult(
+            source_id=source_id, hits=hits, truncated_nodes=list(truncated)
+        )
+
+    @staticmethod
+    def reconstruct_path(
+        parents: Dict[Hashable, Hashable], node_id: Hashable
+    ) -> List[Hashable]:
+        """根据父指针回溯从起点到node_id的路径"""
+        path = []
+        while node_id is not None:
+            path.append(node_id)
+            node_id = parents[node_id]
+        path.reverse()
+        return path
+
+    def _expand(
+        self,
+        node_id: Hashable,
+        allowed: Optional[Set[str]],
+        max_fanout: Optional[int],
+        truncated: Optional[Set[Hashable]],
+    ) -> List[tuple]:
+        """获取节点的可展开邻居(已应用关系过滤和扇出限制)"""
+        edges = [
+            (neighbor_id, edge_data)
+            for neighbor_id, edge_data in self.graph[node_id].items()
+            if allowed is None or edge_data.get("type") in allowed
+        ]
+
+        if max_fanout is not None and len(edges) > max_fanout:
+            edges.sort(key=lambda item: item[1].get("confidence") or 0, reverse=True)
+            edges = edges[:max_fanout]
+            if truncated is not None:
+                truncated.add(node_id)
+            logger.debug(f"Fan-out of node {node_id} capped at {max_fanout}")
+
+        return edges
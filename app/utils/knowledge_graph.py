@@ -3,16 +3,19 @@
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 import networkx as nx
 from sqlalchemy.orm import Session
 
 from app import crud, schemas
+from app.crud import crud_knowledge_graph
 from app.models.document import Document
 from app.models.vector import KnowledgeGraph, KnowledgeGraphRelation
 from app.utils.ai_integration import AIIntegrationService
 from app.utils.cache import CacheManager
+from app.utils.graph_export import iter_graph_export
+from app.utils.graph_traversal import GraphTraversalEngine
 from app.utils.text_processing import TextProcessor
 
 logger = logging.getLogger(__name__)
@@ -23,7 +26,9 @@ class KnowledgeGraphService:
     知识图谱服务 - 管理实体提取、关系构建和图谱分析
     """
 
-    def __init__(self):
+    def __init__(self, traversal_mode: str = "memory"):
+        # memory: 在进程内NetworkX图上遍历; sql: 使用数据库递归CTE遍历
+        self.traversal_mode = traversal_mode
         self.ai_service = AIIntegrationService()
         self.cache_manager = CacheManager()
         self.text_processor = TextProcessor()
@@ -511,139 +516,266 @@ class KnowledgeGraphService:
             raise
 
     async def find_entity_connections(
-        self, db: Session, entity_id: int, max_depth: int = 2
+        self,
+        db: Session,
+        entity_id: int,
+        max_depth: int = 2,
+        relation_types: Optional[List[str]] = None,
+        max_fanout: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         查找实体的连接关系
+
+        Args:
+            db: 数据库会话
+            entity_id: 实体ID
+            max_depth: 最大遍历深度
+            relation_types: 仅沿指定关系类型遍历
+            max_fanout: 单个实体最多展开的邻居数, 用于限制枢纽实体(仅memory模式)
+
+        Returns:
+            连接列表及最短路径(单次BFS得到)
         """
         try:
-            # 获取实体
-            entity = crud.knowledge_graph.get(db=db, id=entity_id)
-            if not entity:
-                raise ValueError(f"Entity {entity_id} not found")
+            if self.traversal_mode == "sql":
+                return await self._find_entity_connections_sql(
+                    db, entity_id, max_depth, relation_types
+                )
 
-            # 构建子图
-            if entity_id not in self.graph:
-                await self.build_knowledge_graph(db)
+            entity = await self._ensure_entity_in_graph(db, entity_id)
+            entity_info = {
+                "id": entity.id,
+                "name": entity.entity_name,
+                "type": entity.entity_type,
+            }
 
             if entity_id not in self.graph:
                 return {
-                    "entity": {
-                        "id": entity.id,
-                        "name": entity.entity_name,
-                        "type": entity.entity_type,
-                    },
+                    "entity": entity_info,
                     "connections": [],
                     "paths": [],
                 }
 
-            # 获取指定深度内的所有连接
-            connections = []
-            paths = []
-
-            # 使用BFS查找连接
-            visited = set()
-            queue = [(entity_id, 0, [entity_id])]
-
-            while queue:
-                current_id, depth, path = queue.pop(0)
-
-                if depth >= max_depth or current_id in visited:
-                    continue
-
-                visited.add(current_id)
-
-                # 获取邻居节点
-                for neighbor_id in self.graph.neighbors(current_id):
-                    if neighbor_id not in visited:
-                        # 获取边信息
-                        edge_data = self.graph.get_edge_data(current_id, neighbor_id)
-                        neighbor_data = self.graph.nodes[neighbor_id]
-
-                        connection = {
-                            "entity": {
-                                "id": neighbor_id,
-                                "name": neighbor_data["name"],
-                                "type": neighbor_data["type"],
-                            },
-                            "relation": {
-                                "type": edge_data["type"],
-                                "confidence": edge_data["confidence"],
-                            },
-                            "depth": depth + 1,
-                            "path": path + [neighbor_id],
-                        }
-                        connections.append(connection)
-
-                        # 添加到队列继续搜索
-                        queue.append((neighbor_id, depth + 1, path + [neighbor_id]))
-
-            # 查找最短路径
-            for connection in connections:
-                target_id = connection["entity"]["id"]
-                try:
-                    shortest_path = nx.shortest_path(self.graph, entity_id, target_id)
-                    if len(shortest_path) > 2:  # 不包括直接连接
-                        paths.append(
-                            {
-                                "target": connection["entity"],
-                                "path": shortest_path,
-                                "length": len(shortest_path) - 1,
-                            }
-                        )
-                except nx.NetworkXNoPath:
-                    continue
+            # 单次BFS同时得到连接和最短路径
+            result = GraphTraversalEngine(self.graph).neighborhood(
+                entity_id,
+                max_depth=max_depth,
+                relation_types=relation_types,
+                max_fanout=max_fanout,
+            )
+            connections = result.connections
 
             return {
-                "entity": {
-                    "id": entity.id,
-                    "name": entity.entity_name,
-                    "type": entity.entity_type,
-                },
+                "entity": entity_info,
                 "connections": connections,
-                "paths": sorted(paths, key=lambda x: x["length"])[
-                    :10
-                ],  # 最短的10条路径
+                "paths": result.shortest_paths(limit=10),  # 最短的10条路径
                 "total_connections": len(connections),
+                "truncated_entities": result.truncated_nodes,
             }
 
         except Exception as e:
             logger.error(f"Failed to find entity connections: {str(e)}")
             raise
 
+    async def _find_entity_connections_sql(
+        self,
+        db: Session,
+        entity_id: int,
+        max_depth: int,
+        relation_types: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        使用数据库递归CTE查找实体连接, 不加载完整图谱
+        """
+        entity = crud_knowledge_graph.knowledge_graph.get(db=db, id=entity_id)
+        if not entity:
+            raise ValueError(f"Entity {entity_id} not found")
+
+        rows = crud_knowledge_graph.knowledge_graph_relation.traverse_connections(
+            db,
+            start_entity_id=entity.entity_id,
+            max_depth=max_depth,
+            relation_types=relation_types,
+        )
+
+        connections = [
+            {
+                "entity": {"id": row["id"], "name": row["name"], "type": row["type"]},
+                "relation": {
+                    "type": row["relation_type"],
+                    "confidence": row["confidence"],
+                },
+                "depth": row["depth"],
+                "path": row["path"],
+            }
+            for row in rows
+        ]
+        paths = [
+            {
+                "target": connection["entity"],
+                "path": connection["path"],
+                "length": connection["depth"],
+            }
+            for connection in connections
+            if connection["depth"] >= 2
+        ]
+
+        return {
+            "entity": {
+                "id": entity.id,
+                "name": entity.entity_name,
+                "type": entity.entity_type,
+            },
+            "connections": connections,
+            "paths": paths[:10],  # 结果已按深度排序
+            "total_connections": len(connections),
+        }
+
+    async def find_connected_bidders(
+        self,
+        db: Session,
+        supplier_id: int,
+        max_hops: int = 1,
+        limit: int = 200,
+        project_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        查找与供应商共享联系人或地址的其他投标供应商(串标分析)
+
+        Args:
+            db: 数据库会话
+            supplier_id: 供应商实体ID
+            max_hops: 经过的共享实体数量上限
+            limit: 最大返回数量
+            project_id: 项目ID, 指定时不把该项目的采购人和代理机构计为关联投标人
+        """
+        try:
+            supplier = crud_knowledge_graph.knowledge_graph.get(db=db, id=supplier_id)
+            if not supplier:
+                raise ValueError(f"Entity {supplier_id} not found")
+
+            exclude_names = []
+            if project_id is not None:
+                project = crud.project.get(db=db, id=project_id)
+                if project:
+                    exclude_names = [
+                        project.procuring_entity,
+                        project.procurement_agency,
+                    ]
+
+            relations = crud_knowledge_graph.knowledge_graph_relation
+            bidders = relations.find_connected_bidders(
+                db,
+                supplier_entity_id=supplier.entity_id,
+                max_hops=max_hops,
+                exclude_names=[name for name in exclude_names if name],
+                limit=limit,
+            )
+
+            return {
+                "supplier": {
+                    "id": supplier.id,
+                    "name": supplier.entity_name,
+                    "type": supplier.entity_type,
+                },
+                "connected_bidders": [
+                    {
+                        "entity": {
+                            "id": bidder["id"],
+                            "name": bidder["name"],
+                            "type": bidder["type"],
+                        },
+                        "shared_entities": bidder["shared_entities"],
+                        "path": bidder["path"],
+                        "hops": len(bidder["shared_entities"]),
+                    }
+                    for bidder in bidders
+                ],
+                "total": len(bidders),
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to find connected bidders: {str(e)}")
+            raise
+
+    async def iter_entity_connections(
+        self,
+        db: Session,
+        entity_id: int,
+        max_depth: int = 2,
+        relation_types: Optional[List[str]] = None,
+        max_fanout: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式返回实体的连接关系
+
+        按深度顺序逐个产出连接, 适合邻域很大的实体
+        """
+        await self._ensure_entity_in_graph(db, entity_id)
+
+        engine = GraphTraversalEngine(self.graph)
+        for hit in engine.iter_neighborhood(
+            entity_id,
+            max_depth=max_depth,
+            relation_types=relation_types,
+            max_fanout=max_fanout,
+        ):
+            yield hit.to_connection()
+
+    async def _ensure_entity_in_graph(
+        self, db: Session, entity_id: int
+    ) -> KnowledgeGraph:
+        """
+        获取实体, 必要时构建内存图谱
+        """
+        entity = crud.knowledge_graph.get(db=db, id=entity_id)
+        if not entity:
+            raise ValueError(f"Entity {entity_id} not found")
+
+        if entity_id not in self.graph:
+            await self.build_knowledge_graph(db)
+
+        return entity
+
     async def search_entities(
-        self, db: Session, query: str, entity_types: List[str] = None
+        self,
+        db: Session,
+        query: str,
+        entity_types: List[str] = None,
+        skip: int = 0,
+        limit: int = 50,
     ) -> List[Dict[str, Any]]:
         """
         搜索实体
+
+        按名称相似度排序分页, 关系数量在同一查询中分组统计
         """
         try:
-            # 使用数据库搜索
-            entities = crud.knowledge_graph.search(
-                db=db, query=query, entity_types=entity_types
+            page = crud.knowledge_graph.search_with_relation_counts(
+                db=db, query=query, entity_types=entity_types, skip=skip, limit=limit
             )
 
             results = []
-            for entity in entities:
-                # 获取相关关系数量
-                relation_count = crud.knowledge_graph_relation.count_by_entity(
-                    db=db, entity_id=entity.id
-                )
-
+            for row in page["items"]:
+                properties = row["properties"] or {}
                 results.append(
                     {
-                        "id": entity.id,
-                        "name": entity.entity_name,
-                        "type": entity.entity_type,
-                        "confidence": entity.confidence,
-                        "mentions": entity.mention_count,
-                        "relations": relation_count,
-                        "description": entity.description,
-                        "properties": entity.properties or {},
+                        "id": row["id"],
+                        "name": row["entity_name"],
+                        "type": row["entity_type"],
+                        "confidence": row["confidence"],
+                        # 每个提及该实体的文档在属性中记录一项
+                        "mentions": sum(
+                            1 for key in properties if key.startswith("document_")
+                        ),
+                        "relations": row["relation_count"],
+                        "description": row["description"],
+                        "properties": properties,
+                        "score": row["score"],
                     }
                 )
 
-            return sorted(results, key=lambda x: x["confidence"], reverse=True)
+            return results
 
         except Exception as e:
             logger.error(f"Failed to search entities: {str(e)}")
@@ -661,24 +793,26 @@ class KnowledgeGraphService:
             if not entity:
                 raise ValueError(f"Entity {entity_id} not found")
 
-            # 获取相关文档和时间信息
-            timeline_events = []
-
             # 从属性中提取文档信息
             properties = entity.properties or {}
-            for key, value in properties.items():
-                if key.startswith("document_"):
-                    document_id = int(key.split("_")[1])
-                    document = crud.document.get(db=db, id=document_id)
-                    if document:
-                        timeline_events.append(
-                            {
-                                "date": document.created_at.isoformat(),
-                                "event": (f"在文档 '{document.title}' 中被提及"),
-                                "document_id": document_id,
-                                "confidence": value.get("confidence", 0.8),
-                            }
-                        )
+            mentions = {
+                int(key.split("_")[1]): value
+                for key, value in properties.items()
+                if key.startswith("document_")
+            }
+
+            # 一次IN查询获取全部相关文档
+            documents = crud.document.get_by_ids(db=db, ids=list(mentions))
+
+            timeline_events = [
+                {
+                    "date": document.created_at.isoformat(),
+                    "event": (f"在文档 '{document.title}' 中被提及"),
+                    "document_id": document.id,
+                    "confidence": mentions[document.id].get("confidence", 0.8),
+                }
+                for document in documents
+            ]
 
             # 按时间排序
             timeline_events.sort(key=lambda x: x["date"])
@@ -702,17 +836,8 @@ class KnowledgeGraphService:
             if format_type == "json":
                 return graph_data
             elif format_type == "gexf":
-                # 导出为GEXF格式(Gephi可读)
-                import os
-                import tempfile
-
-                with tempfile.NamedTemporaryFile(
-                    mode="w", suffix=".gexf", delete=False
-                ) as f:
-                    nx.write_gexf(self.graph, f.name)
-                    with open(f.name, "r", encoding="utf-8") as gexf_file:
-                        gexf_content = gexf_file.read()
-                    os.unlink(f.name)
+                # 导出为GEXF格式(Gephi可读), 直接在内存中生成, 无需临时文件
+                gexf_content = "\n".join(nx.generate_gexf(self.graph))
 
                 return {
                     "format": "gexf",
@@ -725,3 +850,18 @@ class KnowledgeGraphService:
         except Exception as e:
             logger.error(f"Failed to export graph data: {str(e)}")
             raise
+
+    def stream_graph_export(
+        self, db: Session, format_type: str = "jsonl", compress: bool = False
+    ) -> Iterator[bytes]:
+        """
+        流式导出完整图谱
+
+        通过服务端游标增量读取节点和关系, 适合导出大规模图谱
+
+        Args:
+            db: 数据库会话
+            format_type: 导出格式 jsonl/graphml/gexf
+            compress: 是否gzip压缩
+        """
+        return iter_graph_export(db, format_type=format_type, compress=compress)
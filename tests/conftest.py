@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试公共夹具
+"""
+
+import pytest
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """记录执行的SQL和参数, 返回预设行"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    def execute(self, statement, params):
+        self.statements.append((str(statement), params))
+        return FakeResult(self.rows)
+
+
+@pytest.fixture
+def fake_session():
+    """按预设行构造只记录SQL的会话"""
+    return FakeSession
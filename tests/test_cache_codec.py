@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存编解码测试
+"""
+
+import gzip
+import json
+import pickle
+from datetime import datetime
+
+import pytest
+
+from app.config.cache_strategy import CacheLevel, CachePriority, CacheStrategy
+from app.services.cache_codec import MISSING, CacheCodec
+from app.services.cache_service import CacheService
+
+
+@pytest.fixture
+def codec():
+    return CacheCodec()
+
+
+class TestCacheCodec:
+    """测试编解码注册表"""
+
+    @pytest.mark.parametrize("serialization", ["pickle", "json", "orjson", "msgpack"])
+    def test_round_trip(self, codec, serialization):
+        value = {"name": "采购项目", "items": [1, 2, 3], "nested": {"ok": True}}
+        assert codec.decode(codec.encode(value, serialization)) == value
+
+    def test_float32_vector(self, codec):
+        vector = [0.5, -1.25, 3.0]
+        data = codec.encode(vector, "float32")
+
+        assert len(data) == 1 + 4 * len(vector)
+        assert codec.decode(data) == vector
+
+    def test_unsupported_value_falls_back_to_pickle(self, codec):
+        value = {"created_at": datetime(2024, 1, 1)}
+        assert codec.decode(codec.encode(value, "json")) == value
+        assert codec.decode(codec.encode("not a vector", "float32")) == "not a vector"
+
+    @pytest.mark.parametrize("serialization", ["json", "orjson", "msgpack"])
+    def test_types_that_change_fall_back_to_pickle(self, codec, serialization):
+        value = {1: (1, 2), "items": [("a", 1)]}
+        data = codec.encode(value, serialization)
+
+        assert data[0] == codec.encode(value, "pickle")[0]
+        assert codec.decode(data) == value
+
+    @pytest.mark.parametrize("vector", [[1, 2, 3], (0.5, 1.5)])
+    def test_float32_only_for_float_lists(self, codec, vector):
+        decoded = codec.decode(codec.encode(vector, "float32"))
+
+        assert decoded == vector
+        assert type(decoded) is type(vector)
+        assert [type(v) for v in decoded] == [type(v) for v in vector]
+
+    def test_compression_threshold(self, codec):
+        codec.compression_min_bytes = 1024
+
+        small = codec.encode("x" * 10, "json", compression=True)
+        large = codec.encode("x" * 10_000, "json", compression=True)
+
+        assert small[0] & 0x07 == 0
+        assert large[0] & 0x07 != 0
+        assert len(large) < 10_000
+        assert codec.decode(large) == "x" * 10_000
+
+    def test_legacy_values_without_header(self, codec):
+        assert codec.decode(pickle.dumps({"a": 1})) == {"a": 1}
+        assert codec.decode(json.dumps([1, 2]).encode(), "json") == [1, 2]
+        legacy = gzip.compress(pickle.dumps("old"))
+        assert codec.decode(legacy, "pickle", legacy_compression=True) == "old"
+
+    def test_negative_entry_round_trip(self, codec):
+        data = codec.encode(MISSING, "json", compression=True)
+
+        assert len(data) == 1
+        assert codec.decode(data) is MISSING
+        assert pickle.loads(pickle.dumps(MISSING)) is MISSING
+
+
+class TestCacheServiceSerialization:
+    """测试缓存服务的序列化选择"""
+
+    def test_default_strategy_keeps_pickle(self):
+        service = CacheService()
+        strategy = CacheStrategy(
+            name="query",
+            level=CacheLevel.L2_REDIS,
+            priority=CachePriority.MEDIUM,
+            ttl=60,
+        )
+        value = {"items": [1, 2]}
+
+        data = service._serialize(value, strategy)
+
+        assert (data[0] >> 3) & 0x07 == 1  # pickle
+        assert service._deserialize(data, strategy) == value
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存服务负缓存测试
+
+使用内存中的FakeRedis, 不依赖Redis服务
+"""
+
+import pytest
+
+import app.services.cache_manager as cache_manager_module
+from app.services.cache_manager import CacheManager
+from app.services.cache_service import CacheService
+from app.services.multi_level_cache import CacheHitType
+
+
+class FakeRedis:
+    """只实现缓存服务用到的Redis命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+@pytest.fixture
+def service():
+    service = CacheService()
+    service.redis_client = FakeRedis()
+    return service
+
+
+class TestNegativeCache:
+    """测试负缓存与未命中的区分"""
+
+    @pytest.mark.asyncio
+    async def test_negative_entry_reported_as_hit(self, service):
+        assert await service.get_with_status("user:1") == (None, CacheHitType.MISS)
+
+        assert await service.set_negative("user:1")
+
+        assert await service.get_with_status("user:1") == (
+            None,
+            CacheHitType.NEGATIVE_HIT,
+        )
+        # get保持原有返回值
+        assert await service.get("user:1") is None
+        assert service.cache_stats["negative_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_set_negative_prevents_second_db_lookup(self, service, monkeypatch):
+        monkeypatch.setattr(cache_manager_module, "cache_service", service)
+        manager = CacheManager()
+        db_lookups = []
+
+        async def load_user(user_id):
+            result = await manager.get_cache(f"user:{user_id}")
+            if result.metadata["hit"]:
+                return result.metadata["value"]
+            db_lookups.append(user_id)
+            await service.set_negative(f"user:{user_id}")
+            return None
+
+        assert await load_user(42) is None
+        assert await load_user(42) is None
+
+        assert db_lookups == [42]
+        result = await manager.get_cache("user:42")
+        assert result.metadata == {"value": None, "hit": True, "negative": True}
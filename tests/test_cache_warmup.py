@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预测性缓存预热测试
+
+仅使用L1内存缓存, 不依赖Redis和数据库
+"""
+
+import time
+
+import pytest
+
+import app.services.cache_warmup as cache_warmup
+from app.config.cache_strategy import get_cache_strategy
+from app.services.cache_access_log import CacheAccessLog
+from app.services.cache_warmup import (
+    CacheWarmupService,
+    WarmupBudget,
+    WarmupPriority,
+    WarmupTask,
+)
+from app.services.multi_level_cache import MultiLevelCacheService
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    service = MultiLevelCacheService()
+    service._initialized = True
+
+    async def get_service():
+        return service
+
+    monkeypatch.setattr(cache_warmup, "get_multi_cache_service", get_service)
+    return service
+
+
+def _predictive_task(key_loader=None, batch_size=100):
+    return WarmupTask(
+        name="predicted",
+        priority=WarmupPriority.HIGH,
+        cache_type="db_query",
+        data_loader=None,
+        key_generator=None,
+        max_items=10,
+        batch_size=batch_size,
+        predictive=True,
+        key_loader=key_loader,
+    )
+
+
+class TestCacheAccessLog:
+    """测试访问草图的进程内累积"""
+
+    def test_indexes_are_stable_across_instances(self):
+        assert CacheAccessLog()._indexes("project:1") == CacheAccessLog()._indexes(
+            "project:1"
+        )
+
+    def test_record_aggregates_pending_counts(self):
+        access_log = CacheAccessLog()
+        for _ in range(3):
+            access_log.record("db", "project:1", redis_client=object())
+
+        assert access_log._pending["db"]["project:1"][0] == 3
+        assert access_log._pending_count == 3
+
+    def test_record_skipped_without_redis(self):
+        access_log = CacheAccessLog()
+        access_log.record("db", "project:1")
+
+        assert not access_log._pending
+        assert access_log._pending_count == 0
+
+
+class TestPredictiveWarmup:
+    """测试按预测键预热"""
+
+    @pytest.mark.asyncio
+    async def test_missing_keys_use_key_loader(self, cache, monkeypatch):
+        strategy = get_cache_strategy("db_query")
+        await cache.set("project:1", {"id": 1}, strategy)
+
+        async def top_keys(redis_client, namespace, limit):
+            assert namespace == strategy.key_prefix
+            return ["project:1", "project:2"]
+
+        async def key_loader(keys):
+            return {key: {"loaded": key} for key in keys}
+
+        monkeypatch.setattr(cache.access_log, "top_keys", top_keys)
+        service = CacheWarmupService()
+
+        result = await service._execute_warmup_task(_predictive_task(key_loader))
+
+        assert result.success and result.items_loaded == 2
+        # 预热读取不计入访问草图
+        assert "project:2" not in cache.access_log._pending.get("db", {})
+        assert (await cache.get("project:2", strategy))[0] == {"loaded": "project:2"}
+
+    @pytest.mark.asyncio
+    async def test_stops_when_budget_exhausted(self, cache, monkeypatch):
+        async def top_keys(redis_client, namespace, limit):
+            return [f"project:{i}" for i in range(10)]
+
+        monkeypatch.setattr(cache.access_log, "top_keys", top_keys)
+        service = CacheWarmupService()
+        budget = WarmupBudget(
+            deadline=time.monotonic() - 1, memory_limit=0, memory_baseline=0
+        )
+
+        result = await service._execute_warmup_task(
+            _predictive_task(batch_size=5), budget
+        )
+
+        assert result.budget_exhausted
+        assert result.items_loaded == 0
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+核心缓存监控器测试
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.core.cache_monitor import CacheMonitor, CacheOperation, LatencyHistogram
+
+
+@pytest.fixture
+def monitor():
+    return CacheMonitor()
+
+
+def _record(monitor, cache_type, hit, response_time, error=None):
+    monitor.record_operation(
+        CacheOperation(
+            operation_type="get",
+            cache_type=cache_type,
+            key="k",
+            hit=hit,
+            response_time=response_time,
+            timestamp=datetime.now(),
+            error=error,
+        )
+    )
+
+
+class TestLatencyHistogram:
+    """测试延迟直方图"""
+
+    def test_percentiles_within_precision(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        p50, p99 = histogram.percentiles(0.5, 0.99)
+        assert p50 == pytest.approx(0.5, rel=0.04)
+        assert p99 == pytest.approx(0.99, rel=0.04)
+
+    def test_bucket_bounds_are_monotonic(self):
+        bounds = [
+            LatencyHistogram._upper_bound(i) for i in range(LatencyHistogram.size)
+        ]
+        assert bounds == sorted(bounds)
+        for value in (0, 63, 64, 1000, 123_456, 59_999_999):
+            assert value <= LatencyHistogram._upper_bound(
+                LatencyHistogram._index(value)
+            )
+
+
+class TestCacheMonitor:
+    """测试分片统计与读取时合并"""
+
+    def test_stats_by_type_and_global(self, monitor):
+        _record(monitor, "user_permission", True, 0.002)
+        _record(monitor, "user_permission", False, 0.004, error="timeout")
+        _record(monitor, "role_permission", True, 0.006)
+
+        user_stats = monitor.get_stats("user_permission")
+        assert user_stats["total_requests"] == 2
+        assert user_stats["hit_rate"] == 0.5
+        assert user_stats["avg_response_time"] == pytest.approx(0.003)
+        assert user_stats["errors"] == 1
+
+        global_stats = monitor.get_stats()["global"]
+        assert global_stats["total_requests"] == 3
+        assert global_stats["avg_response_time"] == pytest.approx(0.004)
+        assert global_stats["max_response_time"] == 0.006
+
+    def test_threads_record_into_separate_shards(self, monitor):
+        def worker():
+            for _ in range(1000):
+                _record(monitor, "resource_permission", True, 0.001)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(monitor._shards) == 4
+        assert monitor.get_stats("resource_permission")["hits"] == 4000
+
+    def test_reset_stats(self, monitor):
+        _record(monitor, "user_permission", True, 0.001)
+        monitor.reset_stats()
+        _record(monitor, "user_permission", False, 0.001)
+
+        stats = monitor.get_stats("user_permission")
+        assert stats["hits"] == 0
+        assert stats["misses"] == 1
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CRUD缓存失效测试
+"""
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import Column, Integer, String, create_engine, text
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.crud.base import CRUDBase, cache
+from app.crud.crud_document import CRUDDocument
+
+_Base = declarative_base()
+
+
+class _Item(_Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    uploader_id = Column(Integer)
+
+
+class _Other(_Base):
+    __tablename__ = "others"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class _ItemCreate(BaseModel):
+    id: int
+    name: str
+
+
+@pytest.fixture
+def make_session():
+    cache.clear()
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    session.add_all([_Item(id=1, name="a"), _Item(id=2, name="b"), _Other(id=1)])
+    session.commit()
+    session.close()
+    return factory
+
+
+def _rename_behind_cache(db, table, id, name):
+    """绕过CRUD直接改库，用于判断读取是否命中缓存"""
+    db.execute(
+        text(f"UPDATE {table} SET name = :name WHERE id = :id"),
+        {"name": name, "id": id},
+    )
+    db.commit()
+
+
+class TestCRUDCache:
+    """测试按模型命名空间的缓存与精确失效"""
+
+    def test_get_returns_session_bound_copy(self, make_session):
+        items = CRUDBase(_Item)
+        items.get(make_session(), id=1)
+
+        db = make_session()
+        _rename_behind_cache(db, "items", 1, "changed")
+        obj = items.get(db, id=1)
+
+        assert obj.name == "a"
+        assert obj in db
+        assert isinstance(cache.get(items._get_cache_key(1)), dict)
+
+    def test_write_evicts_only_own_record(self, make_session):
+        items, others = CRUDBase(_Item), CRUDBase(_Other)
+        db = make_session()
+        items.get(db, id=1)
+        items.get(db, id=2)
+        others.get(db, id=1)
+        _rename_behind_cache(db, "items", 2, "b2")
+        _rename_behind_cache(db, "others", 1, "o2")
+
+        items.update(db, db_obj=items.get(db, id=1), obj_in={"name": "a2"})
+
+        db = make_session()
+        assert items.get(db, id=1).name == "a2"
+        assert items.get(db, id=2).name == "b"
+        assert others.get(db, id=1).name is None
+
+    def test_write_bumps_namespace_version(self, make_session):
+        items, others = CRUDBase(_Item), CRUDBase(_Other)
+        db = make_session()
+        items_key = items._generate_cache_key("get_multi", skip=0, limit=100)
+        others_key = others._generate_cache_key("get_multi", skip=0, limit=100)
+
+        items.remove(db, id=2)
+
+        assert items._generate_cache_key("get_multi", skip=0, limit=100) != items_key
+        assert others._generate_cache_key("get_multi", skip=0, limit=100) == others_key
+        assert [obj.id for obj in items.get_multi(make_session())] == [1]
+
+    def test_direct_commit_evicts_written_record(self, make_session):
+        items = CRUDBase(_Item)
+        db = make_session()
+        obj = items.get(db, id=1)
+        items.get(db, id=2)
+        multi_key = items._generate_cache_key("get_multi", skip=0, limit=100)
+
+        # 自定义写方法：不经CRUDBase.update直接修改并提交
+        obj.name = "a2"
+        db.commit()
+
+        db = make_session()
+        assert items.get(db, id=1).name == "a2"
+        assert cache.get(items._get_cache_key(2)) is not None
+        assert items._generate_cache_key("get_multi", skip=0, limit=100) != multi_key
+
+    def test_rolled_back_write_keeps_cache(self, make_session):
+        items = CRUDBase(_Item)
+        db = make_session()
+        obj = items.get(db, id=1)
+
+        obj.name = "a2"
+        db.flush()
+        db.rollback()
+
+        assert cache.get(items._get_cache_key(1)) is not None
+        assert items.get(make_session(), id=1).name == "a"
+
+    def test_create_clears_negative_entry(self, make_session):
+        items = CRUDBase(_Item)
+        db = make_session()
+        assert items.get(db, id=3) is None
+
+        items.create(db, obj_in=_ItemCreate(id=3, name="c"))
+
+        assert items.get(make_session(), id=3).name == "c"
+
+    def test_subclass_create_clears_negative_entry(self, make_session):
+        documents = CRUDDocument(_Item)
+        db = make_session()
+        assert documents.get(db, id=3) is None
+
+        documents.create_with_uploader(
+            db, obj_in=_ItemCreate(id=3, name="c"), owner_id=1
+        )
+
+        assert documents.get(make_session(), id=3).name == "c"
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识图谱流式导出测试
+
+使用SQLite内存库模拟节点和关系表, 导出结果再由networkx读回校验
+"""
+
+import gzip
+import io
+import json
+
+import networkx as nx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.utils.graph_export import iter_graph_export
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE knowledge_graph_nodes (id INTEGER PRIMARY KEY, "
+                "entity_id TEXT, entity_name TEXT, entity_type TEXT, confidence REAL)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE knowledge_graph_relations (id INTEGER PRIMARY KEY, "
+                "source_entity_id TEXT, target_entity_id TEXT, relation_type TEXT, "
+                "confidence REAL)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO knowledge_graph_nodes VALUES "
+                "(1, 'a', '供应商A & <B>', 'ORGANIZATION', 0.9), "
+                "(2, 'b', '张三', 'PERSON', NULL), "
+                "(3, 'c', '地址X', 'LOCATION', 0.0)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO knowledge_graph_relations VALUES "
+                "(1, 'b', 'a', 'WORKS_FOR', 0.7), "
+                "(2, 'a', 'c', 'LOCATED_IN', NULL), "
+                "(3, 'b', 'c', 'LIVES_IN', 0.0)"
+            )
+        )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _export(db, format_type, compress=False):
+    data = b"".join(
+        iter_graph_export(
+            db, format_type, compress=compress, batch_size=2, chunk_size=16
+        )
+    )
+    return gzip.decompress(data) if compress else data
+
+
+class TestGraphExport:
+    """测试各导出格式可被读回且空值保持为空"""
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_jsonl_round_trip(self, db, compress):
+        lines = _export(db, "jsonl", compress).decode("utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+
+        nodes = {r["id"]: r for r in records if r["kind"] == "node"}
+        edges = {r["id"]: r for r in records if r["kind"] == "edge"}
+        assert nodes["a"]["name"] == "供应商A & <B>"
+        assert nodes["b"]["confidence"] is None
+        assert nodes["c"]["confidence"] == 0.0
+        assert edges[1] == {
+            "kind": "edge",
+            "id": 1,
+            "source": "b",
+            "target": "a",
+            "type": "WORKS_FOR",
+            "confidence": 0.7,
+        }
+        assert edges[2]["confidence"] is None
+
+    def test_graphml_round_trip(self, db):
+        graph = nx.read_graphml(io.BytesIO(_export(db, "graphml")))
+
+        assert graph.nodes["a"] == {
+            "name": "供应商A & <B>",
+            "type": "ORGANIZATION",
+            "confidence": 0.9,
+        }
+        assert "confidence" not in graph.nodes["b"]
+        assert graph.nodes["c"]["confidence"] == 0.0
+        assert graph.edges["b", "a"] == {
+            "id": "e1",
+            "type": "WORKS_FOR",
+            "confidence": 0.7,
+        }
+        assert "confidence" not in graph.edges["a", "c"]
+        assert graph.edges["b", "c"]["confidence"] == 0.0
+
+    def test_gexf_round_trip(self, db):
+        graph = nx.read_gexf(io.BytesIO(_export(db, "gexf")))
+
+        assert graph.nodes["a"]["label"] == "供应商A & <B>"
+        assert graph.nodes["a"]["type"] == "ORGANIZATION"
+        assert graph.nodes["a"]["confidence"] == 0.9
+        # 空置信度省略, 0保持为0
+        assert "confidence" not in graph.nodes["b"]
+        assert graph.nodes["c"]["confidence"] == 0.0
+        assert graph.edges["b", "a"]["weight"] == 0.7
+        assert graph.edges["b", "a"]["type"] == "WORKS_FOR"
+        assert "weight" not in graph.edges["a", "c"]
+        assert graph.edges["b", "c"]["weight"] == 0.0
+
+    def test_unsupported_format(self, db):
+        with pytest.raises(ValueError):
+            _export(db, "csv")
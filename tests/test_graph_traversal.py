@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识图谱遍历引擎测试
+"""
+
+import networkx as nx
+import pytest
+
+from app.crud.crud_knowledge_graph import knowledge_graph_relation
+from app.utils.graph_traversal import GraphTraversalEngine
+
+
+@pytest.fixture
+def graph():
+    """供应商 -> 联系人/地址 -> 其他供应商 的小型图谱"""
+    g = nx.DiGraph()
+    for node_id, name in enumerate(["供应商A", "张三", "地址X", "供应商B", "采购中心"]):
+        g.add_node(node_id, name=name, type="ORGANIZATION")
+    g.add_edge(0, 1, type="WORKS_FOR", confidence=0.9)
+    g.add_edge(0, 2, type="LOCATED_IN", confidence=0.8)
+    g.add_edge(1, 3, type="WORKS_FOR", confidence=0.7)
+    g.add_edge(2, 3, type="LOCATED_IN", confidence=0.6)
+    g.add_edge(3, 4, type="RELATED_TO", confidence=0.5)
+    return g
+
+
+class TestGraphTraversalEngine:
+    """测试单次BFS遍历"""
+
+    def test_each_node_discovered_once_with_shortest_path(self, graph):
+        result = GraphTraversalEngine(graph).neighborhood(0, max_depth=3)
+
+        node_ids = [hit.node_id for hit in result.hits]
+        assert node_ids == [1, 2, 3, 4]
+        assert [hit.depth for hit in result.hits] == [1, 1, 2, 3]
+        assert result.hits[2].path == [0, 1, 3]
+        assert result.hits[3].path == [0, 1, 3, 4]
+
+    def test_depth_limit(self, graph):
+        result = GraphTraversalEngine(graph).neighborhood(0, max_depth=1)
+        assert [hit.node_id for hit in result.hits] == [1, 2]
+        assert result.shortest_paths() == []
+
+    def test_relation_type_filter(self, graph):
+        result = GraphTraversalEngine(graph).neighborhood(
+            0, max_depth=3, relation_types=["LOCATED_IN"]
+        )
+        assert [hit.node_id for hit in result.hits] == [2, 3]
+        assert result.hits[1].path == [0, 2, 3]
+
+    def test_fanout_cap_keeps_most_confident_edges(self, graph):
+        result = GraphTraversalEngine(graph).neighborhood(0, max_depth=1, max_fanout=1)
+        assert [hit.node_id for hit in result.hits] == [1]
+        assert result.truncated_nodes == [0]
+
+    def test_streaming_matches_batch(self, graph):
+        engine = GraphTraversalEngine(graph)
+        streamed = [hit.node_id for hit in engine.iter_neighborhood(0, max_depth=3)]
+        assert streamed == [hit.node_id for hit in engine.neighborhood(0, 3).hits]
+
+    def test_unknown_source(self, graph):
+        assert GraphTraversalEngine(graph).neighborhood(99).hits == []
+
+
+class TestTraversalSql:
+    """测试递归CTE遍历的SQL构造和结果映射"""
+
+    def test_traverse_filters_and_maps_rows(self, fake_session):
+        db = fake_session(
+            [
+                {
+                    "id": 4,
+                    "entity_id": "supplier-b",
+                    "entity_name": "供应商B",
+                    "entity_type": "ORGANIZATION",
+                    "depth": 2,
+                    "path": ["supplier-a", "zhang", "supplier-b"],
+                    "path_ids": [1, 2, 4],
+                    "relation_type": "WORKS_FOR",
+                    "confidence": 0.7,
+                }
+            ]
+        )
+
+        rows = knowledge_graph_relation.traverse_connections(
+            db,
+            start_entity_id="supplier-a",
+            max_depth=2,
+            relation_types=["WORKS_FOR"],
+            node_types=["person"],
+            bidirectional=True,
+        )
+
+        sql, params = db.statements[0]
+        assert "WITH RECURSIVE" in sql
+        assert "NOT e.to_id = ANY(t.path)" in sql
+        assert sql.count("relation_type = ANY(:relation_types)") == 2
+        assert params["node_types"] == ["PERSON"]
+        assert rows == [
+            {
+                "id": 4,
+                "entity_id": "supplier-b",
+                "name": "供应商B",
+                "type": "ORGANIZATION",
+                "depth": 2,
+                "path": [1, 2, 4],
+                "relation_type": "WORKS_FOR",
+                "confidence": 0.7,
+            }
+        ]
+
+    def test_connected_bidders_only_pass_through_shared_entities(self, fake_session):
+        db = fake_session(
+            [
+                {
+                    "id": 4,
+                    "entity_id": "supplier-b",
+                    "entity_name": "供应商B",
+                    "entity_type": "ORGANIZATION",
+                    "depth": 3,
+                    "path": ["supplier-a", "zhang", "addr-x", "supplier-b"],
+                    "path_ids": [1, 2, 3, 4],
+                }
+            ]
+        )
+
+        bidders = knowledge_graph_relation.find_connected_bidders(
+            db,
+            supplier_entity_id="supplier-a",
+            max_hops=2,
+            exclude_names=["采购中心", None],
+        )
+
+        sql, params = db.statements[0]
+        # 中间节点限定为共享实体类型, 结果限定为供应商类型并排除起点和代理机构
+        assert sql.count("upper(sn.entity_type) = ANY(:shared_types)") == 2
+        assert "upper(bn.entity_type) = ANY(:supplier_types)" in sql
+        assert "e.to_id <> :start_id" in sql
+        assert "NOT lower(bn.entity_name) = ANY(:exclude_names)" in sql
+        assert params["shared_types"] == ["PERSON", "LOCATION"]
+        assert params["supplier_types"] == ["ORGANIZATION"]
+        assert params["exclude_names"] == ["采购中心"]
+        assert params["max_hops"] == 2
+        assert bidders[0]["path"] == [1, 2, 3, 4]
+        assert bidders[0]["shared_entities"] == [2, 3]
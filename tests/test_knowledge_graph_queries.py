@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识图谱实体搜索与文档批量查询测试
+"""
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, event
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.crud.crud_document import CRUDDocument
+from app.crud.crud_knowledge_graph import knowledge_graph
+from app.utils.knowledge_graph import KnowledgeGraphService
+
+_Base = declarative_base()
+
+
+class _Doc(_Base):
+    __tablename__ = "documents"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(100))
+
+
+def _row(id, name, score, relation_count, properties=None, total=3):
+    return {
+        "id": id,
+        "entity_id": f"e{id}",
+        "entity_name": name,
+        "entity_type": "ORGANIZATION",
+        "confidence": 0.9,
+        "description": None,
+        "properties": properties,
+        "score": score,
+        "total": total,
+        "relation_count": relation_count,
+    }
+
+
+class TestSearchWithRelationCounts:
+    """测试实体搜索的结果映射"""
+
+    def test_page_maps_rows_and_total(self, fake_session):
+        db = fake_session([_row(1, "供应商A", 0.8, 5), _row(2, "供应商AB", 0.5, 0)])
+
+        page = knowledge_graph.search_with_relation_counts(
+            db, query="供应商A", entity_types=["organization"], skip=0, limit=2
+        )
+
+        assert len(db.statements) == 1
+        _, params = db.statements[0]
+        assert params["entity_types"] == ["ORGANIZATION"]
+        assert (params["skip"], params["limit"]) == (0, 2)
+        # 每行原样映射, 总数取自窗口计数而非当前页长度
+        assert page["items"] == [
+            _row(1, "供应商A", 0.8, 5),
+            _row(2, "供应商AB", 0.5, 0),
+        ]
+        assert page["total"] == 3
+
+    def test_wildcards_escaped_and_empty_page(self, fake_session):
+        db = fake_session()
+
+        page = knowledge_graph.search_with_relation_counts(db, query="50%_off")
+
+        _, params = db.statements[0]
+        assert params["pattern"] == "%50\\%\\_off%"
+        assert "entity_types" not in params
+        assert page == {"items": [], "total": 0}
+
+
+class TestSearchEntities:
+    """测试服务层实体搜索结果"""
+
+    @pytest.mark.asyncio
+    async def test_relations_and_mentions_from_rows(self, fake_session):
+        properties = {"document_3": "摘录", "document_7": "摘录", "industry": "IT"}
+        db = fake_session(
+            [
+                _row(1, "供应商A", 0.8, 5, properties=properties),
+                _row(2, "供应商AB", 0.5, 0),
+            ]
+        )
+
+        results = await KnowledgeGraphService().search_entities(db, "供应商A")
+
+        assert results == [
+            {
+                "id": 1,
+                "name": "供应商A",
+                "type": "ORGANIZATION",
+                "confidence": 0.9,
+                "mentions": 2,
+                "relations": 5,
+                "description": None,
+                "properties": properties,
+                "score": 0.8,
+            },
+            {
+                "id": 2,
+                "name": "供应商AB",
+                "type": "ORGANIZATION",
+                "confidence": 0.9,
+                "mentions": 0,
+                "relations": 0,
+                "description": None,
+                "properties": {},
+                "score": 0.5,
+            },
+        ]
+
+
+class TestDocumentGetByIds:
+    """测试按ID列表批量获取文档"""
+
+    @pytest.fixture
+    def db(self):
+        engine = create_engine("sqlite://")
+        _Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add_all([_Doc(id=i, title=f"doc{i}") for i in range(1, 6)])
+        session.commit()
+        yield session
+        session.close()
+
+    def test_single_in_query(self, db):
+        statements = []
+        engine = db.get_bind()
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            docs = CRUDDocument(_Doc).get_by_ids(db, ids=[4, 2, 99, 2])
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(statements) == 1
+        assert sorted(doc.id for doc in docs) == [2, 4]
+
+    def test_empty_ids_skip_query(self, fake_session):
+        assert CRUDDocument(_Doc).get_by_ids(fake_session(), ids=[]) == []
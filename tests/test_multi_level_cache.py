@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多级缓存服务测试
+
+仅使用L1内存缓存, 不依赖Redis
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.config.cache_strategy import EvictionPolicy, get_cache_strategy
+from app.services.multi_level_cache import (
+    CacheHitType,
+    L1MemoryCache,
+    MultiLevelCacheService,
+)
+
+
+@pytest.fixture
+def cache():
+    """未连接Redis的多级缓存服务"""
+    service = MultiLevelCacheService()
+    service._initialized = True
+    return service
+
+
+class FakePipeline:
+    """记录命令并在execute时依次执行"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        return [
+            await getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class FakeRedis:
+    """只实现多级缓存用到的Redis命令"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    async def pttl(self, key):
+        return self.ttls[key] * 1000 if key in self.ttls else -2
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def sadd(self, key, *members):
+        pass
+
+    async def expire(self, key, ttl):
+        pass
+
+
+@pytest.fixture
+def redis_cache():
+    """使用FakeRedis作为L2的多级缓存服务"""
+    service = MultiLevelCacheService()
+    service.redis_client = FakeRedis()
+    service._initialized = True
+    return service
+
+
+@pytest.fixture
+def strategy():
+    return get_cache_strategy("default")
+
+
+class TestL1MemoryCache:
+    """测试L1容量限制与W-TinyLFU准入"""
+
+    def test_scan_does_not_flush_hot_entries(self):
+        l1 = L1MemoryCache(max_size=100)
+        for i in range(100):
+            l1.set(f"hot_{i}", i)
+        for _ in range(3):
+            for i in range(100):
+                l1.get(f"hot_{i}")
+
+        # 一次性扫描的键频率低，无法挤掉热点
+        for i in range(1000):
+            l1.set(f"scan_{i}", i)
+
+        kept = sum(l1.get(f"hot_{i}")[0] is not None for i in range(100))
+        assert kept >= 90
+        assert l1.get_stats()["admission_rejections"] > 0
+
+    def test_byte_budget(self):
+        l1 = L1MemoryCache(max_size=1000, max_memory_bytes=10_000)
+
+        assert not l1.set("too_big", b"x" * 20_000)
+        for i in range(50):
+            l1.set(f"key_{i}", b"x" * 500)
+
+        stats = l1.get_stats()
+        assert 0 < stats["memory_usage_bytes"] <= 10_000
+        assert stats["size"] < 50
+
+    def test_fifo_segment_ignores_access_order(self):
+        l1 = L1MemoryCache(max_size=4, window_ratio=0.25)
+        for i in range(4):
+            l1.set(f"f{i}", i, eviction_policy=EvictionPolicy.FIFO)
+        # 访问最早写入的键不会改变FIFO顺序
+        l1.get("f0")
+        l1.get("f1")
+        for _ in range(5):
+            l1.get("new")
+
+        l1.set("new", "v", eviction_policy=EvictionPolicy.FIFO)
+        l1.set("newer", "v", eviction_policy=EvictionPolicy.FIFO)
+
+        assert l1.get("new")[0] == "v"
+        assert l1.get("f0")[0] is None
+
+
+class TestGetOrCompute:
+    """测试缓存击穿保护"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, cache, strategy):
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"value": 1}
+
+        results = await asyncio.gather(
+            *[cache.get_or_compute("k", loader, strategy) for _ in range(10)]
+        )
+
+        assert calls == 1
+        assert all(result == {"value": 1} for result in results)
+        assert cache._stats.coalesced == 9
+
+        # 后续请求直接命中缓存
+        assert await cache.get_or_compute("k", loader, strategy) == {"value": 1}
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_loader_error_propagates_to_waiters(self, cache, strategy):
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *[cache.get_or_compute("err", loader, strategy) for _ in range(3)],
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert not cache._inflight
+
+    @pytest.mark.asyncio
+    async def test_sync_loader_and_none_not_cached(self, cache, strategy):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return None
+
+        for _ in range(2):
+            assert (
+                await cache.get_or_compute(
+                    "none", loader, strategy, cache_negative=False
+                )
+                is None
+            )
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_none_is_negatively_cached(self, cache, strategy):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return None
+
+        assert await cache.get_or_compute("absent", loader, strategy) is None
+        assert await cache.get_or_compute("absent", loader, strategy) is None
+        assert len(calls) == 1
+
+        value, hit_type = await cache.get("absent", strategy)
+        assert value is None
+        assert hit_type == CacheHitType.NEGATIVE_HIT
+        assert cache._stats.negative_hits == 2
+        # 负缓存使用较短的TTL
+        assert cache.l1_cache.get_item("app:absent").ttl < strategy.ttl
+
+        # 数据创建后清除负缓存
+        await cache.delete("absent", strategy)
+        assert await cache.get_or_compute("absent", lambda: "created", strategy) == (
+            "created"
+        )
+
+    @pytest.mark.asyncio
+    async def test_unserializable_result_is_returned(self, redis_cache, strategy):
+        class Local:
+            pass
+
+        value = Local()
+        result = await redis_cache.get_or_compute("local", lambda: value, strategy)
+
+        assert result is value
+        assert "app:local" not in redis_cache.redis_client.data
+
+    @pytest.mark.asyncio
+    async def test_negative_backfill_keeps_negative_ttl(self, redis_cache, strategy):
+        await redis_cache.set_negative("gone", strategy)
+        await redis_cache.set_negative("gone2", strategy)
+        negative_ttl = redis_cache._negative_ttl(strategy)
+
+        redis_cache.l1_cache.clear()
+        assert (await redis_cache.get("gone", strategy))[1] == (
+            CacheHitType.NEGATIVE_HIT
+        )
+        assert redis_cache.l1_cache.get_item("app:gone").ttl == negative_ttl
+
+        redis_cache.l1_cache.clear()
+        assert await redis_cache.batch_get(["gone", "gone2"], strategy) == {
+            "gone": None,
+            "gone2": None,
+        }
+        assert redis_cache.l1_cache.get_item("app:gone2").ttl == negative_ttl
+
+    def test_early_refresh_probability(self):
+        should_refresh = MultiLevelCacheService._should_refresh_early
+        now = time.time()
+
+        # 距离过期很远时不提前刷新
+        assert not any(should_refresh(now + 3600, 0.01, 1.0) for _ in range(100))
+        # 已过期或计算耗时远大于剩余时间时必然刷新
+        assert should_refresh(now - 1, 0.01, 1.0)
+        # beta为0时关闭
+        assert not should_refresh(now - 1, 0.01, 0.0)
+
+
+class TestTagInvalidation:
+    """测试标签失效"""
+
+    @pytest.mark.asyncio
+    async def test_clear_by_tags_only_removes_tagged_keys(self, cache, strategy):
+        for i in range(4):
+            await cache.set(f"project_{i}", i, strategy, tags=[f"project:{i % 2}"])
+
+        assert await cache.clear_by_tags(["project:0"]) == 2
+
+        values = [(await cache.get(f"project_{i}", strategy))[0] for i in range(4)]
+        assert values == [None, 1, None, 3]
+
+    @pytest.mark.asyncio
+    async def test_tag_index_follows_overwrite_and_delete(self, cache, strategy):
+        await cache.set("doc", "v1", strategy, tags=["document:1"])
+        await cache.set("doc", "v2", strategy, tags=["document:2"])
+        assert await cache.clear_by_tags(["document:1"]) == 0
+        assert (await cache.get("doc", strategy))[0] == "v2"
+
+        await cache.delete("doc", strategy)
+        assert "document:2" not in cache.l1_cache._tag_index
+
+    @pytest.mark.asyncio
+    async def test_generation_key_changes_after_bump(self, cache):
+        before = await cache.generation_key("stats", ["project:1"])
+        await cache.bump_tag_generations(["project:1"])
+        assert await cache.generation_key("stats", ["project:1"]) != before
+
+
+class TestInvalidationBus:
+    """测试跨worker失效（无Redis时本地生效）"""
+
+    @pytest.mark.asyncio
+    async def test_result_read_before_delete_is_discarded(self, cache, strategy):
+        async def loader():
+            await asyncio.sleep(0.05)
+            return "stale"
+
+        task = asyncio.create_task(cache.get_or_compute("k", loader, strategy))
+        await asyncio.sleep(0.01)
+        await cache.delete("k", strategy)
+
+        assert await task == "stale"
+        assert (await cache.get("k", strategy))[0] is None
+
+    @pytest.mark.asyncio
+    async def test_remote_message_evicts_l1(self, cache, strategy):
+        await cache.set("k", 1, strategy, tags=["project:1"])
+        await cache.set("other", 2, strategy)
+
+        cache._apply_invalidation_message(
+            b'7|{"origin": "worker-2", "keys": [], "tags": ["project:1"]}'
+        )
+
+        assert (await cache.get("k", strategy))[0] is None
+        assert (await cache.get("other", strategy))[0] == 2
+        assert cache._invalidation_version == 7
+
+    @pytest.mark.asyncio
+    async def test_l2_read_racing_invalidation_not_backfilled(
+        self, redis_cache, strategy
+    ):
+        await redis_cache.set("k", "old", strategy)
+        redis_cache.l1_cache.clear()
+        redis = redis_cache.redis_client
+        read = redis.get
+
+        async def get_then_invalidated(key):
+            data = await read(key)
+            # 读取返回后、回填前收到其他worker的失效消息
+            redis_cache._apply_invalidation_message(
+                b'9|{"origin": "worker-2", "keys": ["app:k"], "tags": []}'
+            )
+            return data
+
+        redis.get = get_then_invalidated
+        assert (await redis_cache.get("k", strategy))[0] == "old"
+        assert redis_cache.l1_cache.get_item("app:k") is None
+
+        redis.get = read
+        assert (await redis_cache.get("k", strategy))[0] == "old"
+        assert redis_cache.l1_cache.get_item("app:k") is not None
+
+    @pytest.mark.asyncio
+    async def test_get_or_compute_racing_invalidation_not_backfilled(
+        self, redis_cache, strategy
+    ):
+        await redis_cache.set("k", "old", strategy)
+        redis_cache.l1_cache.clear()
+        redis = redis_cache.redis_client
+        read = redis.get
+
+        async def get_then_invalidated(key):
+            data = await read(key)
+            redis_cache._apply_invalidation_message(
+                b'9|{"origin": "worker-2", "keys": ["app:k"], "tags": []}'
+            )
+            return data
+
+        redis.get = get_then_invalidated
+        result = await redis_cache.get_or_compute("k", lambda: "new", strategy)
+
+        assert result == "old"
+        assert redis_cache.l1_cache.get_item("app:k") is None
+
+        # 未发生失效时回填L1并沿用L2剩余TTL
+        redis.get = read
+        await redis_cache.get_or_compute("k", lambda: "new", strategy)
+        item = redis_cache.l1_cache.get_item("app:k")
+        assert item.value == "old"
+        assert item.ttl == redis.ttls["app:k"]
+
+
+class TestBatchOperations:
+    """测试批量操作"""
+
+    @pytest.mark.asyncio
+    async def test_batch_set_and_get(self, cache, strategy):
+        assert await cache.batch_set({"a": 1, "b": 2}, strategy, ttl={"a": 60})
+
+        assert await cache.batch_get(["a", "b", "missing"], strategy) == {
+            "a": 1,
+            "b": 2,
+            "missing": None,
+        }
+        assert cache.l1_cache.get_item("app:a").ttl == 60
+
+    @pytest.mark.asyncio
+    async def test_batch_set_registers_tags(self, cache, strategy):
+        await cache.batch_set({"a": 1, "b": 2}, strategy, tags=["project:1"])
+        assert await cache.clear_by_tags(["project:1"]) == 2
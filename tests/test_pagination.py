@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+键集分页测试
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.crud.pagination import (
+    InvalidCursorError,
+    capped_count,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+
+_Base = declarative_base()
+
+
+class _Row(_Base):
+    __tablename__ = "rows"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2026, 10, 1)
+    # 每两行共享一个时间戳，验证相同排序键下按id续页
+    session.add_all(
+        _Row(id=i, created_at=start + timedelta(minutes=i // 2)) for i in range(1, 8)
+    )
+    session.commit()
+    return session
+
+
+class TestCursor:
+    """测试游标编码"""
+
+    def test_round_trip(self):
+        values = [datetime(2026, 10, 1, 9, 30), 42]
+        cursor = encode_cursor("created_at", True, values)
+        assert decode_cursor(cursor, "created_at", True) == values
+
+    def test_rejects_mismatched_order(self):
+        cursor = encode_cursor("created_at", True, [datetime(2026, 10, 1), 1])
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, "created_at", False)
+
+    def test_rejects_garbage(self):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor", "created_at", True)
+
+
+class TestPaginate:
+    """测试按 (created_at, id) 翻页"""
+
+    @pytest.mark.parametrize("order_desc", [True, False])
+    def test_pages_cover_all_rows_once(self, db, order_desc):
+        seen, cursor = [], None
+        while True:
+            page = paginate(
+                db, db.query(_Row), _Row, order_desc=order_desc, cursor=cursor, limit=3
+            )
+            seen.extend(row.id for row in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        expected = sorted(range(1, 8), reverse=order_desc)
+        assert seen == expected
+
+    def test_capped_total(self, db):
+        query = db.query(_Row).filter(_Row.id > 1)
+        assert capped_count(db, query, _Row, cap=3) == (3, False)
+        assert capped_count(db, query, _Row, cap=10) == (6, True)
+
+        page = paginate(db, query, _Row, limit=2, with_total=True)
+        assert page.total == 6 and page.total_is_exact
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+月分区维护测试
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import Settings
+from app.db import partitioning
+from app.db.partitioning import (
+    add_months,
+    drop_partitions_before,
+    ensure_partitions,
+    is_partitioned,
+    month_start,
+    partition_name,
+)
+
+
+class TestMonthArithmetic:
+    """测试月份计算与分区命名"""
+
+    def test_add_months_crosses_year(self):
+        assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name(self):
+        month = month_start(datetime(2026, 3, 18, 9, 30))
+        assert partition_name("audit_logs", month) == "audit_logs_p202603"
+
+
+class TestNonPostgres:
+    """非PostgreSQL数据库上分区维护为空操作"""
+
+    def test_noop_on_sqlite(self):
+        db = sessionmaker(bind=create_engine("sqlite://"))()
+
+        assert not is_partitioned(db, "audit_logs")
+        assert ensure_partitions(db, "audit_logs") == []
+        assert drop_partitions_before(db, "audit_logs", datetime.utcnow()) == {}
+
+
+class TestEnsurePartitions:
+    """测试分区创建失败按月隔离"""
+
+    def test_failed_month_does_not_abort_run(self, monkeypatch):
+        db = sessionmaker(bind=create_engine("sqlite://"))()
+        attempted = []
+
+        def create(db, table, name, month):
+            attempted.append(name)
+            if month == date(2026, 4, 1):
+                raise RuntimeError("default partition contains rows")
+
+        monkeypatch.setattr(partitioning, "is_partitioned", lambda db, table: True)
+        monkeypatch.setattr(partitioning, "list_partitions", lambda db, table: [])
+        monkeypatch.setattr(partitioning, "_create_partition", create)
+
+        created = ensure_partitions(
+            db, "audit_logs", months_ahead=2, now=datetime(2026, 3, 18)
+        )
+
+        assert attempted == [
+            "audit_logs_p202603",
+            "audit_logs_p202604",
+            "audit_logs_p202605",
+        ]
+        assert created == ["audit_logs_p202603", "audit_logs_p202605"]
+
+
+class TestRetentionSettings:
+    """测试保留期配置"""
+
+    def test_retention_read_from_environment(self, monkeypatch):
+        monkeypatch.setenv("AUDIT_LOG_RETENTION_DAYS", "180")
+        monkeypatch.setenv("PARTITION_RETENTION_DETACH", "true")
+
+        configured = Settings()
+        assert configured.AUDIT_LOG_RETENTION_DAYS == 180
+        assert configured.PARTITION_RETENTION_DETACH is True
+        assert configured.SECURITY_EVENT_RETENTION_DAYS is None
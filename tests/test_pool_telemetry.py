@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连接池遥测与容量调整测试
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import exc as sa_exc
+
+from app.core.config import Settings
+from app.db.pool_telemetry import (
+    InstrumentedQueuePool,
+    PoolSizeController,
+    PoolWindow,
+    recommend_pool_size,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestInstrumentedQueuePool:
+    """测试连接获取统计与运行时扩缩容"""
+
+    def test_checkout_and_timeout_recorded(self, engine):
+        held = engine.connect()
+        with pytest.raises(sa_exc.TimeoutError):
+            engine.connect()
+        held.close()
+
+        window = engine.pool.take_window()
+        assert window.checkouts == 2
+        assert window.timeouts == 1
+        assert window.peak_in_use == 1
+        assert engine.pool.take_window().checkouts == 0
+
+    def test_resize_grows_and_shrinks(self, engine):
+        pool = engine.pool
+        first = engine.connect()
+
+        pool.resize(2, 1)
+        second, third = engine.connect(), engine.connect()
+        assert pool.checkedout() == 3
+
+        pool.resize(1, 0)
+        for conn in (first, second, third):
+            conn.close()
+        assert pool.checkedout() == 0
+        assert pool.size() == 1
+
+        # 缩容后容量恢复为1个连接
+        held = engine.connect()
+        with pytest.raises(sa_exc.TimeoutError):
+            engine.connect()
+        held.close()
+
+    def test_resize_survives_dispose(self, engine):
+        engine.pool.resize(3, 0)
+        engine.dispose()
+
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert engine.pool.size() == 3
+
+
+class TestPoolSizing:
+    """测试容量调整策略"""
+
+    def test_grows_on_wait_or_timeout(self):
+        window = PoolWindow(checkouts=10, total_wait=1.0, max_wait=0.3)
+        assert (
+            recommend_pool_size(10, window, min_size=5, max_size=11, target_wait=0.05)
+            == 11
+        )
+        assert (
+            recommend_pool_size(
+                10, PoolWindow(timeouts=1), min_size=5, max_size=20, target_wait=0.05
+            )
+            == 12
+        )
+
+    def test_shrinks_when_idle(self):
+        window = PoolWindow(checkouts=10, peak_in_use=2)
+        assert (
+            recommend_pool_size(10, window, min_size=9, max_size=20, target_wait=0.05)
+            == 9
+        )
+
+    def test_keeps_size_under_moderate_load(self):
+        window = PoolWindow(checkouts=10, total_wait=0.01, max_wait=0.01, peak_in_use=8)
+        assert (
+            recommend_pool_size(10, window, min_size=5, max_size=20, target_wait=0.05)
+            == 10
+        )
+
+    def test_controller_scales_overflow_with_size(self, engine):
+        engine.pool.resize(2, 2)
+        controller = PoolSizeController(engine)
+        controller.min_size, controller.max_size, controller.step = 1, 10, 2
+        held = engine.connect()
+        engine.connect().close()
+        held.close()
+        engine.pool._window.timeouts = 1
+
+        assert controller.tune() == 4
+        assert engine.pool._max_overflow == 4
+
+
+class TestPoolSettings:
+    """测试容量调整配置"""
+
+    def test_autotune_settings_read_from_environment(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_AUTOTUNE", "true")
+        monkeypatch.setenv("DB_POOL_MAX_SIZE", "80")
+
+        configured = Settings()
+        assert configured.DB_POOL_AUTOTUNE is True
+        assert configured.DB_POOL_MAX_SIZE == 80
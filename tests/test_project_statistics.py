@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目统计汇总测试
+"""
+
+from decimal import Decimal
+
+from app.crud.crud_project import project
+
+
+class TestFoldStatistics:
+    """测试分组结果汇总"""
+
+    def test_fold_grouped_rows(self):
+        groups = [
+            (0, "planning", 2, Decimal("100.50")),
+            (0, "completed", 1, None),
+            (0, "archived", 1, Decimal("10")),
+            (1, "pending", 3, Decimal("110.50")),
+            (2, "IT", 3, Decimal("100.50")),
+            (2, None, 1, Decimal("10")),
+            (3, "high", 4, Decimal("110.50")),
+            (4, "low", 4, Decimal("110.50")),
+        ]
+
+        stats = project._fold_statistics(groups)
+
+        assert stats["total_projects"] == 4
+        assert stats["total_budget"] == 110.5
+        assert stats["status_distribution"]["planning"] == 2
+        assert stats["status_distribution"]["cancelled"] == 0
+        assert "archived" not in stats["status_distribution"]
+        assert stats["review_status_distribution"]["pending"] == 3
+        assert stats["department_distribution"] == {"IT": 3}
+        assert stats["department_budget"] == {"IT": 100.5}
+        assert stats["priority_distribution"]["high"] == 4
+        assert stats["risk_distribution"] == {"low": 4, "medium": 0, "high": 0}
+        assert stats["status_budget"]["planning"] == 100.5
+
+    def test_fallback_rows_fold_per_dimension(self):
+        """非PostgreSQL按全部维度分组，每行展开到各维度"""
+        row = ("planning", "pending", "IT", "low", "high", 2, Decimal("5"))
+        groups = [(index, row[index], row[-2], row[-1]) for index in range(5)]
+
+        stats = project._fold_statistics(groups)
+
+        assert stats["total_projects"] == 2
+        assert stats["department_distribution"] == {"IT": 2}
+        assert stats["risk_distribution"]["high"] == 2
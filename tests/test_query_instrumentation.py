@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL执行埋点测试
+"""
+
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.db.query_instrumentation import (
+    current_query_stats,
+    instrument_engine,
+    query_stats_scope,
+    statement_shape,
+)
+from app.middleware.query_stats import QueryStatsMiddleware
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    instrument_engine(engine)
+    return engine
+
+
+class TestStatementShape:
+    """测试语句形态归一"""
+
+    def test_parameters_and_literals_collapse(self):
+        first = statement_shape("SELECT * FROM docs WHERE id = %(id_1)s AND kind = 'a'")
+        second = statement_shape("SELECT *  FROM docs\nWHERE id = 42 AND kind = 'b'")
+        assert first == second
+
+    def test_in_lists_collapse(self):
+        assert statement_shape("SELECT 1 FROM t WHERE id IN (?, ?, ?)") == (
+            statement_shape("SELECT 1 FROM t WHERE id IN (?)")
+        )
+
+
+class TestQueryStats:
+    """测试请求级统计"""
+
+    def test_counts_statements_in_scope(self, engine):
+        with query_stats_scope() as stats:
+            with engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text("SELECT :i"), {"i": i})
+            assert current_query_stats() is stats
+
+        assert stats.count == 3
+        assert stats.duration > 0
+        assert list(stats.shapes.values()) == [3]
+        assert current_query_stats() is None
+
+    def test_repeated_shape_reported_as_n_plus_one(self, engine, caplog):
+        with caplog.at_level(logging.WARNING, "app.db.query_instrumentation"):
+            with query_stats_scope():
+                with engine.connect() as conn:
+                    for i in range(12):
+                        conn.execute(text("SELECT :i"), {"i": i})
+
+        records = [r for r in caplog.records if "N+1" in r.getMessage()]
+        assert len(records) == 1
+        assert records[0].query_count == 12
+        assert records[0].repeated_statements[0]["count"] == 12
+
+    @pytest.mark.asyncio
+    async def test_middleware_labels_by_route_template(self, engine):
+        seen = {}
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        def read(item_id: int):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            stats = current_query_stats()
+            seen.update(route=stats.route, count=stats.count)
+            return {}
+
+        app.add_middleware(QueryStatsMiddleware)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            assert (await c.get("/items/7")).status_code == 200
+
+        assert seen == {"route": "/items/{item_id}", "count": 1}
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+只读副本路由测试
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, text
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.db.routing import (
+    READ_ONLY,
+    WROTE,
+    ReplicaSet,
+    RoutingSession,
+    replica_reads,
+)
+
+_Base = declarative_base()
+
+
+class _Item(_Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+def _engine(name):
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO items (id, name) VALUES (1, :name)"), {"name": name}
+        )
+    return engine
+
+
+@pytest.fixture
+def primary():
+    return _engine("primary")
+
+
+@pytest.fixture
+def replicas():
+    replicas = ReplicaSet([_engine("replica")], max_lag=5, check_interval=60)
+    replicas.refresh(0)
+    return replicas
+
+
+def _name(db):
+    return db.query(_Item.name).filter(_Item.id == 1).scalar()
+
+
+class TestRoutingSession:
+    """测试读写路由"""
+
+    def test_read_only_unit_uses_replica(self, primary, replicas):
+        factory = sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)
+
+        assert _name(factory()) == "primary"
+        assert _name(factory(info={READ_ONLY: True})) == "replica"
+
+        db = factory()
+        with replica_reads(db):
+            assert _name(db) == "replica"
+        assert db.info[READ_ONLY] is False
+
+    def test_reads_stick_to_primary_after_write(self, primary, replicas):
+        db = RoutingSession(bind=primary, replicas=replicas, info={READ_ONLY: True})
+        assert _name(db) == "replica"
+
+        db.add(_Item(id=2, name="new"))
+        db.commit()
+
+        assert db.query(_Item).filter(_Item.id == 2).one().name == "new"
+        assert _name(db) == "primary"
+
+    def test_dml_statement_marks_write(self, primary, replicas):
+        db = RoutingSession(bind=primary, replicas=replicas, info={READ_ONLY: True})
+
+        db.execute(text("UPDATE items SET name = 'renamed' WHERE id = 1"))
+
+        assert _name(db) == "renamed"
+
+    def test_cte_read_uses_replica(self, primary, replicas):
+        db = RoutingSession(bind=primary, replicas=replicas, info={READ_ONLY: True})
+
+        name = db.execute(
+            text(
+                "WITH RECURSIVE t(id) AS (SELECT 1) "
+                "SELECT name FROM items JOIN t ON items.id = t.id"
+            )
+        ).scalar()
+
+        assert name == "replica"
+        assert not db.info.get(WROTE)
+        assert RoutingSession()._is_write(
+            text("WITH gone AS (DELETE FROM items RETURNING id) SELECT * FROM gone")
+        )
+
+    def test_lagging_replica_falls_back_to_primary(self, primary, replicas):
+        replicas.measure_lag = lambda engine: 30.0
+        replicas.refresh(0)
+        db = RoutingSession(bind=primary, replicas=replicas, info={READ_ONLY: True})
+
+        assert _name(db) == "primary"
+
+    def test_unreachable_replica_falls_back_to_primary(self, primary, replicas):
+        replicas.measure_lag = lambda engine: None
+        replicas.refresh(0)
+        db = RoutingSession(bind=primary, replicas=replicas, info={READ_ONLY: True})
+
+        assert _name(db) == "primary"
+
+
+class TestReplicaSet:
+    """测试复制延迟缓存"""
+
+    def test_lag_cached_between_checks(self, replicas):
+        calls = []
+        replicas.measure_lag = lambda engine: calls.append(engine) or 0.0
+
+        assert replicas.choose() is replicas.engines[0]
+        assert replicas.choose() is replicas.engines[0]
+
+        assert calls == []
+
+    def test_slow_measurement_does_not_block_callers(self):
+        replicas = ReplicaSet([_engine("replica")], max_lag=5, check_interval=60)
+        release = threading.Event()
+        calls = []
+
+        def slow_measure(engine):
+            calls.append(engine)
+            release.wait(5)
+            return 0.0
+
+        replicas.measure_lag = slow_measure
+
+        # 冷启动时不等待测量，直接回退主库；并发调用只触发一次测量
+        start = time.monotonic()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(replicas.choose()))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert time.monotonic() - start < 1
+        assert results == [None] * 5
+        assert len(calls) == 1
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while replicas.choose() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert replicas.choose() is replicas.engines[0]
+        assert len(calls) == 1
+
+    def test_stale_measurement_falls_back_to_primary(self, replicas):
+        replicas.measure_lag = lambda engine: time.sleep(5)
+        checked_at, lag = replicas._lag[0]
+        # 最近一次结果已超过有效期（后台测量卡住）时不再采信
+        replicas._lag[0] = (checked_at - replicas.max_age, lag)
+
+        assert replicas.choose() is None
+
+    def test_no_replicas(self):
+        assert ReplicaSet([]).choose() is None
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求级记忆化测试
+"""
+
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.request_memo import (
+    NOT_MEMOIZED,
+    bypass_request_memo,
+    memo_get,
+    memo_set,
+    request_memo_scope,
+)
+from app.crud.base import CRUDBase, cache
+from app.middleware.request_memo import RequestMemoMiddleware
+
+
+class _Model:
+    id = MagicMock()
+
+
+def _crud_and_db():
+    cache.clear()
+    crud = CRUDBase(_Model)
+    crud.cache_enabled = False
+    db = MagicMock()
+    db.__contains__.return_value = True
+    return crud, db
+
+
+class TestRequestMemo:
+    """测试记忆化作用域"""
+
+    def test_noop_outside_scope(self):
+        memo_set(("k",), 1)
+        assert memo_get(("k",)) is NOT_MEMOIZED
+
+    def test_crud_get_queries_once_per_request(self):
+        crud, db = _crud_and_db()
+
+        with request_memo_scope():
+            first = crud.get(db, id=1)
+            assert crud.get(db, id=1) is first
+            assert db.query.call_count == 1
+
+            # 写操作场景可绕过记忆化
+            with bypass_request_memo():
+                crud.get(db, id=1)
+            assert db.query.call_count == 2
+
+        # 请求结束后不再复用
+        with request_memo_scope():
+            crud.get(db, id=1)
+        assert db.query.call_count == 3
+
+    def test_write_invalidates_model_entries(self):
+        crud, db = _crud_and_db()
+
+        with request_memo_scope():
+            crud.get(db, id=1)
+            crud._invalidate_cache_pattern(_Model.__name__)
+            crud.get(db, id=1)
+
+        assert db.query.call_count == 2
+
+
+class TestRequestMemoMiddleware:
+    """测试中间件与路由依赖共享同一作用域"""
+
+    @pytest.mark.asyncio
+    async def test_value_set_in_middleware_visible_to_sync_dependency(self):
+        app = FastAPI()
+
+        class SetUserMiddleware(BaseHTTPMiddleware):
+            async def dispatch(self, request: Request, call_next):
+                memo_set(("user",), "alice")
+                return await call_next(request)
+
+        def current_user():
+            return memo_get(("user",))
+
+        @app.get("/")
+        def read(user=Depends(current_user)):
+            return {"user": user}
+
+        app.add_middleware(SetUserMiddleware)
+        app.add_middleware(RequestMemoMiddleware)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            assert (await c.get("/")).json() == {"user": "alice"}
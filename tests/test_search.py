@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本检索测试
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.crud.search import ranked_search, similarity_rank, text_search_filter
+
+_Base = declarative_base()
+
+
+class _Doc(_Base):
+    __tablename__ = "docs"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(100))
+    body = Column(String(100))
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        _Doc(id=i, title=f"合同{i}" if i % 2 else "其他", body="招标文件") for i in range(1, 8)
+    )
+    session.commit()
+    return session
+
+
+def _search(db, term, **kwargs):
+    columns = (_Doc.title, _Doc.body)
+    query = db.query(_Doc).filter(text_search_filter(db, columns, term))
+    return ranked_search(db, query, _Doc, similarity_rank(db, columns, term), **kwargs)
+
+
+class TestRankedSearch:
+    """测试相关度分页与同查询总数"""
+
+    def test_total_from_same_query(self, db):
+        page = _search(db, "合同", limit=2)
+
+        assert [row.id for row in page.items] == [7, 5]
+        assert page.total == 4
+        assert page.total_is_exact
+
+    def test_offset_pages(self, db):
+        page = _search(db, "合同", skip=2, limit=2)
+
+        assert [row.id for row in page.items] == [3, 1]
+        assert page.total == 4
+
+    def test_past_last_page_falls_back_to_count(self, db):
+        page = _search(db, "招标", skip=20, limit=5)
+
+        assert page.items == []
+        assert page.total == 7
+
+    def test_total_capped(self, db, monkeypatch):
+        monkeypatch.setattr(
+            "app.crud.search.settings", SimpleNamespace(PAGINATION_COUNT_CAP=3)
+        )
+
+        page = _search(db, "招标", limit=2)
+
+        assert len(page.items) == 2
+        assert page.total == 3
+        assert not page.total_is_exact
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+安全统计单次扫描计数测试
+
+在SQLite中写入样本数据, 将FILTER聚合结果与原先逐项count查询的结果对比
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Integer,
+    String,
+    and_,
+    create_engine,
+    func,
+)
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.crud.base import cache
+from app.crud.crud_audit_log import CRUDAuditLog
+from app.crud.crud_security_event import CRUDSecurityEvent
+from app.models.security_event import SecurityEventLevel, SecurityEventType
+
+_Base = declarative_base()
+
+
+class _Event(_Base):
+    __tablename__ = "security_events"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(Enum(SecurityEventType))
+    level = Column(Enum(SecurityEventLevel))
+    source_ip = Column(String(45))
+    is_resolved = Column(Boolean, default=False)
+    created_at = Column(DateTime)
+
+
+class _Log(_Base):
+    __tablename__ = "audit_logs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)
+    action = Column(String(100))
+    status = Column(String(20))
+    created_at = Column(DateTime)
+
+
+NOW = datetime.utcnow()
+TODAY_START = NOW.replace(hour=0, minute=0, second=0, microsecond=0)
+WEEK_START = TODAY_START - timedelta(days=7)
+PREV_WEEK_START = WEEK_START - timedelta(days=7)
+
+
+@pytest.fixture
+def db():
+    cache.clear()
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    rng = random.Random(40)
+    event_types = list(SecurityEventType)
+    levels = list(SecurityEventLevel)
+    for i in range(400):
+        session.add(
+            _Event(
+                id=i + 1,
+                event_type=rng.choice(event_types),
+                level=rng.choice(levels),
+                source_ip=rng.choice(["10.0.0.1", "10.0.0.2", "10.0.0.3", None]),
+                is_resolved=rng.random() < 0.5,
+                created_at=NOW - timedelta(hours=rng.uniform(0, 24 * 30)),
+            )
+        )
+        session.add(
+            _Log(
+                id=i + 1,
+                user_id=rng.choice([1, 2, 3, 4, None]),
+                action=rng.choice(["login", "logout", "view", "update"]),
+                status=rng.choice(["success", "failed", "error"]),
+                created_at=NOW - timedelta(hours=rng.uniform(0, 24 * 3)),
+            )
+        )
+    session.commit()
+    yield session
+    session.close()
+    cache.clear()
+
+
+def _count(db, model, *conditions):
+    return db.query(func.count(model.id)).filter(*conditions).scalar() or 0
+
+
+class TestSingleScanCounts:
+    """单次扫描计数应与逐项查询一致"""
+
+    def test_dashboard_counts(self, db):
+        counts = CRUDSecurityEvent(_Event).get_dashboard_counts(
+            db,
+            today_start=TODAY_START,
+            week_start=WEEK_START,
+            prev_week_start=PREV_WEEK_START,
+        )
+
+        assert counts == {
+            "today": _count(db, _Event, _Event.created_at >= TODAY_START),
+            "week": _count(db, _Event, _Event.created_at >= WEEK_START),
+            "prev_week": _count(
+                db,
+                _Event,
+                _Event.created_at >= PREV_WEEK_START,
+                _Event.created_at < WEEK_START,
+            ),
+            "active": _count(db, _Event, _Event.is_resolved == False),
+            "critical": _count(
+                db,
+                _Event,
+                _Event.level == SecurityEventLevel.CRITICAL,
+                _Event.is_resolved == False,
+            ),
+        }
+        assert counts["active"] > 0 and counts["prev_week"] > 0
+
+    def test_activity_counts(self, db):
+        counts = CRUDAuditLog(_Log).get_activity_counts(db, since=TODAY_START)
+
+        since = _Log.created_at >= TODAY_START
+        assert counts == {
+            "total": _count(db, _Log, since),
+            "failed": _count(db, _Log, since, _Log.status.in_(["failed", "error"])),
+            "failed_logins": _count(
+                db, _Log, since, _Log.action == "login", _Log.status == "failed"
+            ),
+            "active_users": db.query(func.count(func.distinct(_Log.user_id)))
+            .filter(and_(since, _Log.user_id.isnot(None)))
+            .scalar(),
+        }
+        assert counts["failed_logins"] > 0
+
+    def test_attack_patterns(self, db):
+        patterns = CRUDSecurityEvent(_Event).detect_attack_patterns(db, hours=72)
+
+        since = _Event.created_at >= NOW - timedelta(hours=72)
+        event_type = _Event.event_type
+        assert patterns["ddos_attacks"] == _count(
+            db, _Event, since, event_type == SecurityEventType.DDOS_ATTACK
+        )
+        assert patterns["injection_attacks"] == _count(
+            db,
+            _Event,
+            since,
+            event_type.in_(
+                [SecurityEventType.SQL_INJECTION, SecurityEventType.XSS_ATTACK]
+            ),
+        )
+        assert patterns["insider_threats"] == _count(
+            db, _Event, since, event_type == SecurityEventType.INSIDER_THREAT
+        )
+        assert patterns["account_takeovers"] == _count(
+            db, _Event, since, event_type == SecurityEventType.ACCOUNT_TAKEOVER
+        )
+
+    def test_counts_cached_across_unrelated_writes(self, db):
+        """写操作递增版本号后, 统计结果仍在短TTL内命中缓存"""
+        events = CRUDSecurityEvent(_Event)
+        logs = CRUDAuditLog(_Log)
+        dashboard = events.get_dashboard_counts(
+            db,
+            today_start=TODAY_START,
+            week_start=WEEK_START,
+            prev_week_start=PREV_WEEK_START,
+        )
+        activity = logs.get_activity_counts(db, since=TODAY_START)
+
+        db.add(_Event(id=1000, is_resolved=False, created_at=NOW))
+        db.add(_Log(id=1000, action="login", status="failed", created_at=NOW))
+        db.commit()
+        cache.bump_version("_Event")
+        cache.bump_version("_Log")
+
+        assert (
+            events.get_dashboard_counts(
+                db,
+                today_start=TODAY_START,
+                week_start=WEEK_START,
+                prev_week_start=PREV_WEEK_START,
+            )
+            == dashboard
+        )
+        assert logs.get_activity_counts(db, since=TODAY_START) == activity
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统计汇总测试
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.core.config import Settings
+from app.crud.crud_stats_rollup import (
+    CRUDStatsRollup,
+    audit_log_rollup,
+    ceil_hour,
+    floor_hour,
+    security_event_rollup,
+)
+from app.models.security_event import SecurityEventLevel, SecurityEventType
+
+_Base = declarative_base()
+
+
+class _Log(_Base):
+    __tablename__ = "rollup_test_logs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)
+    username = Column(String(100))
+
+
+class TestHourBoundaries:
+    """测试小时边界取整"""
+
+    def test_floor_and_ceil(self):
+        value = datetime(2026, 10, 18, 9, 30, 15)
+        assert floor_hour(value) == datetime(2026, 10, 18, 9)
+        assert ceil_hour(value) == datetime(2026, 10, 18, 10)
+
+    def test_ceil_keeps_exact_hour(self):
+        value = datetime(2026, 10, 18, 9)
+        assert ceil_hour(value) == value
+
+
+class TestAggregateRows:
+    """测试原始行按小时和维度聚合"""
+
+    def test_groups_by_hour_and_dimensions(self):
+        rows = [
+            (datetime(2026, 10, 18, 9, 1), "login", "failed", 1, "alice"),
+            (datetime(2026, 10, 18, 9, 59), "login", "failed", 1, "alice2"),
+            (datetime(2026, 10, 18, 10, 0), "login", "failed", 1, "alice2"),
+            (datetime(2026, 10, 18, 9, 5), "login", "success", None, None),
+        ]
+
+        groups = audit_log_rollup.aggregate_rows(rows)
+
+        hour = datetime(2026, 10, 18, 9)
+        assert groups[(hour, "login", "failed", 1)] == [2, "alice2"]
+        assert groups[(hour, "login", "success", None)] == [1, None]
+        assert groups[(datetime(2026, 10, 18, 10), "login", "failed", 1)][0] == 1
+
+    def test_enum_dimensions_stored_as_values(self):
+        rows = [
+            (
+                datetime(2026, 10, 18, 9, 1),
+                SecurityEventType.DDOS_ATTACK,
+                SecurityEventLevel.CRITICAL,
+                None,
+                None,
+            )
+        ]
+
+        groups = security_event_rollup.aggregate_rows(rows)
+
+        assert (datetime(2026, 10, 18, 9), "ddos_attack", "critical", None) in groups
+
+
+class TestLatestUsernames:
+    """测试按用户ID解析用户名"""
+
+    def test_latest_username_per_user(self):
+        engine = create_engine("sqlite://")
+        _Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        db.add_all(
+            [
+                _Log(id=1, user_id=1, username="alice"),
+                _Log(id=2, user_id=1, username="alice2"),
+                _Log(id=3, user_id=1, username=None),
+                _Log(id=4, user_id=2, username="bob"),
+                _Log(id=5, user_id=3, username="carol"),
+            ]
+        )
+        db.commit()
+        rollup = CRUDStatsRollup(None, _Log, "rollup_test_logs", ("user_id",))
+
+        # 改名前后的记录只对应一个用户，取最近的用户名
+        assert rollup.latest_usernames(db, [1, 2, None]) == {1: "alice2", 2: "bob"}
+        assert rollup.latest_usernames(db, []) == {}
+        db.close()
+
+
+class TestRollupSettings:
+    """测试汇总配置"""
+
+    def test_settings_read_from_environment(self, monkeypatch):
+        monkeypatch.setenv("STATS_ROLLUP_BATCH_SIZE", "1000")
+
+        configured = Settings()
+        assert configured.STATS_ROLLUP_BATCH_SIZE == 1000
+        assert configured.STATS_ROLLUP_INTERVAL == 300
+        assert configured.STATS_ROLLUP_LAG_SECONDS == 120
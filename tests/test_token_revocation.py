@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+令牌吊销集合测试
+"""
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import token_revocation
+from app.core.token_revocation import (
+    REVOCATION_CHANNEL,
+    REVOCATION_KEY,
+    RevocationSet,
+    TokenRevocationSync,
+    expiry_timestamp,
+)
+
+
+class FakePipeline:
+    def __init__(self, calls, fail=False):
+        self.calls = calls
+        self.fail = fail
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args))
+
+    def execute(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.calls.append(("execute", ()))
+
+
+class FakePublisher:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def pipeline(self):
+        return FakePipeline(self.calls, self.fail)
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def execute(self):
+        self.calls.append(("execute", ()))
+
+
+class FakeAsyncRedis:
+    def __init__(self, entries=()):
+        self.entries = entries
+        self.calls = []
+
+    def pipeline(self):
+        return FakeAsyncPipeline(self.calls)
+
+    async def zrange(self, key, start, end, withscores=False):
+        return [(jti.encode(), exp) for jti, exp in self.entries]
+
+
+class TestRevocationSet:
+    """测试进程内吊销集合"""
+
+    def test_not_ready_defers_to_database(self):
+        revocations = RevocationSet()
+        revocations.add("a", time.time() + 60)
+        assert revocations.check("a") is None
+
+        revocations.ready = True
+        assert revocations.check("a") is True
+        assert revocations.check("b") is False
+
+    def test_past_expiry_kept_until_pruned(self):
+        revocations = RevocationSet()
+        revocations.ready = True
+        now = time.time()
+        # 过期时间已过但数据库仍有记录时依然视为吊销
+        revocations.add("past", now - 60)
+        revocations.add("future", now + 60)
+        assert revocations.check("past") is True
+
+        assert revocations.prune(now) == 1
+        assert revocations.check("past") is False
+        assert revocations.check("future") is True
+
+    def test_naive_expiry_is_utc(self):
+        aware = datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
+        assert expiry_timestamp(aware.replace(tzinfo=None)) == aware.timestamp()
+
+
+class TestTokenRevocationSync:
+    """测试吊销发布、通知应用与全量重建"""
+
+    def test_revoke_publishes_to_sorted_set_and_channel(self):
+        sync = TokenRevocationSync()
+        sync.enabled = True
+        sync._publisher = FakePublisher()
+        sync.revocations.ready = True
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+        sync.revoke("jti-1", expires_at)
+
+        assert sync.check("jti-1") is True
+        calls = dict(sync._publisher.calls)
+        assert calls["zadd"] == (REVOCATION_KEY, {"jti-1": expires_at.timestamp()})
+        channel, payload = calls["publish"]
+        assert channel == REVOCATION_CHANNEL
+        assert json.loads(payload)["op"] == "add"
+
+        sync.restore("jti-1")
+        assert sync.check("jti-1") is False
+
+    @pytest.mark.asyncio
+    async def test_publish_failure_falls_back_until_republished(self):
+        sync = TokenRevocationSync()
+        sync.enabled = True
+        sync._publisher = FakePublisher(fail=True)
+        sync.revocations.ready = True
+
+        sync.revoke("jti-1", datetime.now(timezone.utc) + timedelta(minutes=5))
+
+        assert sync.check("jti-1") is None
+        assert len(sync._unpublished) == 1
+
+        client = FakeAsyncRedis()
+        await sync._flush_unpublished(client)
+
+        assert not sync._unpublished
+        assert [name for name, _ in client.calls] == ["zadd", "publish", "execute"]
+        assert sync.check("jti-1") is True
+
+    def test_apply_message_from_other_worker(self):
+        sync = TokenRevocationSync()
+        sync.revocations.ready = True
+        exp = time.time() + 60
+        sync.apply_message(json.dumps({"op": "add", "jti": "x", "exp": exp}))
+        assert sync.check("x") is True
+        sync.apply_message(json.dumps({"op": "prune", "before": exp + 1}))
+        assert sync.check("x") is False
+
+    @pytest.mark.asyncio
+    async def test_rebuild_uses_database_and_sorted_set(self, monkeypatch):
+        now = time.time()
+        monkeypatch.setattr(
+            token_revocation,
+            "load_revocations",
+            lambda: {"db": now + 60, "db_past": now - 60},
+        )
+        sync = TokenRevocationSync()
+        sync.revocations.ready = True
+        sync.revocations.add("stale", now + 60)
+
+        count = await sync.rebuild(FakeAsyncRedis([("redis", now + 60)]))
+
+        assert count == 3
+        assert sync.check("db") is True
+        assert sync.check("db_past") is True
+        assert sync.check("redis") is True
+        assert sync.check("stale") is False